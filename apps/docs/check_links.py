@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Internal Link & Asset Checker
+=============================
+在 next build 之前快速检查 content 目录中的内部链接、图片资源与 _meta.json。
+
+功能：
+1. 一次扫描 content 目录与所有 _meta.json，建立路由索引
+2. 并行扫描每个页面，单次正则提取全部 Markdown/JSX 链接与图片引用
+3. 报告悬空链接、缺失资源、_meta.json 中不存在的页面、不可达页面
+4. 可选：基线文件（--baseline）记录已知问题，只有基线之外的新问题影响退出码；
+   基线中已不再出现的条目会提示移除
+
+用法：
+    python check_links.py [--content DIR] [--public DIR] [--fail-on LEVEL] [--workers N] [--baseline FILE]
+
+参数：
+    --content   content 目录（默认: apps/docs/content）
+    --public    静态资源目录（默认: apps/docs/public）
+    --fail-on   error（默认）/ warning / never，决定何种问题导致非零退出码
+    --workers   并行进程数（1 表示串行）
+    --baseline  已知问题的基线文件（JSON，按 文件 + 类型 + 信息 匹配，不含行号）
+    --write-baseline  把本次的全部问题写入 --baseline 指定的文件
+
+示例：
+    python check_links.py
+    python check_links.py --content content/import-agents --base /docs/import-agents
+    python check_links.py --baseline link-issues.json
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+from content_tools.fsutil import write_text_atomic
+from content_tools.references import Reference, extract_references
+from content_tools.route_index import DOCS_BASE, RouteIndex
+
+
+@dataclass
+class Issue:
+    """一条检查结果"""
+    level: str      # ERROR | WARN
+    code: str       # dangling-link | missing-asset | missing-page | bad-meta | unreachable
+    path: Path
+    line: int
+    col: int
+    message: str
+    known: bool = False     # 在基线中
+
+
+def scan_page(path: str) -> Tuple[str, List[Reference]]:
+    """读取并提取单个页面的引用（在工作进程中执行）"""
+    content = Path(path).read_text(encoding="utf-8")
+    return path, extract_references(content)
+
+
+class LinkChecker:
+    def __init__(
+        self,
+        content_dir: Path,
+        public_dir: Path,
+        base: str = DOCS_BASE,
+        workers: Optional[int] = None,
+        baseline: Optional[Path] = None
+    ):
+        self.content_dir = content_dir
+        self.public_dir = public_dir
+        self.baseline = baseline
+        self.fixed: List[Tuple[str, str, str]] = []    # 基线中已不再出现的问题
+        self.workers = workers or os.cpu_count() or 1
+        self.index = RouteIndex(content_dir, base=base)
+        self.issues: List[Issue] = []
+        self.inbound: Set[str] = set()
+        self.stats = {"pages": 0, "links": 0, "images": 0}
+
+    def log(self, msg: str, level: str = "INFO"):
+        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗"}
+        symbol = prefix.get(level, "•")
+        print(f"  {symbol} {msg}")
+
+    def add(self, level: str, code: str, path: Path, line: int, col: int, message: str):
+        self.issues.append(Issue(level, code, path, line, col, message))
+
+    def scan_pages(self) -> Dict[Path, List[Reference]]:
+        """并行提取所有页面的引用"""
+        pages = sorted(str(p) for p in self.index.routes.values())
+        if self.workers <= 1 or len(pages) < 2:
+            results = [scan_page(p) for p in pages]
+        else:
+            chunksize = max(1, len(pages) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                results = list(pool.map(scan_page, pages, chunksize=chunksize))
+        return {Path(p): refs for p, refs in results}
+
+    def check_asset(self, page: Path, ref: Reference):
+        url = ref.url.split("#", 1)[0].split("?", 1)[0]
+        if url.startswith("/"):
+            target = self.public_dir / url.lstrip("/")
+        else:
+            target = page.parent / url
+        if not target.exists():
+            self.add("ERROR", "missing-asset", page, ref.line, ref.col, f"资源不存在: {ref.url}")
+
+    def check_link(self, page: Path, ref: Reference):
+        route = self.index.normalize(ref.url, page)
+        if route == "/" or self.index.has_route(route):
+            self.inbound.add(route)
+            return
+        # 非 /docs 的绝对路径可能指向 public 中的静态文件
+        if not route.startswith(self.index.base + "/") and route != self.index.base:
+            if (self.public_dir / route.lstrip("/")).exists():
+                return
+        self.add("ERROR", "dangling-link", page, ref.line, ref.col, f"链接目标不存在: {ref.url}")
+
+    def check_references(self, refs_by_page: Dict[Path, List[Reference]]):
+        for page, refs in refs_by_page.items():
+            for ref in refs:
+                if ref.is_external or ref.is_anchor:
+                    continue
+                if ref.kind == "image":
+                    self.stats["images"] += 1
+                    self.check_asset(page, ref)
+                else:
+                    self.stats["links"] += 1
+                    self.check_link(page, ref)
+
+    def check_metas(self):
+        """_meta 中声明的页面必须存在"""
+        for meta_path, error in self.index.meta_errors:
+            self.add("ERROR", "bad-meta", meta_path, 1, 1, f"无法解析: {error}")
+
+        for dir_route, meta in self.index.metas.items():
+            meta_path = self.index.meta_paths[dir_route]
+            for key, value in meta.items():
+                if key == "*" or key.startswith("---"):
+                    continue
+                if isinstance(value, dict) and ("href" in value or value.get("type") in ("separator", "menu")):
+                    continue
+                route = dir_route if key == "index" else f"{dir_route}/{key}"
+                if not self.index.has_route(route) and route not in self.index.dirs:
+                    self.add("ERROR", "missing-page", meta_path, 1, 1, f"_meta 条目没有对应页面: {key}")
+
+    def check_reachability(self):
+        """既不在 _meta 中列出、也没有任何页面链接到的页面"""
+        for route, page in self.index.routes.items():
+            if route == self.index.base or route in self.inbound:
+                continue
+            listed = self.index.listed_children(self.index.dir_route(page))
+            if listed is not None and page.stem not in listed:
+                self.add("WARN", "unreachable", page, 1, 1, "页面未列入 _meta 且没有入站链接")
+
+    def issue_key(self, issue: Issue) -> Tuple[str, str, str]:
+        """基线中的匹配键：不含行列号，页面内容移动不会使已知问题变成新问题"""
+        return (Path(os.path.relpath(issue.path, self.content_dir)).as_posix(), issue.code, issue.message)
+
+    def apply_baseline(self):
+        """标记基线中的已知问题；同一键按次数匹配，多出来的仍是新问题"""
+        data = json.loads(self.baseline.read_text(encoding="utf-8"))
+        remaining: Dict[Tuple[str, str, str], int] = {}
+        for entry in data.get("issues", []):
+            key = (entry["file"], entry["code"], entry["message"])
+            remaining[key] = remaining.get(key, 0) + 1
+        for issue in self.issues:
+            key = self.issue_key(issue)
+            if remaining.get(key):
+                remaining[key] -= 1
+                issue.known = True
+        self.fixed = sorted(key for key, count in remaining.items() for _ in range(count))
+
+    def write_baseline(self, path: Path):
+        issues = sorted(self.issue_key(i) for i in self.issues)
+        data = {"issues": [{"file": f, "code": c, "message": m} for f, c, m in issues]}
+        write_text_atomic(path, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        self.log(f"写入基线: {path}（{len(issues)} 个问题）")
+
+    def report(self):
+        for issue in sorted(self.issues, key=lambda i: (str(i.path), i.line, i.col)):
+            rel = os.path.relpath(issue.path, self.content_dir)
+            known = "（已知）" if issue.known else ""
+            self.log(f"{rel}:{issue.line}:{issue.col} [{issue.code}] {issue.message}{known}", issue.level)
+        for file, code, message in self.fixed:
+            self.log(f"{file} [{code}] {message}：已不再出现，可从基线移除")
+
+    def run(self) -> Tuple[int, int]:
+        """执行检查，返回基线之外的 (错误数, 警告数)"""
+        print("\n" + "=" * 60)
+        print("Internal Link & Asset Check")
+        print("=" * 60)
+        start = time.perf_counter()
+
+        print("\n[1/3] 建立路由索引...")
+        self.index.build()
+        self.stats["pages"] = len(self.index.routes)
+        self.log(f"{len(self.index.routes)} 个页面，{len(self.index.metas)} 个 _meta")
+
+        print("\n[2/3] 扫描页面引用...")
+        refs_by_page = self.scan_pages()
+        self.check_references(refs_by_page)
+        self.log(f"{self.stats['links']} 个内部链接，{self.stats['images']} 个本地资源")
+
+        print("\n[3/3] 检查 _meta 与可达性...")
+        self.check_metas()
+        self.check_reachability()
+        if self.baseline is not None and self.baseline.exists():
+            self.apply_baseline()
+        self.report()
+
+        errors = sum(1 for i in self.issues if i.level == "ERROR" and not i.known)
+        warnings = sum(1 for i in self.issues if i.level == "WARN" and not i.known)
+        known = sum(1 for i in self.issues if i.known)
+
+        print("\n" + "-" * 60)
+        print("检查完成!")
+        print(f"  • 页面: {self.stats['pages']}")
+        print(f"  • 错误: {errors}")
+        print(f"  • 警告: {warnings}")
+        if self.baseline is not None:
+            print(f"  • 基线: 已知 {known}，已修复 {len(self.fixed)}")
+        print(f"  • 用时: {time.perf_counter() - start:.2f}s")
+        print("-" * 60 + "\n")
+
+        return errors, warnings
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Internal Link & Asset Checker")
+    parser.add_argument("--content", type=str, help="content 目录（默认: apps/docs/content）")
+    parser.add_argument("--public", type=str, help="静态资源目录（默认: apps/docs/public）")
+    parser.add_argument("--base", type=str, default=DOCS_BASE, help="content 目录对应的路由前缀")
+    parser.add_argument(
+        "--fail-on",
+        choices=["error", "warning", "never"],
+        default="error",
+        help="何种级别的问题导致非零退出码"
+    )
+    parser.add_argument("--workers", type=int, help="并行进程数")
+    parser.add_argument("--baseline", type=str, help="已知问题的基线文件")
+    parser.add_argument("--write-baseline", action="store_true", help="把本次的全部问题写入基线文件")
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    content_dir = (Path(args.content) if args.content else script_dir / "content").resolve()
+    public_dir = (Path(args.public) if args.public else script_dir / "public").resolve()
+
+    if not content_dir.exists():
+        print(f"错误: content 目录不存在: {content_dir}")
+        sys.exit(1)
+
+    if args.write_baseline and not args.baseline:
+        print("错误: --write-baseline 需要 --baseline")
+        sys.exit(1)
+    baseline = Path(args.baseline).resolve() if args.baseline else None
+
+    checker = LinkChecker(content_dir, public_dir, base=args.base, workers=args.workers,
+                          baseline=None if args.write_baseline else baseline)
+    errors, warnings = checker.run()
+    if args.write_baseline:
+        checker.write_baseline(baseline)
+        sys.exit(0)
+
+    if args.fail_on == "error" and errors:
+        sys.exit(1)
+    if args.fail_on == "warning" and (errors or warnings):
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
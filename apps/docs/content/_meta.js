@@ -2,9 +2,6 @@ export default {
   '*': {
     type: 'doc'
   },
-  '_backup_docs_20260108_131042': {
-    display: 'hidden'
-  },
   index: {
     title: '课程首页',
     type: 'page',
@@ -0,0 +1,31 @@
+"""
+Deepractice Content Tools
+=========================
+sync_from_source.py / sync_content.py / migrate_content.py /
+scripts/migrate-content.py / preview_server.py 共享的内容处理模块。
+
+模块：
+    assets          图片哈希去重、WebP 变体与引用改写
+    changeset       同步前后按内容哈希比较的变更集（页面、_meta 与受影响的路由）
+    convert         Markdown → MDX 转换核心（upstream / vitepress 方言，批量与多进程）
+    corpus          紧凑的页面语料模型（__slots__、相对路径、按需读取）
+    depgraph        导航产物依赖图：只重新生成输入变化的 _meta.json / index.mdx
+    diagrams        Mermaid 图表提取、按需加载与可插拔预渲染缓存
+    events          结构化事件流（JSON Lines）、限速重绘的进度显示与 quiet 模式
+    frontmatter     只读页面开头的 frontmatter / 首个标题解析与标题缓存
+    fsutil          原子写入等文件系统工具
+    golden          转换器黄金语料：输出哈希快照、候选实现的逐字节比较与速度比
+    highlight       代码块 Pygments 预高亮与缓存
+    link_rewrite    规则驱动的批量链接重写
+    mdx_lint        MDX 编译风险扫描（标签、花括号、代码块等）
+    page_budget     页面体积预算与超标页面拆分
+    pipeline        有界并发的异步 读取 → 转换 → 写入 管道
+    playground      CodeRun 代码体提取为静态文件
+    references      页面链接/图片引用提取
+    related         MinHash + LSH 相关页面索引（NumPy 可选）
+    route_index     content 目录的 Nextra 路由索引
+    route_manifest  路由清单（路由 -> 页面、源文件、哈希）、sitemap 与旧路由重定向
+    slug_registry   标题 ↔ slug ↔ 源文件的持久注册表
+    storage         内容存储接口：本地磁盘、内存与批量写入后端
+    walk            基于 os.scandir 的流式目录遍历与章节发现
+"""
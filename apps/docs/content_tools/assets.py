@@ -0,0 +1,273 @@
+"""
+图片资源管线
+============
+
+在同步/迁移时收集页面引用的本地图片：
+1. 按内容哈希去重（同一张图只输出一次）
+2. 生成多宽度的 WebP 变体（需要 Pillow；未安装时只输出哈希命名的原图）
+3. 以哈希为键的持久缓存，只处理新图片：原图与变体保存在缓存目录（.cache/assets/），
+   输出目录中缺少时从缓存链接或拷贝，CI 只需缓存 .cache 即可跳过重新编码
+4. 把页面中的图片改写为 <Picture>：src 为最大的变体，srcSet 列出全部宽度；
+   Picture 组件在客户端补上 NEXT_PUBLIC_BASE_PATH（GitHub Pages 项目站点）
+
+    ![架构图](./arch.png "标题")
+    -> <Picture src="/assets/img/<hash>-1280.webp" srcSet="/assets/img/<hash>-640.webp 640w, ..."
+                width={1600} height={900} alt="架构图" title="标题" />
+
+<img src> 标签改名为 <Picture> 并保留其余属性；其他标签中图片后缀的 src 只改写 URL。
+
+输出目录（默认 public/assets/img）：
+    <hash>.<ext>           原图
+    <hash>-<width>.webp    变体
+    manifest.json          {hash: {width, height, original, variants: {宽度: URL}, default}}
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .fsutil import write_text_atomic
+from .references import Reference, replace_images
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow 为可选依赖
+    Image = None
+
+DEFAULT_WIDTHS = (640, 1280)
+RASTER_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".bmp", ".tif", ".tiff"}
+IMAGE_SUFFIXES = RASTER_SUFFIXES | {".gif", ".svg", ".avif", ".ico"}
+HASH_LENGTH = 16
+MARKDOWN_IMAGE = re.compile(r"""!\[(?P<alt>[^\]\n]*)\]\([^)]*?(?:\s+["'](?P<title>[^"'\n]*)["'])?\s*\)$""")
+
+
+def jsx_attr(name: str, value: str) -> str:
+    """JSX 属性：含引号等字符时写成字符串表达式"""
+    if any(c in value for c in '"&\\'):
+        return f"{name}={{{json.dumps(value, ensure_ascii=False)}}}"
+    return f'{name}="{value}"'
+
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LENGTH]
+
+
+class AssetPipeline:
+    def __init__(
+        self,
+        public_dir: Path,
+        cache_dir: Path,
+        url_prefix: str = "/assets/img",
+        widths: Sequence[int] = DEFAULT_WIDTHS,
+        quality: int = 80,
+        public_source_dir: Optional[Path] = None,
+        dry_run: bool = False
+    ):
+        self.url_prefix = "/" + url_prefix.strip("/")
+        self.out_dir = public_dir / url_prefix.strip("/")
+        self.cache_path = cache_dir / "assets.json"
+        # 原图与变体的持久副本（随 .cache 一起在 CI 中缓存）
+        self.store_dir = cache_dir / "assets"
+        self.widths = sorted(set(widths))
+        self.quality = quality
+        # 源站点中以 / 开头的图片所在目录（VitePress: docs/public）
+        self.public_source_dir = public_source_dir
+        self.dry_run = dry_run
+
+        # sources: 源文件绝对路径 -> [size, mtime_ns, hash]，避免重复计算哈希
+        # assets:  hash -> manifest 条目
+        self.cache: Dict[str, Dict] = {"sources": {}, "assets": {}}
+        if self.cache_path.exists():
+            try:
+                self.cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                pass
+        self.used: Dict[str, Dict] = {}
+        self.warnings = []
+        self.stats = {"referenced": 0, "processed": 0, "cached": 0, "missing": 0}
+
+    def resolve(self, url: str, page_source: Path) -> Optional[Path]:
+        """把图片 URL 解析为源文件路径"""
+        path = url.split("#", 1)[0].split("?", 1)[0]
+        if path.startswith("/"):
+            if self.public_source_dir is None:
+                return None
+            candidate = self.public_source_dir / path.lstrip("/")
+        else:
+            candidate = page_source.parent / path
+        return candidate if candidate.is_file() else None
+
+    def digest(self, source: Path) -> str:
+        key = str(source.resolve())
+        st = source.stat()
+        cached = self.cache["sources"].get(key)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        digest = file_digest(source)
+        self.cache["sources"][key] = [st.st_size, st.st_mtime_ns, digest]
+        return digest
+
+    @staticmethod
+    def output_names(entry: Dict) -> List[str]:
+        return [Path(url).name for url in [entry["original"]] + list(entry["variants"].values())]
+
+    def stored(self, entry: Dict) -> bool:
+        return all((self.store_dir / name).exists() for name in self.output_names(entry))
+
+    def publish(self, entry: Dict) -> None:
+        """把缓存中的输出放到输出目录（哈希命名、不会原地修改，可以硬链接）"""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        for name in self.output_names(entry):
+            target = self.out_dir / name
+            if target.exists():
+                continue
+            try:
+                os.link(self.store_dir / name, target)
+            except OSError:
+                shutil.copy2(self.store_dir / name, target)
+
+    def encode_variants(self, source: Path, digest: str, entry: Dict) -> None:
+        """生成 WebP 变体：不放大，宽度超过原图时以原图宽度输出一份"""
+        with Image.open(source) as img:
+            entry["width"], entry["height"] = img.size
+            if getattr(img, "is_animated", False):
+                return
+            targets = [w for w in self.widths if w < img.width] or [img.width]
+            if img.width <= self.widths[-1] and img.width not in targets:
+                targets.append(img.width)
+            for width in targets:
+                height = max(1, round(img.height * width / img.width))
+                name = f"{digest}-{width}.webp"
+                resized = img if width == img.width else img.resize((width, height), Image.LANCZOS)
+                if resized.mode not in ("RGB", "RGBA"):
+                    resized = resized.convert("RGBA")
+                resized.save(self.store_dir / name, "WEBP", quality=self.quality, method=6)
+                entry["variants"][str(width)] = f"{self.url_prefix}/{name}"
+
+    def ingest(self, source: Path) -> Dict:
+        """处理一张图片（缓存命中且输出齐全时跳过），返回 manifest 条目"""
+        digest = self.digest(source)
+        suffix = source.suffix.lower()
+        entry = self.cache["assets"].get(digest)
+        # 之前在没有 Pillow 的环境中处理过的位图需要补生成变体
+        stale = entry is not None and entry["width"] is None and Image is not None and suffix in RASTER_SUFFIXES
+        if entry and not stale and (self.dry_run or self.stored(entry)):
+            if not self.dry_run:
+                self.publish(entry)
+            self.stats["cached"] += 1
+            self.used[digest] = entry
+            return entry
+
+        entry = {
+            "original": f"{self.url_prefix}/{digest}{suffix}",
+            "width": None,
+            "height": None,
+            "variants": {},
+        }
+        if not self.dry_run:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source, self.store_dir / f"{digest}{suffix}")
+            if Image is not None and suffix in RASTER_SUFFIXES:
+                try:
+                    self.encode_variants(source, digest, entry)
+                except OSError as e:
+                    self.warnings.append(f"无法生成变体 {source.name}: {e}")
+            self.publish(entry)
+
+        widths = sorted(entry["variants"], key=int)
+        entry["default"] = entry["variants"][widths[-1]] if widths else entry["original"]
+        self.cache["assets"][digest] = entry
+        self.used[digest] = entry
+        self.stats["processed"] += 1
+        return entry
+
+    @staticmethod
+    def is_image(ref: Reference) -> bool:
+        """Markdown 图片与 <img src>；其他标签的 src（如 <Diagram src="….mmd">）只在后缀为图片时处理"""
+        if ref.kind != "image":
+            return False
+        if ref.tag is None or ref.tag.lower() == "img":
+            return True
+        path = ref.url.split("#", 1)[0].split("?", 1)[0]
+        return Path(path).suffix.lower() in IMAGE_SUFFIXES
+
+    @staticmethod
+    def src_set(entry: Dict) -> Optional[str]:
+        widths = sorted(entry["variants"], key=int)
+        if len(widths) < 2:
+            return None
+        return ", ".join(f"{entry['variants'][w]} {w}w" for w in widths)
+
+    def picture(self, entry: Dict, element: str) -> str:
+        """Markdown 图片 -> <Picture />"""
+        match = MARKDOWN_IMAGE.search(element)
+        attrs = [f'src="{entry["default"]}"']
+        src_set = self.src_set(entry)
+        if src_set:
+            attrs.append(f'srcSet="{src_set}"')
+        if entry["width"]:
+            attrs.append(f'width={{{entry["width"]}}} height={{{entry["height"]}}}')
+        attrs.append(jsx_attr("alt", match.group("alt") if match else ""))
+        if match and match.group("title"):
+            attrs.append(jsx_attr("title", match.group("title")))
+        return f"<Picture {' '.join(attrs)} />"
+
+    def img_tag(self, entry: Dict, element: str, url: str, offset: int) -> str:
+        """<img src> -> <Picture src srcSet …>，其余属性不变"""
+        # element[offset + len(url)] 为 src 的结束引号
+        end = offset + len(url) + 1
+        src_set = self.src_set(entry)
+        extra = f' srcSet="{src_set}"' if src_set and "srcset" not in element.lower() else ""
+        element = "<Picture" + element[len("<img"):offset] + entry["default"] + element[offset + len(url):end] + extra + element[end:]
+        if not element.endswith("/>"):
+            element = element[:-1].rstrip() + " />"
+        return element
+
+    def rewrite(self, content: str, page_source: Path) -> str:
+        """处理页面引用的所有本地图片，并把图片改写为引用哈希输出的 <Picture>"""
+        def replace(ref: Reference, element: str, offset: int) -> Optional[str]:
+            if not self.is_image(ref) or ref.is_external or ref.url.startswith(self.url_prefix + "/"):
+                return None
+            self.stats["referenced"] += 1
+            source = self.resolve(ref.url, page_source)
+            if source is None:
+                self.stats["missing"] += 1
+                self.warnings.append(f"{page_source.name}:{ref.line} 图片不存在: {ref.url}")
+                return None
+            entry = self.ingest(source)
+            if ref.tag is None:
+                return self.picture(entry, element)
+            if ref.tag.lower() == "img":
+                return self.img_tag(entry, element, ref.url, offset)
+            return element[:offset] + entry["default"] + element[offset + len(ref.url):]
+
+        return replace_images(content, replace)
+
+    def save(self) -> None:
+        """写入缓存与本次使用到的 manifest"""
+        if self.dry_run:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.cache_path, json.dumps(self.cache, ensure_ascii=False) + "\n")
+        if self.used:
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            manifest_path = self.out_dir / "manifest.json"
+            manifest = {}
+            if manifest_path.exists():
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            manifest.update(self.used)
+            write_text_atomic(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+    def summary(self) -> str:
+        encoder = "Pillow" if Image is not None else "未安装 Pillow，仅输出原图"
+        return (f"图片引用 {self.stats['referenced']}，去重后 {len(self.used)}，"
+                f"新处理 {self.stats['processed']}，缓存命中 {self.stats['cached']}，"
+                f"缺失 {self.stats['missing']}（{encoder}）")
@@ -0,0 +1,206 @@
+"""
+同步变更集
+==========
+
+sync_from_source.py --changeset <路径> 在同步开始前与结束后各对 content 目录做一次快照，
+按内容哈希比较，写出本次同步实际改变了什么：
+
+    {
+      "version": 1,
+      "scope": "../apps/docs/content",       # content 目录（相对变更集所在目录）
+      "changed": true,                        # 为 false 时可以跳过构建与部署
+      "pages":   {"added": [...], "modified": [...], "removed": [...],
+                  "renamed": [{"from": "a.mdx", "to": "b.mdx"}]},
+      "meta":    {"added": [...], "modified": [...], "removed": [...]},   # _meta.json / _meta.js
+      "files":   {"added": [...], "modified": [...], "removed": [...]},   # content 中的其他文件
+      "outputs": ["route-manifest.json", ...],                            # 改变了的站点级产物
+      "routes":  {"affected": [...], "removed": [...]},
+      "navigation": false                     # 有 _meta 改变：侧边栏变化，所有页面都受影响
+    }
+
+- 只看内容哈希：--full 重写了全部文件、但内容未变的页面不会出现在变更集中
+- 移除的页面与新增的页面内容哈希相同（且唯一）时记为 renamed
+- routes.affected 为新增、修改、改名后的页面路由与 _meta 改变的目录路由；
+  routes.removed 为删除与改名前的路由（已由 route-manifest.json 的重定向接管时同样列出）
+- outputs 为 content 之外被页面共用的产物（路由清单、相关页面索引等），
+  其中任何一个改变都意味着全部页面需要重新构建；产物可以给出自己的指纹函数，
+  如路由清单只比较路由结构与重定向（页面内容哈希的变化已体现在 pages 中）
+- 快照的哈希按 路径 + 大小 + mtime 缓存在 .cache/content-hashes.json，未改动的文件不会被读取
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from .fsutil import write_text_atomic
+from .route_index import DOCS_BASE, PAGE_SUFFIXES, RouteIndex
+from .route_manifest import content_digest
+from .walk import DEFAULT_EXCLUDE
+
+CHANGESET_VERSION = 1
+
+# 产物：路径，或 (路径, bytes -> 指纹)
+Output = Union[Path, Tuple[Path, Callable[[bytes], str]]]
+
+
+def is_page(rel: str) -> bool:
+    name = rel.rsplit("/", 1)[-1]
+    return name.endswith(PAGE_SUFFIXES) and not name.startswith(("_", "."))
+
+
+def is_meta(rel: str) -> bool:
+    return rel.rsplit("/", 1)[-1] in ("_meta.json", "_meta.js")
+
+
+def diff(before: Dict[str, str], after: Dict[str, str]) -> Dict[str, List[str]]:
+    return {
+        "added": sorted(after.keys() - before.keys()),
+        "modified": sorted(k for k in after.keys() & before.keys() if after[k] != before[k]),
+        "removed": sorted(before.keys() - after.keys()),
+    }
+
+
+class ChangeTracker:
+    """对 content 目录与若干站点级产物做同步前后的快照，比较得到变更集"""
+
+    def __init__(
+        self,
+        content_dir: Path,
+        cache_dir: Optional[Path] = None,
+        outputs: Iterable[Output] = (),
+        base: str = DOCS_BASE
+    ):
+        self.content_dir = content_dir
+        self.outputs = [o if isinstance(o, tuple) else (o, content_digest) for o in outputs]
+        self.index = RouteIndex(content_dir, base)
+        self.hash_path = cache_dir / "content-hashes.json" if cache_dir is not None else None
+        self.hashes: Dict[str, list] = {}   # content 相对路径 -> [大小, mtime, 哈希]
+        if self.hash_path is not None and self.hash_path.exists():
+            try:
+                self.hashes = json.loads(self.hash_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                self.hashes = {}
+        self.before: Optional[Dict[str, str]] = None
+        self.before_outputs: Dict[str, Optional[str]] = {}
+        self.changeset: Optional[Dict] = None
+        self.stats = {"files": 0, "hashed": 0}
+
+    def digest(self, path: Path, rel: str) -> str:
+        st = path.stat()
+        entry = self.hashes.get(rel)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime:
+            return entry[2]
+        self.stats["hashed"] += 1
+        digest = content_digest(path.read_bytes())
+        self.hashes[rel] = [st.st_size, st.st_mtime, digest]
+        return digest
+
+    def snapshot(self) -> Dict[str, str]:
+        """content 目录全部文件的 相对路径 -> 内容哈希"""
+        files: Dict[str, str] = {}
+        if not self.content_dir.is_dir():
+            return files
+        for dirpath, dirnames, filenames in os.walk(self.content_dir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(".") and d not in DEFAULT_EXCLUDE)
+            rel_dir = Path(dirpath).relative_to(self.content_dir).as_posix()
+            for name in filenames:
+                if name.startswith("."):
+                    continue
+                rel = name if rel_dir == "." else f"{rel_dir}/{name}"
+                files[rel] = self.digest(Path(dirpath) / name, rel)
+        return files
+
+    def output_hashes(self) -> Dict[str, Optional[str]]:
+        return {
+            path.name: fingerprint(path.read_bytes()) if path.is_file() else None
+            for path, fingerprint in self.outputs
+        }
+
+    def begin(self) -> None:
+        """同步开始前调用（--full 删除旧文件之前）"""
+        self.before = self.snapshot()
+        self.before_outputs = self.output_hashes()
+
+    def route(self, rel: str) -> str:
+        return self.index.route_for(os.path.splitext(rel)[0])
+
+    def compute(self) -> Dict:
+        """同步结束后调用，返回变更集"""
+        after = self.snapshot()
+        before = self.before or {}
+        self.stats["files"] = len(after)
+        # 只保留仍存在的文件的哈希缓存
+        self.hashes = {k: v for k, v in self.hashes.items() if k in after}
+
+        pages = diff({k: v for k, v in before.items() if is_page(k)},
+                     {k: v for k, v in after.items() if is_page(k)})
+        meta = diff({k: v for k, v in before.items() if is_meta(k)},
+                    {k: v for k, v in after.items() if is_meta(k)})
+        files = diff({k: v for k, v in before.items() if not is_page(k) and not is_meta(k)},
+                     {k: v for k, v in after.items() if not is_page(k) and not is_meta(k)})
+
+        # 内容相同的 删除 + 新增 视为改名（哈希在两侧都唯一时）
+        added_by_hash: Dict[str, List[str]] = {}
+        for rel in pages["added"]:
+            added_by_hash.setdefault(after[rel], []).append(rel)
+        removed_by_hash: Dict[str, List[str]] = {}
+        for rel in pages["removed"]:
+            removed_by_hash.setdefault(before[rel], []).append(rel)
+        renamed = []
+        for digest, olds in removed_by_hash.items():
+            news = added_by_hash.get(digest, [])
+            if len(olds) == 1 and len(news) == 1:
+                renamed.append({"from": olds[0], "to": news[0]})
+        moved_from = {r["from"] for r in renamed}
+        moved_to = {r["to"] for r in renamed}
+        pages["added"] = [rel for rel in pages["added"] if rel not in moved_to]
+        pages["removed"] = [rel for rel in pages["removed"] if rel not in moved_from]
+        pages["renamed"] = sorted(renamed, key=lambda r: r["from"])
+
+        affected = {self.route(rel) for rel in pages["added"] + pages["modified"]}
+        affected.update(self.route(rel) for rel in moved_to)
+        # _meta 所在目录的路由（目录的标题、排序与侧边栏）
+        affected.update(self.index.route_for(rel.rpartition("/")[0]) for rel in meta["added"] + meta["modified"])
+        removed_routes = {self.route(rel) for rel in pages["removed"]} | {self.route(rel) for rel in moved_from}
+        removed_routes -= {self.route(rel) for rel in after if is_page(rel)}
+
+        after_outputs = self.output_hashes()
+        outputs = sorted(name for name, digest in after_outputs.items()
+                         if digest != self.before_outputs.get(name))
+
+        navigation = any(meta.values())
+        changed = navigation or bool(outputs) or any(pages.values()) or any(files.values())
+        self.changeset = {
+            "version": CHANGESET_VERSION,
+            "changed": changed,
+            "pages": pages,
+            "meta": meta,
+            "files": files,
+            "outputs": outputs,
+            "routes": {"affected": sorted(affected), "removed": sorted(removed_routes)},
+            "navigation": navigation,
+        }
+        return self.changeset
+
+    def save(self, path: Path) -> None:
+        changeset = dict(self.changeset or self.compute())
+        changeset["scope"] = Path(os.path.relpath(self.content_dir, path.resolve().parent)).as_posix()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(path, json.dumps(changeset, indent=2, ensure_ascii=False) + "\n")
+        if self.hash_path is not None:
+            self.hash_path.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(self.hash_path, json.dumps(self.hashes, ensure_ascii=False) + "\n")
+
+    def summary(self) -> str:
+        c = self.changeset or {}
+        if not c.get("changed"):
+            return f"没有变化（{self.stats['files']} 个文件，重新计算哈希 {self.stats['hashed']}）"
+        pages = c["pages"]
+        text = (f"页面 新增 {len(pages['added'])}，修改 {len(pages['modified'])}，"
+                f"删除 {len(pages['removed'])}，改名 {len(pages['renamed'])}；"
+                f"_meta 改变 {sum(len(v) for v in c['meta'].values())}；"
+                f"受影响路由 {len(c['routes']['affected'])}（重新计算哈希 {self.stats['hashed']}）")
+        if c["outputs"]:
+            text += f"；站点级产物改变: {', '.join(c['outputs'])}"
+        return text
@@ -0,0 +1,437 @@
+"""
+Markdown → MDX 转换核心
+=======================
+
+sync_from_source.py、sync_content.py、scripts/migrate-content.py 与 preview_server.py
+共用的纯函数转换，取代此前三份各自漂移的实现：
+
+    text, diagnostics = convert(text, ConvertOptions(title="什么是智能体"))
+    for text, diagnostics in convert_many(items, workers=4): ...
+    for tag, result in convert_stream(jobs, workers=4): ...     # 有界内存、逐页隔离错误
+
+两种方言：
+    upstream   deepractice-agents 仓库的 .md：sanitize_for_mdx 清理 + 带引号的 title/description frontmatter
+    vitepress  docs-site 的 VitePress 页面：精简 frontmatter、Vue 组件 → JSX、img/br/class 等 JSX 化
+
+- 所有正则在导入时编译一次
+- convert 不读写文件、不持有状态，可在工作进程中执行；
+  图片改写、代码高亮、CodeRun 提取等有状态的步骤仍由调用方在 convert 前后完成
+- 诊断复用 mdx_lint.Diagnostic：转换中丢弃内容时给出警告，options.lint 为 True 时
+  附带对输出的 MDX 风险扫描
+- 转换出错时抛出 ConvertError，带规则名（sanitize / frontmatter / vue-jsx / html-tags …）
+  与位置；convert_stream 在工作进程中逐页隔离错误，一个页面失败不影响其他页面
+"""
+
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .frontmatter import first_heading
+from .mdx_lint import Diagnostic, lint
+
+DIALECTS = ("upstream", "vitepress")
+
+# --- upstream ---
+CODE_FENCE = re.compile(r'```[\s\S]*?```')
+INLINE_CODE = re.compile(r'`[^`]+`')
+BR_TAG = re.compile(r'<br\s*>')
+HR_TAG = re.compile(r'<hr\s*>')
+HTML_TAG = re.compile(r'<[^>]+>')
+ATTR_START = re.compile(r'(\w+)="')
+HTML_COMMENT = re.compile(r'<!--[\s\S]*?-->')
+TABLE_BR = re.compile(r'\|([^|]*)<br>([^|]*)\|')
+NUMBERED_STEM = re.compile(r'^(\d+)\.(\d+)-(.+)$')
+
+# --- vitepress ---
+FRONTMATTER = re.compile(r"^---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+CALLOUT_OPEN = re.compile(r"<Callout\s+type=[\"'](\w+)[\"']\s*>")
+CALLOUT_TITLED = re.compile(r"<Callout\s+type=[\"'](\w+)[\"']\s+title=[\"']([^\"']+)[\"']\s*>")
+CODERUN_OPEN = re.compile(r"<CodeRun\s+lang=[\"'](\w+)[\"']\s*>")
+DEMO_TAG = re.compile(r"<Demo\s+src=[\"']([^\"']+)[\"']\s*/>")
+IMG_TAG = re.compile(r'<img\s+src=["\']([^"\']+)["\']([^>]*)>')
+CLASS_ATTR = re.compile(r'\bclass=(["\'])')
+TITLE_PREFIX = re.compile(r"^\d+(\.\d+)?-?")
+
+KEPT_FIELDS = ("title", "description")
+
+
+@dataclass(frozen=True)
+class ConvertOptions:
+    dialect: str = "upstream"
+    title: Optional[str] = None     # upstream：frontmatter 的 title；None 时由 filename 推导
+    filename: str = ""              # 标题推导（两种方言）与诊断中使用
+    sanitize: bool = True           # upstream：是否运行 sanitize_for_mdx
+    lint: bool = False              # 是否附带输出的 MDX 风险扫描
+
+
+def _line(text: str, pos: int) -> int:
+    return text.count("\n", 0, pos) + 1
+
+
+class ConvertError(Exception):
+    """
+    某条转换规则处理页面时出错
+
+    line / col 为出错位置（1 起，未知时为 None），snippet 为出错处的原文片段。
+    所有字段都在 args 中，可以在进程间传递。
+    """
+
+    def __init__(self, rule: str, message: str, line: Optional[int] = None,
+                 col: Optional[int] = None, snippet: Optional[str] = None):
+        super().__init__(rule, message, line, col, snippet)
+        self.rule = rule
+        self.message = message
+        self.line = line
+        self.col = col
+        self.snippet = snippet
+
+    @classmethod
+    def at(cls, rule: str, error: BaseException, prefix: Optional[str] = None,
+           snippet: Optional[str] = None) -> "ConvertError":
+        """由异常创建；prefix 为出错位置之前的全部原文，用于计算行列"""
+        line = col = None
+        if prefix is not None:
+            line = prefix.count("\n") + 1
+            col = len(prefix) - prefix.rfind("\n")
+        message = f"{type(error).__name__}: {error}"
+        return cls(rule, message, line, col, snippet[:80] if snippet else None)
+
+    def __str__(self) -> str:
+        where = f"第 {self.line} 行第 {self.col} 列: " if self.line else ""
+        return f"[{self.rule}] {where}{self.message}"
+
+
+# ---------------------------------------------------------------------------
+# upstream 方言
+# ---------------------------------------------------------------------------
+
+def _fix_attributes(tag_content: str) -> str:
+    """修复属性值中未转义的引号：真正的结束引号后面是空格、/ 或 >"""
+    result = []
+    i = 0
+    n = len(tag_content)
+    while i < n:
+        attr_match = ATTR_START.match(tag_content, i)
+        if not attr_match:
+            result.append(tag_content[i])
+            i += 1
+            continue
+        attr_name = attr_match.group(1)
+        i = attr_match.end()
+
+        value_chars = []
+        while i < n:
+            char = tag_content[i]
+            if char == '"':
+                next_char = tag_content[i + 1] if i + 1 < n else ''
+                if next_char in (' ', '/', '>', '\t', '\n', ''):
+                    break
+                # 不是真正的结束引号，丢弃
+                i += 1
+                continue
+            value_chars.append(char)
+            i += 1
+
+        result.append(f'{attr_name}="{"".join(value_chars)}"')
+        i += 1  # 跳过结束引号
+    return ''.join(result)
+
+
+def _fix_html_tag(match: re.Match) -> str:
+    tag = match.group(0)
+    # 不处理代码块占位符与闭合标签
+    if '__CODE_BLOCK_' in tag or tag.startswith('</'):
+        return tag
+
+    inner = tag[1:-1] if tag.endswith('>') else tag[1:]
+    is_self_closing = inner.endswith('/')
+    if is_self_closing:
+        inner = inner[:-1]
+
+    fixed = _fix_attributes(inner)
+    if is_self_closing or tag.startswith(('<img', '<br', '<hr')):
+        return f'<{fixed} />'
+    return f'<{fixed}>'
+
+
+def sanitize_for_mdx(content: str, diagnostics: Optional[List[Diagnostic]] = None) -> str:
+    """清理内容使其兼容 MDX（代码块与行内代码保持原样）"""
+    # 0. 先保护代码块
+    code_blocks = []
+
+    def save_code_block(match):
+        code_blocks.append(match.group(0))
+        return f"__CODE_BLOCK_{len(code_blocks) - 1}__"
+
+    def restore(text: str) -> str:
+        for i, block in enumerate(code_blocks):
+            text = text.replace(f"__CODE_BLOCK_{i}__", block)
+        return text
+
+    content = CODE_FENCE.sub(save_code_block, content)
+    content = INLINE_CODE.sub(save_code_block, content)
+
+    # 1. 自闭合标签：<br> -> <br />，<hr> -> <hr />
+    content = BR_TAG.sub('<br />', content)
+    content = HR_TAG.sub('<hr />', content)
+
+    # 2. 修复 HTML 标签中的属性问题（出错时按原文计算位置：前面的代码块占位符先还原）
+    def fix_tag(match: re.Match) -> str:
+        try:
+            return _fix_html_tag(match)
+        except Exception as e:
+            raise ConvertError.at("html-attributes", e, restore(match.string[:match.start()]),
+                                  match.group(0)) from e
+
+    content = HTML_TAG.sub(fix_tag, content)
+
+    # 3. 恢复代码块
+    content = restore(content)
+
+    # 4. 移除 HTML 注释（MDX 不支持）
+    if diagnostics is not None:
+        for match in HTML_COMMENT.finditer(content):
+            diagnostics.append(Diagnostic(
+                _line(content, match.start()), 1, "comment-removed",
+                "HTML 注释已移除（MDX 不支持），如需保留请改用 {/* */}"
+            ))
+    content = HTML_COMMENT.sub('', content)
+
+    # 5. 修复表格中的 <br> 标签
+    return TABLE_BR.sub(r'|\1<br />\2|', content)
+
+
+def upstream_title(filename: str) -> str:
+    """由上游文件名推导标题："1.1-什么是智能体.md" -> "什么是智能体\""""
+    stem = Path(filename).stem
+    match = NUMBERED_STEM.match(stem)
+    return match.group(3) if match else stem
+
+
+def add_frontmatter(content: str, title: str) -> str:
+    """没有 frontmatter 时添加 title / description（取代码块外的第一个 # 标题）"""
+    if content.startswith("---"):
+        return content
+    description = first_heading(content) or title
+    description = description.replace('"', '\\"')
+    return f'---\ntitle: "{title}"\ndescription: "{description}"\n---\n\n' + content
+
+
+# ---------------------------------------------------------------------------
+# vitepress 方言
+# ---------------------------------------------------------------------------
+
+def filename_to_title(filename: str) -> str:
+    """将文件名转换为标题"""
+    name = Path(filename).stem
+    # 移除数字前缀如 "1.1-"，连字符/下划线转为空格
+    name = TITLE_PREFIX.sub("", name)
+    name = name.replace("-", " ").replace("_", " ")
+    return name.strip() or "Untitled"
+
+
+def extract_title(content: str, filename: str) -> str:
+    """从代码块外的 H1 标题提取，没有时由文件名推导"""
+    return first_heading(content) or filename_to_title(filename)
+
+
+def simplify_frontmatter(
+    fm_content: str,
+    filename: str,
+    diagnostics: Optional[List[Diagnostic]] = None
+) -> str:
+    """只保留 title / description（多行值与其他字段丢弃）"""
+    result = {}
+    dropped = []
+    for line in fm_content.strip().split("\n"):
+        if ":" in line and not line.startswith(" "):
+            key, value = line.split(":", 1)
+            key = key.strip()
+            if key in KEPT_FIELDS:
+                result[key] = value.strip()
+            else:
+                dropped.append(key)
+
+    if "title" not in result:
+        result["title"] = filename_to_title(filename)
+    if dropped and diagnostics is not None:
+        diagnostics.append(Diagnostic(
+            2, 1, "frontmatter-dropped", f"frontmatter 字段已丢弃: {', '.join(dropped)}"
+        ))
+    return "\n".join(f"{k}: {v}" for k, v in result.items()) + "\n"
+
+
+def convert_frontmatter(content: str, filename: str, diagnostics: Optional[List[Diagnostic]] = None) -> str:
+    match = FRONTMATTER.match(content)
+    if match:
+        new_fm = simplify_frontmatter(match.group(1), filename, diagnostics)
+        return f"---\n{new_fm}---\n\n{content[match.end():]}"
+    return f"---\ntitle: {extract_title(content, filename)}\n---\n\n{content}"
+
+
+def convert_vue_to_jsx(content: str) -> str:
+    """Callout → Alert，CodeRun → CodePlayground，Demo → 图片"""
+    content = CALLOUT_OPEN.sub(r'<Alert type="\1">', content)
+    content = content.replace("</Callout>", "</Alert>")
+    content = CALLOUT_TITLED.sub(r'<Alert type="\1" title="\2">', content)
+    content = CODERUN_OPEN.sub(r'<CodePlayground language="\1" code={`', content)
+    content = content.replace("</CodeRun>", "`} />")
+    return DEMO_TAG.sub(r"![](\1)", content)
+
+
+def convert_html_tags(content: str) -> str:
+    """img / br / hr 自闭合，class -> className"""
+    content = IMG_TAG.sub(lambda m: f'<img src="{m.group(1)}"{m.group(2)} />', content)
+    content = content.replace("<br>", "<br />").replace("<hr>", "<hr />")
+    return CLASS_ATTR.sub(r"className=\1", content)
+
+
+# ---------------------------------------------------------------------------
+# 入口
+# ---------------------------------------------------------------------------
+
+def convert(text: str, options: Optional[ConvertOptions] = None) -> Tuple[str, List[Diagnostic]]:
+    """把一个页面转换为 MDX，返回 (MDX, 诊断)"""
+    options = options or ConvertOptions()
+    diagnostics: List[Diagnostic] = []
+
+    # (规则名, 步骤)：出错时以规则名报告
+    steps: List[Tuple[str, Callable[[str], str]]]
+    if options.dialect == "upstream":
+        steps = [("sanitize", lambda t: sanitize_for_mdx(t, diagnostics))] if options.sanitize else []
+        steps.append(("frontmatter", lambda t: add_frontmatter(t, options.title or upstream_title(options.filename))))
+    elif options.dialect == "vitepress":
+        steps = [
+            ("frontmatter", lambda t: convert_frontmatter(t, options.filename, diagnostics)),
+            ("vue-jsx", convert_vue_to_jsx),
+            ("html-tags", convert_html_tags),
+        ]
+    else:
+        raise ValueError(f"未知的方言: {options.dialect}（可选: {', '.join(DIALECTS)}）")
+
+    for rule, step in steps:
+        try:
+            text = step(text)
+        except ConvertError:
+            raise
+        except Exception as e:
+            raise ConvertError.at(rule, e) from e
+
+    if options.lint:
+        diagnostics.extend(lint(text))
+    return text, diagnostics
+
+
+Item = Union[str, Tuple[str, ConvertOptions]]
+
+
+def _convert_item(item: Item) -> Tuple[str, List[Diagnostic]]:
+    if isinstance(item, str):
+        return convert(item)
+    return convert(*item)
+
+
+@dataclass
+class ConvertResult:
+    text: Optional[str] = None
+    diagnostics: List[Diagnostic] = field(default_factory=list)
+    error: Optional[ConvertError] = None
+
+
+def _convert_isolated(items: List[Item]) -> List[ConvertResult]:
+    """在工作进程中转换一批页面；单个页面的异常只记录在它的结果中"""
+    results = []
+    for item in items:
+        try:
+            text, diagnostics = _convert_item(item)
+            results.append(ConvertResult(text, diagnostics))
+        except ConvertError as e:
+            results.append(ConvertResult(error=e))
+        except Exception as e:
+            results.append(ConvertResult(error=ConvertError.at("convert", e)))
+    return results
+
+
+def convert_many(
+    items: Iterable[Item],
+    workers: Optional[int] = None,
+    chunksize: Optional[int] = None
+) -> Iterator[Tuple[str, List[Diagnostic]]]:
+    """
+    批量转换，按输入顺序产出结果
+
+    items 为文本或 (文本, ConvertOptions)。workers 为 None 或 1 时在当前进程中逐个转换；
+    否则在 workers 个进程中执行，页面按 chunksize 分批发送以摊薄进程间通信。
+    """
+    if not workers or workers <= 1:
+        for item in items:
+            yield _convert_item(item)
+        return
+
+    items = list(items)
+    if chunksize is None:
+        chunksize = max(1, len(items) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1, max(1, len(items)))) as pool:
+        yield from pool.map(_convert_item, items, chunksize=chunksize)
+
+
+def convert_stream(
+    jobs: Iterable[Tuple[Any, Item]],
+    workers: Optional[int] = None,
+    chunksize: int = 8,
+    window: Optional[int] = None
+) -> Iterator[Tuple[Any, ConvertResult]]:
+    """
+    流式并行转换，按输入顺序产出 (标签, ConvertResult)
+
+    jobs 为 (标签, 文本或 (文本, ConvertOptions))，按需取用：在途的页面不超过
+    window × chunksize 个（默认 window = workers × 2），内存与源站点大小无关。
+    标签不发送到工作进程，原样随结果返回。
+
+    单个页面出错记录在 ConvertResult.error 中；工作进程崩溃（BrokenProcessPool）时
+    只有当时在途的页面记为失败（规则 worker），其余页面在新的进程池中继续。
+    workers 为 None 或 1 时在当前进程中转换，错误同样逐页隔离。
+    """
+    if not workers or workers <= 1:
+        for tag, item in jobs:
+            yield tag, _convert_isolated([item])[0]
+        return
+
+    window = window or workers * 2
+    workers = min(workers, os.cpu_count() or 1)
+    jobs = iter(jobs)
+    pending: deque = deque()    # (标签列表, future)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                chunk = [job for _, job in zip(range(chunksize), jobs)]
+                if not chunk:
+                    exhausted = True
+                    break
+                tags = [tag for tag, _ in chunk]
+                pending.append((tags, pool.submit(_convert_isolated, [item for _, item in chunk])))
+            if not pending:
+                break
+            tags, future = pending.popleft()
+            try:
+                results = future.result()
+            except BrokenProcessPool as e:
+                # 在途的批次全部失败，之后的页面使用新的进程池
+                failed = [tags] + [t for t, _ in pending]
+                pending.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+                for batch in failed:
+                    for tag in batch:
+                        yield tag, ConvertResult(error=ConvertError.at("worker", e))
+                continue
+            yield from zip(tags, results)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,109 @@
+"""
+派生产物依赖图
+==============
+
+同步生成的导航文件只依赖页面的导航属性，而不依赖正文：
+
+    页面 (slug, 标题, 顺序) ─────────────────────> 章节 _meta.json
+    根目录页面 / 有页面的章节 / learning-map 等 ──> 根 _meta.json
+    源 index.md (mtime, 大小) ──────────────────> index.mdx
+
+每个产物记录它的输入及输入的指纹。本次运行重新登记后与上次保存的图比较：
+输入集合或任一指纹变化、或输入被显式标记为已改动的产物需要重新生成；
+产物本身也可以是其他产物的输入，受影响集合沿依赖边传递。
+
+因此只改正文的页面只会重写对应的 .mdx，不会让整站导航在 Nextra 构建缓存中失效。
+
+文件格式（默认 apps/docs/.cache/nav-graph.json）：
+    {"version": 1, "scope": "<目标目录>", "inputs": {"chapter-01/_meta.json": {"page:chapter01/1.1-x.md": "..."}}}
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from .fsutil import write_text_atomic
+
+GRAPH_VERSION = 1
+
+
+class DependencyGraph:
+    def __init__(self, inputs: Optional[Dict[str, Dict[str, str]]] = None):
+        self.inputs: Dict[str, Dict[str, str]] = inputs or {}   # 产物 -> {输入: 指纹}
+
+    def depend(self, artifact: str, node: str, fingerprint: str = "") -> None:
+        """登记 artifact 依赖 node（指纹为 node 中与 artifact 相关的部分）"""
+        self.inputs.setdefault(artifact, {})[node] = fingerprint
+
+    def declare(self, artifact: str) -> None:
+        """登记一个（可能没有输入的）产物"""
+        self.inputs.setdefault(artifact, {})
+
+    def dependents(self) -> Dict[str, Set[str]]:
+        reverse: Dict[str, Set[str]] = {}
+        for artifact, inputs in self.inputs.items():
+            for node in inputs:
+                reverse.setdefault(node, set()).add(artifact)
+        return reverse
+
+    def affected(self, previous: Optional["DependencyGraph"], changed: Iterable[str] = ()) -> Set[str]:
+        """
+        需要重新生成的产物
+
+        previous 为 None（没有历史、全量同步）时全部产物都受影响；
+        changed 为显式标记为已改动的输入（例如正文变化的源文件）。
+        """
+        if previous is None:
+            return set(self.inputs)
+        result = {a for a, inputs in self.inputs.items() if previous.inputs.get(a) != inputs}
+        reverse = self.dependents()
+        for node in changed:
+            result |= reverse.get(node, set())
+        # 沿依赖边传递：产物变化时，依赖它的产物同样受影响
+        pending = list(result)
+        while pending:
+            for dependent in reverse.get(pending.pop(), ()):
+                if dependent not in result:
+                    result.add(dependent)
+                    pending.append(dependent)
+        return result
+
+    def explain(self, artifact: str, previous: Optional["DependencyGraph"]) -> List[str]:
+        """artifact 受影响的原因（新增 / 移除 / 变化的输入），用于日志"""
+        if previous is None or artifact not in previous.inputs:
+            return ["首次生成"]
+        before = previous.inputs[artifact]
+        after = self.inputs.get(artifact, {})
+        reasons = [f"+{n}" for n in after if n not in before]
+        reasons += [f"-{n}" for n in before if n not in after]
+        reasons += [f"~{n}" for n in after if n in before and before[n] != after[n]]
+        return reasons
+
+    @classmethod
+    def load(cls, path: Path, scope: str) -> Optional["DependencyGraph"]:
+        """读取上次保存的图；不存在、版本或作用域（目标目录）不同时返回 None"""
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if data.get("version") != GRAPH_VERSION or data.get("scope") != scope:
+            return None
+        return cls(data.get("inputs", {}))
+
+    def save(self, path: Path, scope: str, keep: Optional["DependencyGraph"] = None) -> None:
+        """
+        保存本次的图
+
+        keep 为上次的图时保留本次没有登记的产物（只同步了部分章节）。
+        """
+        inputs = dict(keep.inputs) if keep is not None else {}
+        inputs.update(self.inputs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "version": GRAPH_VERSION,
+            "scope": scope,
+            "inputs": {a: dict(sorted(n.items())) for a, n in sorted(inputs.items())},
+        }
+        write_text_atomic(path, json.dumps(data, indent=1, ensure_ascii=False) + "\n")
@@ -0,0 +1,199 @@
+"""
+Mermaid 图表提取
+================
+
+把 ```mermaid 代码块写成按内容哈希命名的静态文件，页面中只保留引用：
+
+    <Diagram src="/assets/diagrams/<hash>.mmd" />
+    <Diagram src="/assets/diagrams/<hash>.mmd" svg="/assets/diagrams/<hash>.svg" />   # 已预渲染
+
+Diagram 在进入视口时才加载图表源码与 mermaid 运行时；有 svg 时直接显示图片，不加载运行时。
+没有图表的页面不引用 Diagram，不会下载任何图表相关的代码。
+
+可选的预渲染（--diagram-renderer）：
+    stub             本地替身：生成包含图表源码的占位 SVG，用于测试与基准
+    mmdc             调用 @mermaid-js/mermaid-cli（mmdc 需要在 PATH 中）
+    模块:函数         任意 (source: str) -> str 的函数，返回 SVG
+渲染结果按 hash(渲染器 + 图表) 缓存在 .cache/diagrams/，渲染过的图表不会再次渲染；
+渲染失败的图表退回客户端渲染。
+
+输出目录（默认 public/assets/diagrams）：
+    <hash>.mmd / <hash>.svg
+    manifest.json    {页面路径: {"runtime": 是否需要客户端运行时, "diagrams": [{hash, src, svg, bytes}]}}
+"""
+
+import hashlib
+import importlib
+import json
+import re
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from xml.sax.saxutils import escape
+
+from .fsutil import write_text_atomic
+
+MERMAID_PATTERN = re.compile(
+    r"^(?P<fence>```+|~~~+)[ \t]*mermaid[ \t]*\n(?P<body>[\s\S]*?)\n?^(?P=fence)[ \t]*$",
+    re.MULTILINE
+)
+HASH_LENGTH = 16
+
+
+class StubRenderer:
+    """本地替身：不解析图表，只把源码放进一个占位 SVG"""
+    name = "stub"
+
+    def render(self, source: str) -> str:
+        lines = source.splitlines() or [""]
+        height = 20 * len(lines) + 20
+        text = "".join(
+            f'<text x="10" y="{20 * (i + 1)}">{escape(line)}</text>' for i, line in enumerate(lines)
+        )
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="640" height="{height}" '
+                f'font-family="monospace" font-size="13">{text}</svg>\n')
+
+
+class CommandRenderer:
+    """调用 mermaid-cli：mmdc -i <in.mmd> -o <out.svg>"""
+    name = "mmdc"
+
+    def __init__(self, command: str = "mmdc", timeout: int = 60):
+        self.command = shutil.which(command)
+        if self.command is None:
+            raise ValueError(f"找不到 {command}（npm install -g @mermaid-js/mermaid-cli）")
+        self.timeout = timeout
+
+    def render(self, source: str) -> str:
+        with tempfile.TemporaryDirectory() as tmp:
+            src, out = Path(tmp) / "diagram.mmd", Path(tmp) / "diagram.svg"
+            src.write_text(source, encoding="utf-8")
+            subprocess.run(
+                [self.command, "-i", str(src), "-o", str(out), "--quiet"],
+                check=True, capture_output=True, timeout=self.timeout
+            )
+            return out.read_text(encoding="utf-8")
+
+
+class FunctionRenderer:
+    """任意 (source) -> SVG 函数，以 "包.模块:函数" 指定"""
+
+    def __init__(self, spec: str):
+        module, _, attr = spec.partition(":")
+        self.name = spec
+        self.func: Callable[[str], str] = getattr(importlib.import_module(module), attr)
+
+    def render(self, source: str) -> str:
+        return self.func(source)
+
+
+def load_renderer(spec: Optional[str]):
+    """按名称创建渲染器；None 时不预渲染"""
+    if not spec:
+        return None
+    if spec == "stub":
+        return StubRenderer()
+    if spec == "mmdc":
+        return CommandRenderer()
+    if ":" in spec:
+        return FunctionRenderer(spec)
+    raise ValueError(f"未知的图表渲染器: {spec}（可选: stub、mmdc、模块:函数）")
+
+
+class DiagramExtractor:
+    def __init__(
+        self,
+        public_dir: Path,
+        url_prefix: str = "/assets/diagrams",
+        renderer=None,
+        cache_dir: Optional[Path] = None,
+        dry_run: bool = False
+    ):
+        self.url_prefix = "/" + url_prefix.strip("/")
+        self.out_dir = public_dir / url_prefix.strip("/")
+        self.renderer = renderer
+        self.cache_dir = cache_dir / "diagrams" if cache_dir is not None else None
+        self.dry_run = dry_run
+        self.manifest: Dict[str, Dict] = {}
+        self.written = set()
+        self.warnings: List[str] = []
+        self.stats = {"diagrams": 0, "rendered": 0, "cached": 0, "failed": 0}
+
+    def write_asset(self, name: str, data: bytes) -> None:
+        target = self.out_dir / name
+        if not self.dry_run and name not in self.written and not target.exists():
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+        self.written.add(name)
+
+    def prerender(self, digest: str, source: str) -> Optional[str]:
+        """返回 SVG 的 URL；没有渲染器或渲染失败时返回 None"""
+        if self.renderer is None:
+            return None
+        key = hashlib.sha256(f"{self.renderer.name}\0{source}".encode("utf-8")).hexdigest()[:HASH_LENGTH]
+        cached = self.cache_dir / f"{key}.svg" if self.cache_dir is not None else None
+        if cached is not None and cached.exists():
+            self.stats["cached"] += 1
+            svg = cached.read_bytes()
+        else:
+            try:
+                svg = self.renderer.render(source).encode("utf-8")
+            except Exception as e:
+                self.stats["failed"] += 1
+                self.warnings.append(f"图表 {digest} 预渲染失败（{self.renderer.name}）: {e}")
+                return None
+            self.stats["rendered"] += 1
+            if cached is not None and not self.dry_run:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                cached.write_bytes(svg)
+        self.write_asset(f"{key}.svg", svg)
+        return f"{self.url_prefix}/{key}.svg"
+
+    def extract(self, content: str, page: str) -> str:
+        """提取页面中的全部 mermaid 代码块，返回改写后的内容"""
+        diagrams = []
+
+        def replace(match: re.Match) -> str:
+            source = match.group("body").strip("\n")
+            data = source.encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+            self.write_asset(f"{digest}.mmd", data)
+            entry = {"hash": digest, "src": f"{self.url_prefix}/{digest}.mmd", "bytes": len(data)}
+            svg = self.prerender(digest, source)
+            if svg is not None:
+                entry["svg"] = svg
+            diagrams.append(entry)
+            self.stats["diagrams"] += 1
+            attrs = f'src="{entry["src"]}"' + (f' svg="{svg}"' if svg else "")
+            return f"<Diagram {attrs} />"
+
+        content = MERMAID_PATTERN.sub(replace, content)
+        if diagrams:
+            self.manifest[page] = {
+                "runtime": any("svg" not in d for d in diagrams),
+                "diagrams": diagrams,
+            }
+        return content
+
+    def save(self) -> None:
+        """合并写入 manifest（保留其他页面的条目）"""
+        if self.dry_run or not self.manifest:
+            return
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.out_dir / "manifest.json"
+        manifest = {}
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest.update(self.manifest)
+        write_text_atomic(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+    def summary(self) -> str:
+        runtime = sum(1 for entry in self.manifest.values() if entry["runtime"])
+        text = (f"提取图表 {self.stats['diagrams']} 个（{len(self.written)} 个文件），"
+                f"涉及 {len(self.manifest)} 个页面，其中 {runtime} 个需要客户端渲染")
+        if self.renderer is not None:
+            text += (f"；预渲染 {self.stats['rendered']}，缓存命中 {self.stats['cached']}，"
+                     f"失败 {self.stats['failed']}（{self.renderer.name}）")
+        return text
@@ -0,0 +1,257 @@
+"""
+结构化事件日志与进度显示
+========================
+
+内容脚本共用的日志出口，代替逐文件 print：
+
+    events = EventLog("sync_from_source", mode="progress", sink="sync-events.jsonl")
+    events.section("[chapter-01] 同步中...", detail=True)
+    events.start(total=len(pages), label="同步")
+    events.log("a.md -> a.mdx", file="chapter01/a.md")
+    events.advance()
+    events.emit("summary", created=3, errors=0)
+    events.close()          # 结束进度行、打印警告/错误汇总、刷新事件流
+
+显示模式：
+    lines       每条消息一行（原有的输出）
+    progress    逐文件的 INFO / SKIP / DRY 消息只进入事件流，终端只保留一行进度
+                （完成数、速率、剩余时间），警告与错误照常打印，结束时给出条数
+    quiet       只打印最终报告，警告与错误在结束时汇总列出
+
+事件流（--events）：JSON Lines，写入文件路径或 fd:N，缓冲写入，结束时一次刷新：
+    {"ts": 1760000000.123, "tool": "sync_from_source", "event": "log", "level": "info",
+     "msg": "...", "file": "chapter01/a.md"}
+事件类型：log / section / progress（进度结束时）/ 脚本自定义（如 summary）。
+
+命令行（各脚本一致）：--verbose 为 lines，--quiet 为 quiet，默认 progress（--dry-run 时 lines）；
+--events 给出事件流。open_events 创建的日志在解释器退出时自动 close（sys.exit 之前未 close 的情况），
+直接构造的 EventLog（工具的默认日志、测试）不注册退出钩子，随引用释放。
+
+- 进度行限速重绘：终端每 0.1 秒，非终端（CI 日志）每 5 秒输出一行
+- 人类可读输出不逐行 flush；只有进度重绘时 flush
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from typing import List, Optional, TextIO, Tuple
+
+MODES = ("lines", "progress", "quiet")
+SYMBOLS = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗", "DRY": "○", "SKIP": "→"}
+# 逐文件的细节消息：progress / quiet 模式下不打印
+DETAIL_LEVELS = ("INFO", "DRY", "SKIP")
+
+BUFFER_SIZE = 1 << 16
+TTY_INTERVAL = 0.1
+PLAIN_INTERVAL = 5.0
+# 结束时每种级别最多列出的条数（完整内容在事件流中）
+SUMMARY_LIMIT = 20
+
+
+def open_sink(spec: str) -> TextIO:
+    """打开事件流：fd:N 或文件路径（覆盖写入）"""
+    if spec.startswith("fd:"):
+        return os.fdopen(int(spec[3:]), "w", buffering=BUFFER_SIZE, encoding="utf-8", closefd=False)
+    os.makedirs(os.path.dirname(os.path.abspath(spec)), exist_ok=True)
+    return open(spec, "w", buffering=BUFFER_SIZE, encoding="utf-8")
+
+
+def open_events(
+    tool: str,
+    verbose: bool = False,
+    quiet: bool = False,
+    sink: Optional[str] = None,
+    dry_run: bool = False
+) -> "EventLog":
+    """按命令行参数创建（--verbose / --quiet / --events）；默认 progress，预览模式默认逐行列出"""
+    if quiet:
+        mode = "quiet"
+    elif verbose or dry_run:
+        mode = "lines"
+    else:
+        mode = "progress"
+    events = EventLog(tool, mode=mode, sink=sink)
+    atexit.register(events.close)
+    return events
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class EventLog:
+    def __init__(
+        self,
+        tool: str,
+        mode: str = "lines",
+        sink: Optional[str] = None,
+        stream: Optional[TextIO] = None
+    ):
+        if mode not in MODES:
+            raise ValueError(f"未知的输出模式: {mode}（可选: {', '.join(MODES)}）")
+        self.tool = tool
+        self.mode = mode
+        self.stream = stream if stream is not None else sys.stdout
+        self.sink = open_sink(sink) if sink else None
+        self.tty = self.stream.isatty()
+        self.interval = TTY_INTERVAL if self.tty else PLAIN_INTERVAL
+        self.problems: List[Tuple[str, str]] = []   # (级别, 消息)
+
+        # 进度
+        self.label = ""
+        self.total: Optional[int] = None
+        self.done = 0
+        self.started = 0.0
+        self.drawn = 0.0
+        self.active = False
+        self.line_open = False
+        self.closed = False
+        # 可以从多个线程记录（如并发的链接重写）
+        self.lock = threading.RLock()
+
+    # ---- 事件流 ----
+
+    def emit(self, event: str, **fields) -> None:
+        if self.sink is None:
+            return
+        record = {"ts": round(time.time(), 3), "tool": self.tool, "event": event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        with self.lock:
+            self.sink.write(line)
+
+    # ---- 人类可读输出 ----
+
+    def write(self, text: str) -> None:
+        with self.lock:
+            self.clear_line()
+            self.stream.write(text + "\n")
+
+    def clear_line(self) -> None:
+        if self.line_open:
+            self.stream.write("\r\033[K")
+            self.line_open = False
+
+    def log(self, msg: str, level: str = "INFO", detail: Optional[bool] = None, **fields) -> None:
+        """
+        一条消息：写入事件流；是否打印取决于模式与级别
+
+        detail 默认由级别决定（INFO / DRY / SKIP 为细节）；阶段的小结传 detail=False，
+        在 progress 模式下照常打印。
+        """
+        self.emit("log", level=level.lower(), msg=msg, **fields)
+        if detail is None:
+            detail = level in DETAIL_LEVELS
+        if detail:
+            if self.mode == "lines":
+                self.write(f"  {SYMBOLS.get(level, '•')} {msg}")
+            return
+        if level not in DETAIL_LEVELS:
+            self.problems.append((level, msg))
+        if self.mode != "quiet":
+            self.write(f"  {SYMBOLS.get(level, '•')} {msg}")
+
+    def section(self, text: str, detail: bool = False) -> None:
+        """阶段标题；detail 为 True 的标题（如每个章节）只在 lines 模式下打印"""
+        if text.strip("=- \n"):
+            self.emit("section", msg=text.strip())
+        if self.mode == "lines" or (self.mode == "progress" and not detail):
+            self.write(text)
+
+    def echo(self, text: str = "") -> None:
+        """最终报告：所有模式下都打印"""
+        self.write(text)
+
+    # ---- 进度 ----
+
+    def start(self, total: Optional[int] = None, label: str = "") -> None:
+        """开始一段进度；total 未知时可以用 grow 逐步增加"""
+        self.finish()
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.started = self.drawn = time.monotonic()
+        self.active = True
+
+    def grow(self, n: int) -> None:
+        self.total = (self.total or 0) + n
+
+    def advance(self, n: int = 1) -> None:
+        if not self.active:
+            return
+        with self.lock:
+            self.done += n
+            if self.mode != "progress":
+                return
+            now = time.monotonic()
+            if now - self.drawn >= self.interval:
+                self.drawn = now
+                self.draw(now)
+
+    def draw(self, now: float) -> None:
+        elapsed = max(now - self.started, 1e-9)
+        rate = self.done / elapsed
+        text = f"  [{self.label}] {self.done}"
+        if self.total:
+            text += f"/{self.total}  {min(self.done / self.total, 1.0):.0%}"
+        text += f"  {rate:.0f} 个/秒"
+        if self.total and rate > 0 and self.done < self.total:
+            text += f"  剩余 {format_duration((self.total - self.done) / rate)}"
+        if self.tty:
+            self.stream.write("\r\033[K" + text)
+            self.line_open = True
+        else:
+            self.stream.write(text + "\n")
+        self.stream.flush()
+
+    def finish(self) -> None:
+        """结束当前进度：打印最终的进度行并记录 progress 事件"""
+        if not self.active:
+            return
+        self.active = False
+        elapsed = time.monotonic() - self.started
+        self.emit("progress", label=self.label, done=self.done, total=self.total, elapsed=round(elapsed, 3))
+        if self.mode == "progress" and self.done:
+            self.draw(time.monotonic())
+            if self.tty:
+                self.stream.write("\n")
+                self.line_open = False
+
+    # ---- 结束 ----
+
+    def summary(self) -> None:
+        """
+        汇总警告与错误：progress 模式只给出条数（已逐条打印），
+        quiet 模式逐条列出（每种级别最多 SUMMARY_LIMIT 条）
+        """
+        if self.mode == "lines" or not self.problems:
+            return
+        warnings = [msg for level, msg in self.problems if level == "WARN"]
+        errors = [msg for level, msg in self.problems if level != "WARN"]
+        self.write(f"\n警告 {len(warnings)} 条，错误 {len(errors)} 条")
+        if self.mode != "quiet":
+            return
+        for level, messages in (("ERROR", errors), ("WARN", warnings)):
+            for msg in messages[:SUMMARY_LIMIT]:
+                self.write(f"  {SYMBOLS[level]} {msg}")
+            if len(messages) > SUMMARY_LIMIT:
+                more = len(messages) - SUMMARY_LIMIT
+                self.write(f"  … 另有 {more} 条" + ("（见事件流）" if self.sink else ""))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        # open_events 注册的退出钩子不再需要，释放对本实例的引用
+        atexit.unregister(self.close)
+        self.finish()
+        self.summary()
+        self.stream.flush()
+        if self.sink is not None:
+            self.sink.close()
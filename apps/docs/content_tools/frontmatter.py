@@ -0,0 +1,170 @@
+"""
+页面头部读取
+============
+
+导航只需要页面的 frontmatter 与第一个标题，不必读入整个页面：
+
+    head = read_head(path)                 # 只读开头几 KB
+    head.fields.get("title"), head.heading
+
+- 只认文件开头 --- 与 --- 之间的 frontmatter；正文与代码块里的 title: 行不会被当作标题
+- 第一个标题跳过 ``` / ~~~ 代码块（shell 注释 # ... 不是标题）
+- 先读 4 KB，frontmatter 未闭合或还没遇到标题时再扩大到 16 KB、64 KB，之后不再继续
+- TitleCache 按 路径 + 大小 + mtime 缓存标题（默认 apps/docs/.cache/titles.json），
+  未改动的页面不会被打开
+"""
+
+import io
+import json
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from .fsutil import write_text_atomic
+
+# 依次尝试的读取大小（字节）
+HEAD_SIZES = (4 * 1024, 16 * 1024, 64 * 1024)
+CACHE_VERSION = 1
+
+FENCE = re.compile(r"^\s{0,3}(`{3,}|~{3,})")
+HEADING = re.compile(r"^#[ \t]+(.+?)(?:[ \t]+#+)?[ \t]*\r?$")
+FIELD = re.compile(r"^([A-Za-z_][\w-]*):[ \t]*(.*?)\s*$")
+
+
+@dataclass
+class PageHead:
+    fields: Dict[str, str] = field(default_factory=dict)   # frontmatter 顶层的 key: value
+    heading: Optional[str] = None                          # 第一个 # 标题（代码块外）
+    has_frontmatter: bool = False
+
+    @property
+    def title(self) -> Optional[str]:
+        """frontmatter 的 title，没有时取第一个 # 标题"""
+        return self.fields.get("title") or self.heading
+
+
+def unquote(value: str) -> str:
+    """去掉 YAML 标量两侧的引号（"..." 按 JSON 转义解析）"""
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def first_heading(lines: Union[str, Iterable[str]]) -> Optional[str]:
+    """第一个代码块外的 # 标题；传入文本时逐行扫描，遇到标题即停止"""
+    if isinstance(lines, str):
+        lines = io.StringIO(lines)
+    fence = None
+    for line in lines:
+        match = FENCE.match(line)
+        if fence is not None:
+            if match and match.group(1)[0] == fence[0] and len(match.group(1)) >= len(fence):
+                fence = None
+            continue
+        if match:
+            fence = match.group(1)
+            continue
+        match = HEADING.match(line)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_head(text: str, complete: bool = True, heading: bool = True) -> Tuple[PageHead, bool]:
+    """
+    解析页面开头，返回 (PageHead, 是否已得到所需信息)
+
+    complete 为 False 时 text 只是文件的前缀，最后一行可能不完整而被忽略；
+    heading 为 False 时 frontmatter 中已有 title 就不再寻找 # 标题。
+    """
+    lines = text.split("\n")
+    if not complete:
+        lines.pop()
+    lines = [line.rstrip("\r") for line in lines]
+
+    head = PageHead()
+    body = 0
+    if lines and lines[0].strip() == "---":
+        for end in range(1, len(lines)):
+            if lines[end].strip() == "---":
+                break
+        else:
+            # frontmatter 尚未闭合（或根本没有闭合）
+            return head, complete
+        head.has_frontmatter = True
+        for line in lines[1:end]:
+            match = FIELD.match(line)
+            if match:
+                head.fields[match.group(1)] = unquote(match.group(2))
+        body = end + 1
+        if not heading and "title" in head.fields:
+            return head, True
+
+    head.heading = first_heading(lines[body:])
+    return head, complete or head.heading is not None
+
+
+def read_head(path: Path, storage=None, heading: bool = True) -> PageHead:
+    """
+    只读取页面开头解析 frontmatter 与第一个标题
+
+    storage 为 None 时直接读本地文件，否则经过 Storage.read_prefix。
+    """
+    for size in HEAD_SIZES:
+        if storage is not None:
+            data = storage.read_prefix(path, size)
+        else:
+            with open(path, "rb") as f:
+                data = f.read(size)
+        complete = len(data) < size
+        # 截断处可能切开多字节字符，由 complete=False 丢弃的最后一行承担
+        head, done = parse_head(data.decode("utf-8", errors="ignore"), complete, heading)
+        if done:
+            return head
+    return head
+
+
+class TitleCache:
+    """按 路径 + 大小 + mtime 缓存页面标题；path 为 None 时只在本次运行内缓存"""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.entries: Dict[str, list] = {}   # 页面路径 -> [大小, mtime, 标题]
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path is not None and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("version") == CACHE_VERSION:
+                self.entries = data.get("titles", {})
+
+    def title(self, page: Path, storage=None) -> Optional[str]:
+        """页面的标题（frontmatter title，其次第一个 # 标题），没有时返回 None"""
+        st = storage.stat(page) if storage is not None else page.stat()
+        key = str(page)
+        entry = self.entries.get(key)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        title = read_head(page, storage, heading=False).title
+        self.entries[key] = [st.st_size, st.st_mtime, title]
+        self._dirty = True
+        return title
+
+    def save(self) -> None:
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": CACHE_VERSION, "titles": dict(sorted(self.entries.items()))}
+        write_text_atomic(self.path, json.dumps(data, indent=1, ensure_ascii=False) + "\n")
+        self._dirty = False
@@ -0,0 +1,23 @@
+"""
+文件系统工具
+"""
+
+import os
+from pathlib import Path
+
+
+def write_bytes_atomic(path: Path, data: bytes) -> None:
+    """
+    原子写入：先写临时文件再 rename
+
+    rename 会为目标分配新的 inode，因此与快照共享的硬链接不会被修改（修改时复制），
+    进程中途退出也不会留下写了一半的文件。
+    """
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def write_text_atomic(path: Path, content: str) -> None:
+    """原子写入文本（UTF-8），见 write_bytes_atomic"""
+    write_bytes_atomic(path, content.encode("utf-8"))
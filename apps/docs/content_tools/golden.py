@@ -0,0 +1,300 @@
+"""
+转换器黄金语料
+==============
+
+golden_corpus.py 使用的语料、快照与逐字节比较，用来证明转换器的改写（性能优化等）不改变输出：
+
+    cases = build_corpus(content_dir)                      # content 目录的页面 + 生成的边界用例
+    results = run_cases(cases, TARGETS, candidate="fast_convert:sanitize_for_mdx", target="sanitize")
+    snapshot = make_snapshot(cases, results)
+
+比较的目标（候选函数与被替换的函数签名相同）：
+    sanitize      sanitize_for_mdx(content) -> str
+    frontmatter   convert_frontmatter(content, filename) -> str         （vitepress 方言）
+    upstream      convert(text, ConvertOptions(...)) -> (text, 诊断)     （sync_from_source 的 convert_content）
+    vitepress     convert(text, ConvertOptions(dialect="vitepress", ...)) -> (text, 诊断)
+诊断不参与比较，只比较输出文本的 UTF-8 字节。
+
+快照只保存内容哈希：{用例: {"input": 输入哈希, 目标: 输出哈希}}。输入哈希改变的用例
+（content 页面被修改）记为 stale，不视为输出改变。
+
+- 用例在工作进程中执行，参考实现与候选在同一进程中对同一输入交替运行，
+  计时只包含转换调用本身（重复 repeat 次取最短），速度比不受并行度影响
+- 只有输出不一致的用例把两份输出传回主进程，用于给出最小上下文的字节差异
+- 边界用例由固定的片段与固定种子的随机组合生成，每次运行相同
+"""
+
+import importlib
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .convert import ConvertOptions, convert, convert_frontmatter, sanitize_for_mdx
+from .route_manifest import content_digest
+from .walk import walk
+
+SNAPSHOT_VERSION = 1
+TARGETS = ("sanitize", "frontmatter", "upstream", "vitepress")
+REFERENCE: Dict[str, Callable] = {
+    "sanitize": sanitize_for_mdx,
+    "frontmatter": convert_frontmatter,
+    "upstream": convert,
+    "vitepress": convert,
+}
+# 差异两侧显示的上下文字节数
+CONTEXT_BYTES = 24
+MIXED_CASES = 48
+MIXED_SEED = 20241019
+
+
+@dataclass
+class Case:
+    name: str           # content/<相对路径> 或 edge/<名称>
+    text: str
+    filename: str       # 标题推导使用的文件名
+
+    @property
+    def digest(self) -> str:
+        return content_digest(self.text.encode("utf-8"))
+
+
+@dataclass
+class CaseResult:
+    name: str
+    digests: Dict[str, str] = field(default_factory=dict)             # 目标 -> 参考输出哈希
+    candidate: Dict[str, str] = field(default_factory=dict)           # 目标 -> 候选输出哈希
+    elapsed: Dict[str, float] = field(default_factory=dict)           # 参考用时（秒）
+    candidate_elapsed: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)              # 目标 -> 候选抛出的异常
+    outputs: Dict[str, Tuple[bytes, bytes]] = field(default_factory=dict)   # 不一致时 (参考, 候选)
+
+
+# ---------------------------------------------------------------------------
+# 语料
+# ---------------------------------------------------------------------------
+
+# 边界用例：针对 sanitize 的代码块保护、HTML 属性修复、注释删除、表格 <br>，
+# 以及 frontmatter 的有无、引号、多行值与标题推导
+EDGE_CASES: Dict[str, str] = {
+    "empty": "",
+    "only-newlines": "\n\n\n",
+    "no-trailing-newline": "# 标题\n正文",
+    "crlf": "# 标题\r\n\r\n第一行<br>\r\n| a | b<br>c |\r\n",
+    "frontmatter-only": "---\ntitle: 只有 frontmatter\n---\n",
+    "frontmatter-unclosed": "---\ntitle: 没有结束\n\n# 标题\n",
+    "frontmatter-extra-fields": "---\ntitle: 标题\norder: 3\ntags:\n  - a\n  - b\ndescription: 描述\n---\n\n正文\n",
+    "frontmatter-quoted": '---\ntitle: "带 \\"引号\\" 的标题"\n---\n\n正文\n',
+    "frontmatter-not-at-start": "\n---\ntitle: 不在开头\n---\n",
+    "heading-with-quotes": '# 带 "引号" 的标题\n\n正文\n',
+    "heading-in-code-only": "```md\n# 代码块里的标题\n```\n\n正文\n",
+    "setext-heading": "标题\n====\n\n正文\n",
+    "br-variants": "a<br>b<BR>c<br/>d<br />e<br   >f\n",
+    "hr-variants": "<hr>\n<hr/>\n<HR >\n",
+    "table-br": "| 列 | 说明 |\n|----|------|\n| a | 第一行<br>第二行 |\n| b | x<br>y<br>z |\n",
+    "html-attributes": '<div class="note" style="color: red; font-size: 12px" onclick="f()">x</div>\n',
+    "html-attribute-edge": "<span class='a' data-x=\"1\" hidden>y</span>\n<img src=\"a.png\" alt=\"图\">\n",
+    "html-comment": "前<!-- 注释 -->后\n<!--\n多行\n注释\n-->\n",
+    "comment-in-code": "```html\n<!-- 保留 -->\n<br>\n```\n`<!-- 行内 -->`\n",
+    "fence-tilde": "~~~\n<br>\n~~~\n<br>\n",
+    "fence-long": "````md\n```\n<br>\n```\n````\n",
+    "fence-unclosed": "```python\nprint('<br>')\n",
+    "inline-code-placeholder": "`__CODE_BLOCK_0__` 与 __CODE_BLOCK_0__ <br>\n",
+    "braces": "函数 {a: 1} 与 {{ 双括号 }} 和 `{code}`\n",
+    "less-than": "a < b，x <3，<https://example.com>\n",
+    "vue-callout": '<Callout type="tip">\n提示\n</Callout>\n<Callout type="warning" title="注意">\n内容\n</Callout>\n',
+    "vue-coderun": '<CodeRun lang="python">\nprint("`反引号`")\n</CodeRun>\n',
+    "vue-demo": '<Demo src="/demo/a.png" />\n',
+    "class-attr": '<p class="lead">段落</p>\n<div class=\'x\'>y</div>\n',
+    "unicode": "# 中文标题 😀\n\n全角（括号）、零宽​字符、组合 é\n",
+    "nul-and-controls": "a\x00b\x07c\n",
+    "long-line": "x<br>" * 2000 + "\n",
+    "many-code-blocks": "".join(f"```\n<br>{i}\n```\n<br>\n" for i in range(200)),
+    "mermaid": "```mermaid\ngraph TD\n  A-->B\n```\n",
+}
+
+FRAGMENTS = [
+    "# 标题 {n}\n",
+    "## 小节 {n}\n",
+    "普通段落，含 **粗体** 与 `行内 {n}`。\n",
+    "```python\nprint({n}) # <br>\n```\n",
+    "换行<br>之后\n",
+    "<hr>\n",
+    "<div class=\"c{n}\" style=\"margin: {n}px\">块</div>\n",
+    "<!-- 注释 {n} -->\n",
+    "| a | b<br>c |\n|---|---|\n| {n} | d<br>e |\n",
+    "<Callout type=\"info\">\n提示 {n}\n</Callout>\n",
+    "<img src=\"/img/{n}.png\" class=\"w\">\n",
+    "数学 {{x}} 与 a < {n}\n",
+    "\n",
+]
+
+
+def edge_cases(mixed: int = MIXED_CASES, seed: int = MIXED_SEED) -> List[Case]:
+    """固定的边界用例，加上由片段随机组合（固定种子）的页面，每个组合有无 frontmatter 各一份"""
+    cases = [Case(f"edge/{name}", text, f"1.{i}-{name}.md") for i, (name, text) in enumerate(EDGE_CASES.items())]
+    rng = random.Random(seed)
+    for i in range(mixed):
+        body = "".join(rng.choice(FRAGMENTS).format(n=rng.randrange(1000)) for _ in range(rng.randrange(1, 40)))
+        cases.append(Case(f"edge/mixed-{i:03d}", body, f"2.{i}-mixed-{i}.md"))
+        cases.append(Case(f"edge/mixed-{i:03d}-fm", f"---\ntitle: 组合 {i}\nlayout: doc\n---\n\n{body}",
+                          f"mixed-{i}.md"))
+    return cases
+
+
+def build_corpus(content_dir: Optional[Path] = None, edges: bool = True) -> List[Case]:
+    """content 目录的全部 .md / .mdx 页面与边界用例，按名称排序"""
+    cases = []
+    if content_dir is not None and content_dir.is_dir():
+        for entry in walk(content_dir):
+            if not entry.name.endswith((".md", ".mdx")):
+                continue
+            path = Path(entry.path)
+            rel = path.relative_to(content_dir).as_posix()
+            cases.append(Case(f"content/{rel}", path.read_text(encoding="utf-8"), path.name))
+    if edges:
+        cases.extend(edge_cases())
+    return sorted(cases, key=lambda c: c.name)
+
+
+# ---------------------------------------------------------------------------
+# 执行
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=None)
+def load_function(spec: str) -> Callable:
+    """"包.模块:函数" -> 函数（每个工作进程加载一次）"""
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise ValueError(f"候选函数应写成 模块:函数: {spec}")
+    return getattr(importlib.import_module(module), attr)
+
+
+def call_target(target: str, func: Callable, text: str, filename: str) -> str:
+    if target == "sanitize":
+        return func(text)
+    if target == "frontmatter":
+        return func(text, filename)
+    return func(text, ConvertOptions(dialect=target, filename=filename))[0]
+
+
+def timed(target: str, func: Callable, case: Case, repeat: int) -> Tuple[str, float]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = call_target(target, func, case.text, case.filename)
+        best = min(best, time.perf_counter() - start)
+    return output, best
+
+
+def run_case(case: Case, targets: Iterable[str], candidate: Optional[str], repeat: int) -> CaseResult:
+    """对一个用例运行参考实现（与候选），在工作进程中执行"""
+    result = CaseResult(case.name)
+    func = load_function(candidate) if candidate else None
+    for target in targets:
+        reference, result.elapsed[target] = timed(target, REFERENCE[target], case, repeat)
+        expected = reference.encode("utf-8")
+        result.digests[target] = content_digest(expected)
+        if func is None:
+            continue
+        try:
+            output, result.candidate_elapsed[target] = timed(target, func, case, repeat)
+        except Exception as e:
+            result.errors[target] = f"{type(e).__name__}: {e}"
+            continue
+        actual = output.encode("utf-8") if isinstance(output, str) else output
+        result.candidate[target] = content_digest(actual)
+        if actual != expected:
+            result.outputs[target] = (expected, actual)
+    return result
+
+
+def _run_chunk(args) -> List[CaseResult]:
+    cases, targets, candidate, repeat = args
+    return [run_case(case, targets, candidate, repeat) for case in cases]
+
+
+def run_cases(
+    cases: List[Case],
+    targets: Iterable[str] = TARGETS,
+    candidate: Optional[str] = None,
+    repeat: int = 1,
+    workers: Optional[int] = None
+) -> List[CaseResult]:
+    """并行运行全部用例，结果与 cases 顺序相同"""
+    targets = tuple(targets)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(cases) < 2:
+        return _run_chunk((cases, targets, candidate, repeat))
+    size = max(1, len(cases) // (workers * 4))
+    chunks = [(cases[i:i + size], targets, candidate, repeat) for i in range(0, len(cases), size)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        return [result for results in pool.map(_run_chunk, chunks) for result in results]
+
+
+# ---------------------------------------------------------------------------
+# 快照与差异
+# ---------------------------------------------------------------------------
+
+def make_snapshot(cases: List[Case], results: List[CaseResult]) -> Dict:
+    return {
+        "version": SNAPSHOT_VERSION,
+        "targets": sorted({t for r in results for t in r.digests}),
+        "cases": {case.name: {"input": case.digest, **result.digests} for case, result in zip(cases, results)},
+    }
+
+
+def compare_snapshot(snapshot: Dict, cases: List[Case], results: List[CaseResult]) -> Dict[str, List]:
+    """
+    参考输出与快照比较：
+        changed   输入相同而输出哈希不同：[(用例, 目标)]
+        stale     输入已改变（需要重新记录）
+        new       快照中没有的用例
+        missing   快照中有、语料中已没有的用例
+    """
+    recorded = snapshot.get("cases", {})
+    report = {"changed": [], "stale": [], "new": [], "missing": []}
+    for case, result in zip(cases, results):
+        entry = recorded.get(case.name)
+        if entry is None:
+            report["new"].append(case.name)
+        elif entry.get("input") != case.digest:
+            report["stale"].append(case.name)
+        else:
+            report["changed"].extend(
+                (case.name, target) for target, digest in result.digests.items()
+                if target in entry and entry[target] != digest
+            )
+    names = {case.name for case in cases}
+    report["missing"] = sorted(name for name in recorded if name not in names)
+    return report
+
+
+def byte_diff(expected: bytes, actual: bytes, context: int = CONTEXT_BYTES) -> Dict:
+    """
+    最小上下文的字节差异：去掉公共前缀与后缀，两侧各保留 context 个字节
+
+    返回 {offset, line, col, expected, actual}，offset 为第一个不同字节的位置，
+    line / col 按参考输出计算（1 起，col 以字节计）。
+    """
+    prefix = 0
+    limit = min(len(expected), len(actual))
+    while prefix < limit and expected[prefix] == actual[prefix]:
+        prefix += 1
+    suffix = 0
+    while (suffix < limit - prefix
+           and expected[len(expected) - 1 - suffix] == actual[len(actual) - 1 - suffix]):
+        suffix += 1
+    start = max(0, prefix - context)
+    return {
+        "offset": prefix,
+        "line": expected.count(b"\n", 0, prefix) + 1,
+        "col": prefix - (expected.rfind(b"\n", 0, prefix) + 1) + 1,
+        "expected": expected[start:min(len(expected), len(expected) - suffix + context)],
+        "actual": actual[start:min(len(actual), len(actual) - suffix + context)],
+        "truncated": start > 0,
+    }
@@ -0,0 +1,167 @@
+"""
+代码块预高亮
+============
+
+在同步阶段用 Pygments 把 ``` 代码块渲染为静态 HTML，next build 不再重复高亮：
+
+    ```python                 <div className="prehighlighted" data-language="python"
+    print("hi")          ->     dangerouslySetInnerHTML={{ __html: "<div class=\"highlight\">..." }} />
+    ```
+
+- 结果按 hash(语言 + 代码 + 主题) 缓存在 .cache/highlight/，未改动的片段不会再次高亮
+- 未命中缓存的片段用进程池并行高亮
+- 以下代码块保持原样，交给 Nextra 处理：未知语言、无语言、mermaid、
+  带额外 meta（文件名、行高亮等）的代码块、缩进的代码块
+- HTML 以 JSON 字符串放入 JSX 表达式，不受 MDX 中 { } 与空行的影响
+"""
+
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import pygments
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:  # Pygments 为可选依赖
+    pygments = None
+
+FENCE_PATTERN = re.compile(
+    r"^(?P<fence>```+|~~~+)(?P<info>[^\n`]*)\n(?P<code>[\s\S]*?)\n?^(?P=fence)[ \t]*$",
+    re.MULTILINE
+)
+SKIP_LANGUAGES = {"mermaid", "math", "latex", "text", "plaintext", "txt"}
+DEFAULT_THEME = "github-dark"
+# 至少有这么多未缓存片段时才启用进程池
+POOL_THRESHOLD = 8
+
+
+def render_block(job: Tuple[str, str, str]) -> Optional[str]:
+    """高亮单个代码块，未知语言返回 None（在工作进程中执行）"""
+    language, code, theme = job
+    try:
+        lexer = get_lexer_by_name(language, stripnl=False)
+    except ClassNotFound:
+        return None
+    formatter = HtmlFormatter(noclasses=True, style=theme)
+    return highlight(code + "\n", lexer, formatter)
+
+
+class CodeHighlighter:
+    def __init__(
+        self,
+        cache_dir: Path,
+        theme: str = DEFAULT_THEME,
+        workers: Optional[int] = None,
+        dry_run: bool = False
+    ):
+        self.cache_dir = cache_dir / "highlight"
+        self.theme = theme
+        self.workers = workers or os.cpu_count() or 1
+        self.dry_run = dry_run
+        self.available = pygments is not None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # 本次运行中已知的未知语言，避免重复尝试
+        self.unknown_languages = set()
+        self.stats = {"blocks": 0, "cached": 0, "rendered": 0, "skipped": 0}
+
+    def key(self, language: str, code: str) -> str:
+        h = hashlib.sha256()
+        for part in (language, code, self.theme, pygments.__version__):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.html"
+
+    def lookup(self, key: str) -> Optional[str]:
+        path = self.cache_path(key)
+        if path.exists():
+            return path.read_text(encoding="utf-8")
+        return None
+
+    def store(self, key: str, html: str) -> None:
+        if self.dry_run:
+            return
+        path = self.cache_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(html, encoding="utf-8")
+
+    def render_many(self, jobs: List[Tuple[str, str, str]]) -> List[Optional[str]]:
+        if len(jobs) < POOL_THRESHOLD or self.workers <= 1:
+            return [render_block(job) for job in jobs]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return list(self._pool.map(render_block, jobs))
+
+    def highlight_page(self, content: str) -> str:
+        """替换页面中可高亮的代码块"""
+        if not self.available:
+            return content
+
+        matches = []
+        for match in FENCE_PATTERN.finditer(content):
+            info = match.group("info").strip()
+            language = info.split()[0].lower() if info else ""
+            self.stats["blocks"] += 1
+            if (not language or info != info.split()[0] or language in SKIP_LANGUAGES
+                    or language in self.unknown_languages):
+                self.stats["skipped"] += 1
+                continue
+            matches.append((match, language, self.key(language, match.group("code"))))
+
+        # 先查缓存，未命中的并行渲染
+        rendered: Dict[str, Optional[str]] = {}
+        pending = []
+        for match, language, key in matches:
+            if key in rendered:
+                continue
+            html = self.lookup(key)
+            if html is not None:
+                self.stats["cached"] += 1
+                rendered[key] = html
+            else:
+                rendered[key] = None
+                pending.append((key, (language, match.group("code"), self.theme)))
+
+        for (key, job), html in zip(pending, self.render_many([job for _, job in pending])):
+            if html is None:
+                self.unknown_languages.add(job[0])
+                continue
+            self.stats["rendered"] += 1
+            rendered[key] = html
+            self.store(key, html)
+
+        out = []
+        last = 0
+        for match, language, key in matches:
+            html = rendered.get(key)
+            if html is None:
+                self.stats["skipped"] += 1
+                continue
+            out.append(content[last:match.start()])
+            out.append(
+                f'<div className="prehighlighted" data-language="{language}" '
+                f'dangerouslySetInnerHTML={{{{ __html: {json.dumps(html, ensure_ascii=False)} }}}} />'
+            )
+            last = match.end()
+        out.append(content[last:])
+        return "".join(out)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def summary(self) -> str:
+        if not self.available:
+            return "未安装 Pygments，跳过代码预高亮"
+        return (f"代码块 {self.stats['blocks']}，缓存命中 {self.stats['cached']}，"
+                f"新高亮 {self.stats['rendered']}，保持原样 {self.stats['skipped']}")
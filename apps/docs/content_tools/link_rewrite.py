@@ -0,0 +1,218 @@
+"""
+规则驱动的批量链接重写
+======================
+
+把一组重写规则编译为单个多模式正则，按字节预筛选（mmap + find）跳过
+不可能命中的文件，再并行处理候选文件。
+
+规则类型：
+    prefix   URL 前缀迁移       /docs/docs/            -> /docs/
+    chapter  章节重新编号       /docs/chapter-07       -> /docs/chapter-04
+    slug     章节内页面改名     /docs/chapter-04/react-pattern -> /docs/chapter-04/react-paradigm
+
+只改写链接位置的 URL：Markdown 链接 `](url)`、引用式定义 `[id]: url`
+以及 JSX/HTML 的 href / src 属性。
+
+每个链接依次经过三类规则，每类至多应用一条（最长匹配）：prefix → slug → chapter。
+因此一个链接可以同时修正前缀、改名页面并重新编号章节；slug 规则的 chapter
+指链接中原来的章节。同一类规则不会连锁，互换编号（07 -> 04 且 04 -> 07）是安全的。
+
+规则文件（JSON）示例：
+    [
+      {"type": "chapter", "from": "chapter-07", "to": "chapter-04"},
+      {"type": "slug", "chapter": "chapter-04", "from": "react-pattern", "to": "react-paradigm"},
+      {"type": "prefix", "from": "/docs/docs/", "to": "/docs/"}
+    ]
+"""
+
+import json
+import mmap
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple
+
+DOCS_PREFIX = "/docs"
+
+# 链接开始位置：](  /  [id]:  /  href=" src=' href={"
+LINK_LEAD = r"""(?P<lead>\]\(\s*<?|^\s*\[[^\]]+\]:\s*|\b(?:href|src)=\{?["'])"""
+# 链接 URL 的其余部分（到空白、括号或引号为止）
+URL_TAIL = r"""[^\s)"'`>}]*"""
+# 规则的应用顺序
+STAGES = ("prefix", "slug", "chapter")
+SEGMENT_CHAR = re.compile(r"[\w-]")
+
+
+@dataclass(frozen=True)
+class RewriteRule:
+    """单条重写规则，编译后等价于 old -> new 的 URL 前缀替换"""
+    kind: str
+    old: str
+    new: str
+
+    @property
+    def needs_boundary(self) -> bool:
+        # chapter / slug 规则必须匹配完整路径段，避免 chapter-1 命中 chapter-10
+        return self.kind != "prefix"
+
+    def matches(self, url: str) -> bool:
+        if not url.startswith(self.old):
+            return False
+        rest = url[len(self.old):]
+        return not (self.needs_boundary and rest and SEGMENT_CHAR.match(rest))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RewriteRule":
+        kind = data.get("type", "prefix")
+        if kind == "prefix":
+            return cls(kind, data["from"], data["to"])
+        if kind == "chapter":
+            return cls(kind, f"{DOCS_PREFIX}/{data['from']}", f"{DOCS_PREFIX}/{data['to']}")
+        if kind == "slug":
+            base = f"{DOCS_PREFIX}/{data['chapter']}"
+            return cls(kind, f"{base}/{data['from']}", f"{base}/{data['to']}")
+        raise ValueError(f"未知的规则类型: {kind}")
+
+
+DEFAULT_RULES = [RewriteRule("prefix", "/docs/docs/", "/docs/")]
+
+
+@dataclass
+class RewriteResult:
+    """单个文件的重写结果"""
+    path: Path
+    replacements: int
+    original: str
+    content: str
+
+
+def load_rules(path: Path) -> List[RewriteRule]:
+    """从 JSON 文件读取规则列表"""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [RewriteRule.from_dict(item) for item in data]
+
+
+def parse_rule_arg(kind: str, value: str) -> RewriteRule:
+    """解析命令行形式的规则：chapter-07=chapter-04 / chapter-04/old=new"""
+    old, sep, new = value.partition("=")
+    if not sep or not old or not new:
+        raise ValueError(f"规则格式应为 FROM=TO: {value}")
+    if kind == "slug":
+        chapter, _, slug = old.rpartition("/")
+        if not chapter:
+            raise ValueError(f"slug 规则格式应为 chapter-XX/old=new: {value}")
+        return RewriteRule.from_dict({"type": "slug", "chapter": chapter, "from": slug, "to": new})
+    return RewriteRule.from_dict({"type": kind, "from": old, "to": new})
+
+
+class LinkRewriter:
+    """编译后的多规则链接重写器"""
+
+    def __init__(self, rules: Iterable[RewriteRule]):
+        # 更长（更具体）的规则优先匹配
+        self.rules = sorted(rules, key=lambda r: len(r.old), reverse=True)
+        self.stages = [[r for r in self.rules if r.kind == kind] for kind in STAGES]
+        self.needles = sorted({r.old.encode("utf-8") for r in self.rules})
+
+        # 正则只定位以某条规则开头的链接，改写由 map_url 逐类组合
+        alternatives = []
+        for rule in self.rules:
+            alt = re.escape(rule.old)
+            if rule.needs_boundary:
+                alt += r"(?![\w-])"
+            alternatives.append(alt)
+        self.pattern = re.compile(
+            LINK_LEAD + "(?P<url>(?:" + "|".join(alternatives) + ")" + URL_TAIL + ")",
+            re.MULTILINE
+        ) if self.rules else None
+
+    def map_url(self, url: str) -> str:
+        """依次应用 prefix / slug / chapter 规则，每类至多一条"""
+        for stage in self.stages:
+            for rule in stage:
+                if rule.matches(url):
+                    url = rule.new + url[len(rule.old):]
+                    break
+        return url
+
+    def may_match(self, path: Path) -> bool:
+        """字节级预筛选：文件中不含任何规则前缀时直接跳过"""
+        if not self.needles:
+            return False
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return any(mm.find(needle) != -1 for needle in self.needles)
+
+    def rewrite_text(self, content: str) -> Tuple[str, int]:
+        """对文本应用全部规则，返回 (新文本, 替换次数)"""
+        if self.pattern is None:
+            return content, 0
+        count = 0
+
+        def replace(match: re.Match) -> str:
+            nonlocal count
+            url = self.map_url(match.group("url"))
+            if url == match.group("url"):
+                return match.group(0)
+            count += 1
+            return match.group("lead") + url
+
+        return self.pattern.sub(replace, content), count
+
+    def rewrite_file(
+        self,
+        path: Path,
+        reader: Optional[Callable[[Path], bytes]] = None
+    ) -> Optional[RewriteResult]:
+        """
+        预筛选并重写单个文件（不写盘），无改动时返回 None
+
+        reader 为 None 时直接读磁盘（mmap 预筛选）；否则由 reader 读取字节（如 Storage.read_bytes）。
+        """
+        if reader is None:
+            if not self.may_match(path):
+                return None
+            original = path.read_text(encoding="utf-8")
+        else:
+            data = reader(path)
+            if not any(needle in data for needle in self.needles):
+                return None
+            original = data.decode("utf-8")
+        content, count = self.rewrite_text(original)
+        if not count or content == original:
+            return None
+        return RewriteResult(path, count, original, content)
+
+    def run(
+        self,
+        paths: Iterable[Path],
+        writer: Optional[Callable[[RewriteResult], None]] = None,
+        workers: Optional[int] = None,
+        reader: Optional[Callable[[Path], bytes]] = None
+    ) -> List[RewriteResult]:
+        """
+        并行处理一批文件
+
+        writer 为 None 时只计算结果不写盘（dry-run）；结果按路径排序返回，
+        保证输出与并行度无关。
+        """
+        paths = list(paths)
+        workers = workers or min(32, (os.cpu_count() or 1) * 4)
+
+        def process(path: Path) -> Optional[RewriteResult]:
+            result = self.rewrite_file(path, reader)
+            if result is not None and writer is not None:
+                writer(result)
+            return result
+
+        if workers <= 1 or len(paths) <= 1:
+            results = [process(p) for p in paths]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(process, paths))
+
+        return sorted((r for r in results if r is not None), key=lambda r: str(r.path))
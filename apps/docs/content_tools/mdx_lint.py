@@ -0,0 +1,217 @@
+"""
+MDX 风险扫描
+============
+
+sanitize_for_mdx 是启发式的，漏网的问题要等 next build 才报错。这里用一个轻量的
+逐字符状态机在 Python 中提前发现会让 MDX 编译失败的写法：
+
+    unclosed-fence        ``` / ~~~ 代码块没有闭合（能编译，但页面其余部分都成了代码；警告）
+    unclosed-frontmatter  frontmatter 没有闭合的 ---
+    html-comment          <!-- --> 注释（MDX 不支持，应写作 {/* */}）
+    autolink              <https://...> 自动链接（MDX 不支持）
+    bad-lt                < 后紧跟数字、= 或非 ASCII 字符（MDX 会当作标签起始而报错）
+    void-tag              <br> / <img ...> 等空元素没有自闭合
+    unclosed-tag          JSX/HTML 标签没有闭合
+    unexpected-close      多余或不匹配的闭合标签
+    unbalanced-brace      正文中多余的 }
+    unclosed-brace        正文中的 { 没有闭合
+
+代码块、行内代码、表达式中的字符串与注释、标签属性值都会被跳过。
+扫描器只求快和低误报，不是完整的 MDX 解析器。
+"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# 规则变化时递增，使内容哈希缓存失效
+LINT_VERSION = "1"
+
+FENCE_OPEN = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+AUTOLINK = re.compile(r"<(?:https?|mailto|ftp):", re.IGNORECASE)
+TAG_START = re.compile(r"</?([A-Za-z][\w.:-]*)?")
+
+
+# 转换阶段（content_tools/convert.py）的提示同样是警告
+WARNING_CODES = {"unclosed-fence", "comment-removed", "frontmatter-dropped"}
+
+
+@dataclass
+class Diagnostic:
+    line: int
+    col: int
+    code: str
+    message: str
+
+    @property
+    def level(self) -> str:
+        return "WARN" if self.code in WARNING_CODES else "ERROR"
+
+
+class _Scanner:
+    def __init__(self):
+        self.diagnostics: List[Diagnostic] = []
+        self.braces: List[Tuple[int, int]] = []     # 未闭合的 { 位置
+        self.tags: List[Tuple[str, int, int]] = []  # 未闭合的标签 (名称, 行, 列)
+        self.tag: Optional[dict] = None             # 正在解析的标签
+        self.quote: Optional[str] = None            # 表达式/属性中的字符串
+        self.comment = False                        # 表达式中的 /* */
+
+    def add(self, line: int, col: int, code: str, message: str):
+        self.diagnostics.append(Diagnostic(line, col, code, message))
+
+    def in_code(self) -> bool:
+        return bool(self.braces) or self.tag is not None
+
+    def scan_line(self, text: str, ln: int):
+        i = 0
+        n = len(text)
+        while i < n:
+            ch = text[i]
+
+            # 表达式 / 标签内部：字符串与注释
+            if self.comment:
+                end = text.find("*/", i)
+                if end < 0:
+                    return
+                self.comment = False
+                i = end + 2
+                continue
+            if self.quote:
+                if ch == "\\":
+                    i += 2
+                    continue
+                if ch == self.quote:
+                    self.quote = None
+                i += 1
+                continue
+            if self.in_code():
+                if ch in "\"'" or (ch == "`" and self.braces):
+                    self.quote = ch
+                    i += 1
+                    continue
+                if self.braces and text.startswith("/*", i):
+                    self.comment = True
+                    i += 2
+                    continue
+
+            if ch == "\\" and not self.in_code():
+                i += 2
+                continue
+
+            if ch == "{":
+                self.braces.append((ln, i + 1))
+            elif ch == "}":
+                if self.braces:
+                    self.braces.pop()
+                else:
+                    self.add(ln, i + 1, "unbalanced-brace", "多余的 }，正文中的花括号需要转义为 \\}")
+            elif self.braces:
+                pass
+            elif self.tag is not None:
+                if ch == ">":
+                    self.close_tag(text[i - 1] == "/" if i > 0 else False)
+            elif ch == "`":
+                # 行内代码：同一行内相同长度的反引号闭合
+                run = len(text) - len(text[i:].lstrip("`"))
+                fence = text[i:i + run]
+                end = text.find(fence, i + run)
+                if end >= 0:
+                    i = end + run
+                    continue
+                i += run
+                continue
+            elif ch == "<":
+                i = self.open_tag(text, i, ln)
+                continue
+            i += 1
+
+    def open_tag(self, text: str, i: int, ln: int) -> int:
+        col = i + 1
+        rest = text[i + 1:i + 2]
+        if text.startswith("<!--", i):
+            self.add(ln, col, "html-comment", "MDX 不支持 HTML 注释，请改用 {/* */}")
+            end = text.find("-->", i)
+            return end + 3 if end >= 0 else len(text)
+        if AUTOLINK.match(text, i):
+            self.add(ln, col, "autolink", "MDX 不支持 <URL> 自动链接，请改用 [文本](URL)")
+            end = text.find(">", i)
+            return end + 1 if end >= 0 else len(text)
+        if rest and (rest.isdigit() or rest == "=" or ord(rest) > 127):
+            self.add(ln, col, "bad-lt", f"< 后紧跟 '{rest}'，MDX 会当作标签解析，请写作 &lt;")
+            return i + 1
+        match = TAG_START.match(text, i)
+        name = match.group(1) if match else None
+        closing = text.startswith("</", i)
+        if name is None and not (rest == ">" or (closing and text[i + 2:i + 3] == ">")):
+            return i + 1  # "a < b" 之类，交给 MDX 按文本处理
+        self.tag = {"name": name or "", "closing": closing, "line": ln, "col": col}
+        return match.end() if match else i + 1
+
+    def close_tag(self, self_closing: bool):
+        tag = self.tag
+        self.tag = None
+        name = tag["name"]
+        if tag["closing"]:
+            for depth in range(len(self.tags) - 1, -1, -1):
+                if self.tags[depth][0] == name:
+                    for open_name, ln, col in self.tags[depth + 1:]:
+                        self.add(ln, col, "unclosed-tag", f"<{open_name}> 在 </{name}> 之前没有闭合")
+                    del self.tags[depth:]
+                    return
+            self.add(tag["line"], tag["col"], "unexpected-close", f"</{name}> 没有对应的开始标签")
+        elif self_closing:
+            return
+        elif name.lower() in VOID_TAGS:
+            self.add(tag["line"], tag["col"], "void-tag", f"<{name}> 需要自闭合，写作 <{name} />")
+        else:
+            self.tags.append((name, tag["line"], tag["col"]))
+
+    def finish(self):
+        for ln, col in self.braces:
+            self.add(ln, col, "unclosed-brace", "{ 没有闭合，正文中的花括号需要转义为 \\{")
+        for name, ln, col in self.tags:
+            self.add(ln, col, "unclosed-tag", f"<{name or ''}> 没有闭合")
+        if self.tag is not None:
+            self.add(self.tag["line"], self.tag["col"], "unclosed-tag", f"<{self.tag['name']} 标签没有以 > 结束")
+
+
+def lint(content: str) -> List[Diagnostic]:
+    """扫描一个页面，返回按位置排序的诊断"""
+    scanner = _Scanner()
+    lines = content.split("\n")
+    start = 0
+
+    if lines and lines[0].strip() == "---":
+        for j in range(1, len(lines)):
+            if lines[j].strip() == "---":
+                start = j + 1
+                break
+        else:
+            scanner.add(1, 1, "unclosed-frontmatter", "frontmatter 没有闭合的 ---")
+            return scanner.diagnostics
+
+    fence = None
+    for idx in range(start, len(lines)):
+        text = lines[idx]
+        ln = idx + 1
+        if fence is not None:
+            close = FENCE_OPEN.match(text)
+            if close and close.group(1)[0] == fence[0][0] and len(close.group(1)) >= len(fence[0]) \
+                    and not text[close.end():].strip():
+                fence = None
+            continue
+        # 表达式或标签跨行时，``` 不是代码块
+        if not scanner.in_code():
+            opening = FENCE_OPEN.match(text)
+            if opening:
+                fence = (opening.group(1), ln)
+                continue
+        scanner.scan_line(text, ln)
+
+    if fence is not None:
+        scanner.add(fence[1], 1, "unclosed-fence", f"{fence[0]} 代码块没有闭合")
+    scanner.finish()
+    scanner.diagnostics.sort(key=lambda d: (d.line, d.col))
+    return scanner.diagnostics
@@ -0,0 +1,245 @@
+"""
+页面体积预算
+============
+
+度量每个转换后的页面（字节数、代码块、图片、JSX 组件、估算的 JS 体积），
+与可配置的预算比较并报告超标页面；可选地在 ## 边界把超标页面拆分为子页面。
+
+估算的 JS 体积只是粗略指标：正文按 1.3 倍计，代码块经 Shiki 高亮后每个 token
+都会变成一个 JSX 元素，按 4 倍计，每张图片/组件另计固定开销。
+
+拆分规则：
+    chapter-04/engram-memory.mdx  ->  chapter-04/engram-memory/index.mdx       （## 之前的引言）
+                                      chapter-04/engram-memory/<section>.mdx   （每个 ## 小节）
+                                      chapter-04/engram-memory/_meta.json
+    chapter-08/index.mdx          ->  chapter-08/index.mdx + chapter-08/<section>.mdx，
+                                      小节按顺序插入章节 _meta.json 的 index 之后
+子页面保留原来的 ## 标题，因此小节锚点（#标题）保持不变；子页面 frontmatter 中的
+split_from 标记来源页面，重复拆分时旧的子页面会被覆盖或清理，slug 不会漂移。
+
+预算配置文件（JSON）示例：
+    {"max_bytes": 40000, "max_code_blocks": 40, "max_images": 30, "max_estimated_js": 160000}
+"""
+
+import json
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .frontmatter import read_head
+from .fsutil import write_text_atomic
+
+FRONTMATTER_PATTERN = re.compile(r"^---\n[\s\S]*?\n---\n")
+FENCE_LINE = re.compile(r"^(```|~~~)")
+IMAGE_PATTERN = re.compile(r"!\[[^\]\n]*\]\(|<img\b")
+COMPONENT_PATTERN = re.compile(r"<[A-Z]\w*[\s/>]")
+SECTION_HEADING = re.compile(r"^##\s+(.+?)\s*#*\s*$")
+
+
+@dataclass
+class PageBudget:
+    max_bytes: int = 40_000
+    max_code_blocks: int = 40
+    max_images: int = 30
+    max_estimated_js: int = 160_000
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PageBudget":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: int(v) for k, v in data.items() if k in known})
+
+
+@dataclass
+class PageMetrics:
+    path: Path
+    bytes: int
+    code_blocks: int
+    code_bytes: int
+    images: int
+    components: int
+    sections: int
+
+    @property
+    def estimated_js(self) -> int:
+        prose = self.bytes - self.code_bytes
+        return int(prose * 1.3 + self.code_bytes * 4 + (self.images + self.components) * 200)
+
+    def violations(self, budget: PageBudget) -> List[str]:
+        checks = [
+            ("字节", self.bytes, budget.max_bytes),
+            ("代码块", self.code_blocks, budget.max_code_blocks),
+            ("图片", self.images, budget.max_images),
+            ("估算 JS", self.estimated_js, budget.max_estimated_js),
+        ]
+        return [f"{name} {value} > {limit}" for name, value, limit in checks if value > limit]
+
+
+def measure(path: Path, content: Optional[str] = None) -> PageMetrics:
+    """度量单个页面"""
+    if content is None:
+        content = path.read_text(encoding="utf-8")
+    code_blocks = 0
+    code_bytes = 0
+    sections = 0
+    in_fence = None
+    for line in content.splitlines(keepends=True):
+        fence = FENCE_LINE.match(line)
+        if in_fence:
+            if fence and fence.group(1) == in_fence:
+                in_fence = None
+            else:
+                code_bytes += len(line.encode("utf-8"))
+            continue
+        if fence:
+            in_fence = fence.group(1)
+            code_blocks += 1
+        elif SECTION_HEADING.match(line):
+            sections += 1
+    return PageMetrics(
+        path=path,
+        bytes=len(content.encode("utf-8")),
+        code_blocks=code_blocks,
+        code_bytes=code_bytes,
+        images=len(IMAGE_PATTERN.findall(content)),
+        components=len(COMPONENT_PATTERN.findall(content)),
+        sections=sections,
+    )
+
+
+def split_sections(content: str) -> Tuple[str, str, List[Tuple[str, str]]]:
+    """按 ## 拆分（忽略代码块中的 ##），返回 (frontmatter, 引言, [(标题, 小节内容)])"""
+    match = FRONTMATTER_PATTERN.match(content)
+    frontmatter = match.group(0) if match else ""
+    body = content[len(frontmatter):]
+
+    intro: List[str] = []
+    sections: List[Tuple[str, List[str]]] = []
+    in_fence = None
+    for line in body.splitlines(keepends=True):
+        fence = FENCE_LINE.match(line)
+        if in_fence:
+            if fence and fence.group(1) == in_fence:
+                in_fence = None
+        elif fence:
+            in_fence = fence.group(1)
+        else:
+            heading = SECTION_HEADING.match(line)
+            if heading:
+                sections.append((heading.group(1), [line]))
+                continue
+        (sections[-1][1] if sections else intro).append(line)
+
+    return frontmatter, "".join(intro), [(title, "".join(lines)) for title, lines in sections]
+
+
+def section_slug(title: str, index: int, taken: set) -> str:
+    """由小节标题生成稳定的 slug：取 ASCII 单词，否则按序号"""
+    words = re.findall(r"[a-z0-9]+", title.lower())
+    slug = "-".join(words)[:48].strip("-") or f"part-{index:02d}"
+    candidate = slug
+    n = 2
+    while candidate in taken:
+        candidate = f"{slug}-{n}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def split_origin(path: Path) -> Optional[str]:
+    """读取子页面 frontmatter 中的 split_from 标记（只读文件头部）"""
+    return read_head(path, heading=False).fields.get("split_from")
+
+
+def split_siblings(chapter_dir: Path) -> Dict:
+    """章节目录中由 index.mdx 拆分出的子页面 {slug: 标题}，按现有 _meta.json 的顺序
+
+    增量同步跳过未改动的 index.mdx 时，重新生成章节 _meta.json 需要保留这些条目。
+    """
+    return {
+        key: value
+        for key, value in read_meta(chapter_dir / "_meta.json").items()
+        if (chapter_dir / f"{key}.mdx").is_file() and split_origin(chapter_dir / f"{key}.mdx") == "index"
+    }
+
+
+def read_meta(meta_path: Path) -> Dict:
+    if meta_path.exists():
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    return {}
+
+
+def write_meta(meta_path: Path, meta: Dict) -> None:
+    write_text_atomic(meta_path, json.dumps(meta, indent=2, ensure_ascii=False) + "\n")
+
+
+class PageSplitter:
+    """在 ## 边界拆分超标页面"""
+
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+
+    def split(self, page: Path) -> List[Path]:
+        """拆分单个页面，返回生成的子页面路径；少于两个小节时不拆分"""
+        content = page.read_text(encoding="utf-8")
+        frontmatter, intro, sections = split_sections(content)
+        if len(sections) < 2:
+            return []
+
+        if page.stem == "index":
+            target_dir = page.parent
+            intro_path = page
+        else:
+            target_dir = page.parent / page.stem
+            intro_path = target_dir / "index.mdx"
+
+        # 上一次拆分生成的子页面可以被复用或清理
+        previous = [
+            p for p in (target_dir.glob("*.mdx") if target_dir.exists() else [])
+            if p.stem != "index" and split_origin(p) == page.stem
+        ]
+        taken = {"index"}
+        if page.stem == "index":
+            taken |= {p.stem for p in target_dir.glob("*.mdx")} - {p.stem for p in previous}
+
+        planned = []
+        for i, (title, body) in enumerate(sections, 1):
+            slug = section_slug(title, i, taken)
+            title_yaml = title.replace('"', '\\"')
+            planned.append((
+                slug,
+                title,
+                f'---\ntitle: "{title_yaml}"\nsplit_from: "{page.stem}"\n---\n\n{body}'
+            ))
+
+        if self.dry_run:
+            return [target_dir / f"{slug}.mdx" for slug, _, _ in planned]
+
+        target_dir.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(intro_path, frontmatter + intro.rstrip("\n") + "\n")
+        created = []
+        for slug, _, text in planned:
+            path = target_dir / f"{slug}.mdx"
+            write_text_atomic(path, text)
+            created.append(path)
+        for stale in set(previous) - set(created):
+            stale.unlink()
+
+        meta_path = target_dir / "_meta.json"
+        if page.stem == "index":
+            old = read_meta(meta_path)
+            meta = {"index": old.pop("index", "章节概览")}
+            meta.update({slug: title for slug, title, _ in planned})
+            stale_keys = {p.stem for p in previous}
+            for key, value in old.items():
+                if key not in stale_keys:
+                    meta.setdefault(key, value)
+        else:
+            title = read_meta(page.parent / "_meta.json").get(page.stem, page.stem)
+            meta = {"index": title if isinstance(title, str) else page.stem}
+            meta.update({slug: title for slug, title, _ in planned})
+            page.unlink()
+        write_meta(meta_path, meta)
+        return created
+
@@ -0,0 +1,122 @@
+"""
+异步 I/O 管道
+=============
+
+读取 → 转换 → 写入 三段流水线：
+
+    jobs ──> [读取 × readers] ──队列(depth)──> [转换] ──队列(depth)──> [写入 × writers]
+
+- 读取与写入是阻塞调用，在 I/O 线程池中执行，并发数分别受 readers / writers 限制
+- 转换在单独的 executor 中执行；默认单线程，因为转换阶段可能持有
+  AssetPipeline、CodeHighlighter 等非线程安全的状态
+- 阶段之间是有界队列：下游跟不上时上游在 put 处等待（背压），
+  任意时刻在途的页面不超过 readers + converters + writers + 3 × depth 个
+- 单个任务出错只记录在它的结果中，不影响其他任务；结果按提交顺序返回
+
+在高延迟存储（网络挂载、CI 容器中的 overlay 文件系统）上，吞吐量随 depth 增长，
+而不再受限于同一时刻只有一个未完成的 I/O。
+
+read 返回 SKIP 表示该任务无需处理（例如目标已是最新），直接记为跳过。
+"""
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, List, Optional
+
+DEFAULT_DEPTH = 16
+SKIP = object()
+_STOP = object()
+
+
+@dataclass
+class PipelineResult:
+    job: Any
+    value: Any = None                       # write 的返回值
+    error: Optional[BaseException] = None
+    stage: str = ""                         # 出错的阶段：read / convert / write
+    skipped: bool = False
+
+
+def run_pipeline(
+    jobs: Iterable[Any],
+    read: Callable[[Any], Any],
+    convert: Callable[[Any, Any], Any],
+    write: Callable[[Any, Any], Any],
+    depth: int = DEFAULT_DEPTH,
+    readers: Optional[int] = None,
+    writers: Optional[int] = None,
+    convert_executor: Optional[Executor] = None,
+    converters: int = 1
+) -> List[PipelineResult]:
+    """运行管道直到所有任务完成，返回按提交顺序排列的结果
+
+    jobs 可以是生成器，按需取用；converters 为并发提交给 convert_executor 的任务数。
+    """
+    depth = max(1, depth)
+    return asyncio.run(_run(
+        jobs, read, convert, write,
+        depth=depth,
+        readers=readers or depth,
+        writers=writers or depth,
+        convert_executor=convert_executor,
+        converters=max(1, converters)
+    ))
+
+
+async def _run(jobs, read, convert, write, depth, readers, writers, convert_executor, converters):
+    loop = asyncio.get_running_loop()
+    io_pool = ThreadPoolExecutor(max_workers=readers + writers, thread_name_prefix="io")
+    cpu_pool = convert_executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="convert")
+
+    read_q: asyncio.Queue = asyncio.Queue(maxsize=depth)
+    convert_q: asyncio.Queue = asyncio.Queue(maxsize=depth)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=depth)
+    results: List[Optional[PipelineResult]] = []
+
+    async def feed():
+        for job in jobs:
+            results.append(None)
+            await read_q.put((len(results) - 1, job, None))
+        for _ in range(readers):
+            await read_q.put(_STOP)
+
+    async def worker(name, fn, pool, inbox, outbox):
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            index, job, data = item
+            try:
+                if name == "read":
+                    value = await loop.run_in_executor(pool, fn, job)
+                else:
+                    value = await loop.run_in_executor(pool, fn, job, data)
+            except Exception as e:
+                results[index] = PipelineResult(job, error=e, stage=name)
+                continue
+            if value is SKIP:
+                results[index] = PipelineResult(job, skipped=True)
+            elif outbox is None:
+                results[index] = PipelineResult(job, value=value)
+            else:
+                # 下游队列满时在此等待（背压）
+                await outbox.put((index, job, value))
+
+    async def stage(name, fn, pool, count, inbox, outbox, downstream):
+        await asyncio.gather(*[worker(name, fn, pool, inbox, outbox) for _ in range(count)])
+        for _ in range(downstream):
+            await outbox.put(_STOP)
+
+    try:
+        await asyncio.gather(
+            feed(),
+            stage("read", read, io_pool, readers, read_q, convert_q, converters),
+            stage("convert", convert, cpu_pool, converters, convert_q, write_q, writers),
+            stage("write", write, io_pool, writers, write_q, None, 0),
+        )
+    finally:
+        io_pool.shutdown()
+        if convert_executor is None:
+            cpu_pool.shutdown()
+    return results
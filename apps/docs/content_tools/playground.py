@@ -0,0 +1,92 @@
+"""
+CodeRun 代码片段提取
+====================
+
+把 <CodeRun lang="js">...</CodeRun> 的代码体写成按内容哈希命名的静态文件，
+页面中只保留引用：
+    <CodePlayground language="js" src="/assets/code/<hash>.js" />
+
+CodePlayground 在进入视口时才加载代码，页面 JS 不再内联片段源码；
+代码不再放进模板字符串，反引号与 ${ 也无需转义。
+
+输出目录（默认 public/assets/code）：
+    <hash>.<ext>     代码片段
+    manifest.json    {页面路径: [{hash, language, src, bytes}]}
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List
+
+from .fsutil import write_text_atomic
+
+CODERUN_PATTERN = re.compile(
+    r"<CodeRun\s+lang=[\"'](?P<lang>\w+)[\"']\s*>(?P<body>[\s\S]*?)</CodeRun>"
+)
+
+LANGUAGE_SUFFIXES = {
+    "javascript": ".js",
+    "js": ".js",
+    "typescript": ".ts",
+    "ts": ".ts",
+}
+HASH_LENGTH = 16
+
+
+class PlaygroundExtractor:
+    def __init__(self, public_dir: Path, url_prefix: str = "/assets/code", dry_run: bool = False):
+        self.url_prefix = "/" + url_prefix.strip("/")
+        self.out_dir = public_dir / url_prefix.strip("/")
+        self.dry_run = dry_run
+        self.manifest: Dict[str, List[Dict]] = {}
+        self.written = set()
+
+    def write_snippet(self, language: str, body: str) -> Dict:
+        data = body.encode("utf-8")
+        digest = hashlib.sha256(language.encode("utf-8") + b"\0" + data).hexdigest()[:HASH_LENGTH]
+        name = digest + LANGUAGE_SUFFIXES.get(language.lower(), ".txt")
+        target = self.out_dir / name
+        if not self.dry_run and name not in self.written and not target.exists():
+            self.out_dir.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+        self.written.add(name)
+        return {
+            "hash": digest,
+            "language": language,
+            "src": f"{self.url_prefix}/{name}",
+            "bytes": len(data),
+        }
+
+    def extract(self, content: str, page: str) -> str:
+        """提取页面中的全部 CodeRun 代码体，返回改写后的内容"""
+        snippets = []
+
+        def replace(match: re.Match) -> str:
+            language = match.group("lang")
+            body = match.group("body").strip("\n")
+            entry = self.write_snippet(language, body)
+            snippets.append(entry)
+            return f'<CodePlayground language="{language}" src="{entry["src"]}" />'
+
+        content = CODERUN_PATTERN.sub(replace, content)
+        if snippets:
+            self.manifest[page] = snippets
+        return content
+
+    def save(self) -> None:
+        """合并写入 manifest（保留其他页面的条目）"""
+        if self.dry_run or not self.manifest:
+            return
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.out_dir / "manifest.json"
+        manifest = {}
+        if manifest_path.exists():
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        manifest.update(self.manifest)
+        write_text_atomic(manifest_path, json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+
+    def summary(self) -> str:
+        total = sum(len(items) for items in self.manifest.values())
+        return f"提取代码片段 {total} 个（{len(self.written)} 个文件），涉及 {len(self.manifest)} 个页面"
@@ -0,0 +1,150 @@
+"""
+页面引用提取
+============
+
+单次正则扫描提取页面中的链接与图片引用，同时跳过代码块与行内代码：
+    Markdown 链接   [text](url)
+    Markdown 图片   ![alt](url)
+    引用式定义      [id]: url
+    JSX/HTML 属性   href="url" / src="url"
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Callable, Iterator, List, Optional, Tuple
+
+SCAN_PATTERN = re.compile(
+    r"(?P<fence>^[ \t]*(?P<fq>```|~~~)[^\n]*\n[\s\S]*?^[ \t]*(?P=fq)[ \t]*$)"
+    r"|(?P<code>`[^`\n]+`)"
+    r"|(?P<img>!\[[^\]\n]*\]\(\s*<?(?P<img_url>[^)\s>]+)>?(?:\s+[\"'][^\"'\n]*[\"'])?\s*\))"
+    r"|(?P<link>\[[^\]\n]*\]\(\s*<?(?P<link_url>[^)\s>]+)>?(?:\s+[\"'][^\"'\n]*[\"'])?\s*\))"
+    r"|(?P<ref>^[ \t]{0,3}\[[^\]\n]+\]:[ \t]*(?P<ref_url>\S+))"
+    r"|(?P<attr>\b(?P<attr_name>href|src)=\{?[\"'](?P<attr_url>[^\"'\n]+)[\"'])",
+    re.MULTILINE
+)
+
+EXTERNAL_PREFIXES = ("http://", "https://", "//", "mailto:", "tel:", "data:", "javascript:")
+TAG_NAME = re.compile(r"[A-Za-z][\w.-]*")
+
+
+@dataclass
+class Reference:
+    """页面中的一次引用"""
+    kind: str   # link | image
+    url: str
+    line: int
+    col: int
+    tag: Optional[str] = None   # href / src 属性所在的标签名（img、a、Diagram …），Markdown 语法为 None
+
+    @property
+    def is_external(self) -> bool:
+        return self.url.lower().startswith(EXTERNAL_PREFIXES)
+
+    @property
+    def is_anchor(self) -> bool:
+        return self.url.startswith("#")
+
+
+Span = Tuple[int, int]
+
+
+def _iter_references(content: str) -> Iterator[Tuple[Reference, Span, Span]]:
+    """
+    逐个产出 (引用, URL 在原文中的区间, 元素区间)，行列号从 1 开始
+
+    元素区间：Markdown 语法为整个 ![alt](url) / [text](url) / 引用式定义；
+    href / src 属性为所在的整个标签（标签未闭合时为属性本身）。
+    """
+    line = 1
+    line_start = 0
+    pos = 0
+
+    for match in SCAN_PATTERN.finditer(content):
+        if match.group("fence") is not None or match.group("code") is not None:
+            continue
+
+        start = match.start()
+        newlines = content.count("\n", pos, start)
+        if newlines:
+            line += newlines
+            line_start = content.rfind("\n", pos, start) + 1
+        pos = start
+        col = start - line_start + 1
+
+        if match.group("img") is not None:
+            kind, group = "image", "img_url"
+        elif match.group("link") is not None:
+            kind, group = "link", "link_url"
+        elif match.group("ref") is not None:
+            kind, group = "link", "ref_url"
+        else:
+            kind = "image" if match.group("attr_name") == "src" else "link"
+            group = "attr_url"
+            tag = _enclosing_tag(content, start)
+            element = match.span()
+            if tag is not None:
+                gt = content.find(">", match.end())
+                if gt != -1:
+                    element = (content.rfind("<", 0, start), gt + 1)
+            yield Reference(kind, match.group(group), line, col, tag), match.span(group), element
+            continue
+        yield Reference(kind, match.group(group), line, col), match.span(group), match.span()
+
+
+def _enclosing_tag(content: str, pos: int) -> Optional[str]:
+    """pos 所在标签的名称（pos 之前最近的 < 与 pos 之间没有 >）"""
+    lt = content.rfind("<", 0, pos)
+    if lt == -1 or content.find(">", lt, pos) != -1:
+        return None
+    match = TAG_NAME.match(content, lt + 1)
+    return match.group(0) if match else None
+
+
+def extract_references(content: str) -> List[Reference]:
+    """提取所有链接与图片引用"""
+    return [ref for ref, _, _ in _iter_references(content)]
+
+
+def replace_references(content: str, replace: Callable[[Reference], Optional[str]]) -> str:
+    """
+    按引用替换 URL（代码块与行内代码保持不变）
+
+    replace 返回新的 URL，返回 None 表示保留原样。
+    """
+    out = []
+    last = 0
+    for ref, (start, end), _ in _iter_references(content):
+        new_url = replace(ref)
+        if new_url is None or new_url == ref.url:
+            continue
+        out.append(content[last:start])
+        out.append(new_url)
+        last = end
+    if not out:
+        return content
+    out.append(content[last:])
+    return "".join(out)
+
+
+def replace_images(content: str, replace: Callable[[Reference, str, int], Optional[str]]) -> str:
+    """
+    按图片元素整体替换（代码块与行内代码保持不变）
+
+    replace(引用, 元素原文, URL 在元素中的起始位置) 返回新的元素文本，返回 None 表示保留原样。
+    元素为整个 ![alt](url "title")，或 src 属性所在的整个标签；同一标签只处理第一个 src。
+    """
+    out = []
+    last = 0
+    for ref, (start, _), (el_start, el_end) in _iter_references(content):
+        if ref.kind != "image" or el_start < last:
+            continue
+        new_element = replace(ref, content[el_start:el_end], start - el_start)
+        if new_element is None:
+            continue
+        out.append(content[last:el_start])
+        out.append(new_element)
+        last = el_end
+    if not out:
+        return content
+    out.append(content[last:])
+    return "".join(out)
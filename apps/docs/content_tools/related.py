@@ -0,0 +1,286 @@
+"""
+相关页面索引
+============
+
+同步阶段为每个页面计算 MinHash 签名，用 LSH 分桶找出内容相近的页面，
+输出站点直接渲染的 related-pages.json（运行时不做任何计算）：
+
+    {"version": 1,
+     "titles":  {"/docs/chapter-06/pateoas": "PATEOAS", ...},
+     "related": {"/docs/chapter-06/pateoas": [["/docs/chapter-09/runtime", 0.31], ...]}}
+
+- 分词兼顾中英文：连续汉字取字符二元组，英文与数字取小写单词；
+  frontmatter、代码块、行内代码、链接地址与 HTML/JSX 标签不参与
+- shingle_size 个相邻词元组成一个 shingle（默认 1：二元组本身已带有词序，再组合会让
+  同一主题的页面几乎没有交集），以 crc32 映射为 32 位整数（跨进程、跨机器稳定）
+- MinHash：num_perm 个 (a·x + b) mod (2^31 - 1) 置换分别取最小值；安装了 NumPy 时
+  整页向量化计算，否则逐个置换计算，两者结果相同
+- LSH：签名切成 bands 段，任一段完全相同的两页成为候选，只为候选估计 Jaccard 相似度，
+  不做 O(n²) 的两两比较
+- 默认只推荐其他目录（章节）中的页面，同章节的页面已在侧边栏中相邻；
+  相似度不低于 max_score 的近似副本（镜像目录中的同一页面）不互相推荐
+- 签名按页面内容哈希缓存在 .cache/related-signatures.json，只有改动的页面重新计算
+"""
+
+import base64
+import hashlib
+import json
+import random
+import re
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy 为可选依赖
+    np = None
+
+from .frontmatter import parse_head
+from .fsutil import write_text_atomic
+from .route_index import RouteIndex
+
+OUTPUT_PATH = Path(__file__).resolve().parent.parent / "related-pages.json"
+OUTPUT_VERSION = 1
+CACHE_VERSION = 1
+
+NUM_PERM = 128
+SHINGLE_SIZE = 1
+BANDS = 64              # 每段 2 行：Jaccard 约 0.12 以上的页面大概率成为候选
+TOP_K = 5
+MIN_SCORE = 0.08
+MAX_SCORE = 0.9
+SEED = 20240601
+PRIME = (1 << 31) - 1
+CHUNK = 4096            # NumPy 每次处理的 shingle 数（限制中间矩阵大小）
+
+FRONTMATTER = re.compile(r"^---\s*\n[\s\S]*?\n---\s*\n")
+CODE_FENCE = re.compile(r"^(`{3,}|~{3,})[^\n]*\n[\s\S]*?^\1[ \t]*$", re.MULTILINE)
+INLINE_CODE = re.compile(r"`[^`\n]+`")
+LINK_TARGET = re.compile(r"\]\([^)]*\)")
+TAG = re.compile(r"<[^>\n]+>")
+TOKEN = re.compile(r"[一-鿿]+|[a-z0-9]+(?:[-_][a-z0-9]+)*")
+CJK = re.compile(r"[一-鿿]")
+
+
+def tokenize(text: str) -> List[str]:
+    """页面正文的词元：汉字二元组与英文单词"""
+    text = FRONTMATTER.sub("", text, count=1)
+    text = CODE_FENCE.sub(" ", text)
+    text = INLINE_CODE.sub(" ", text)
+    text = LINK_TARGET.sub("]", text)
+    text = TAG.sub(" ", text).lower()
+    tokens: List[str] = []
+    for run in TOKEN.findall(text):
+        if CJK.match(run):
+            if len(run) == 1:
+                tokens.append(run)
+            else:
+                tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+        elif len(run) > 1:
+            tokens.append(run)
+    return tokens
+
+
+def shingles(tokens: Sequence[str], size: int = SHINGLE_SIZE) -> List[int]:
+    """size 个相邻词元组成的 shingle 的 32 位哈希（去重）"""
+    size = max(1, min(size, len(tokens)))
+    return sorted({
+        zlib.crc32(" ".join(tokens[i:i + size]).encode("utf-8"))
+        for i in range(len(tokens) - size + 1)
+    })
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = SEED):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self.coeffs = [(rng.randrange(1, PRIME), rng.randrange(0, PRIME)) for _ in range(num_perm)]
+        if np is not None:
+            self.a = np.array([a for a, _ in self.coeffs], dtype=np.uint64)[:, None]
+            self.b = np.array([b for _, b in self.coeffs], dtype=np.uint64)[:, None]
+
+    def signature(self, values: Sequence[int]) -> array:
+        """shingle 集合的 MinHash 签名（空集合时全部为 PRIME）"""
+        if not values:
+            return array("I", [PRIME] * self.num_perm)
+        if np is not None:
+            x = np.asarray(values, dtype=np.uint64)
+            sig = np.full(self.num_perm, PRIME, dtype=np.uint64)
+            for start in range(0, len(x), CHUNK):
+                # a < 2^31、x < 2^32，乘积不会溢出 uint64
+                hashed = (self.a * x[None, start:start + CHUNK] + self.b) % PRIME
+                np.minimum(sig, hashed.min(axis=1), out=sig)
+            return array("I", sig.astype(np.uint32).tolist())
+        return array("I", [min((a * x + b) % PRIME for x in values) for a, b in self.coeffs])
+
+
+def _encode(sig: array) -> str:
+    if sys.byteorder != "little":
+        sig = array("I", sig)
+        sig.byteswap()
+    return base64.b64encode(sig.tobytes()).decode("ascii")
+
+
+def _decode(data: str) -> array:
+    sig = array("I")
+    sig.frombytes(base64.b64decode(data))
+    if sys.byteorder != "little":
+        sig.byteswap()
+    return sig
+
+
+class RelatedIndex:
+    def __init__(
+        self,
+        content_dir: Path,
+        cache_dir: Optional[Path] = None,
+        output_path: Path = OUTPUT_PATH,
+        num_perm: int = NUM_PERM,
+        shingle_size: int = SHINGLE_SIZE,
+        bands: int = BANDS,
+        top_k: int = TOP_K,
+        min_score: float = MIN_SCORE,
+        max_score: float = MAX_SCORE,
+        same_section: bool = False,
+        dry_run: bool = False
+    ):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) 必须是 bands ({bands}) 的整数倍")
+        self.content_dir = content_dir
+        self.cache_path = cache_dir / "related-signatures.json" if cache_dir is not None else None
+        self.output_path = output_path
+        self.hasher = MinHasher(num_perm)
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.top_k = top_k
+        self.min_score = min_score
+        self.max_score = max_score
+        self.same_section = same_section
+        self.dry_run = dry_run
+        self.params = [CACHE_VERSION, num_perm, shingle_size, SEED]
+
+        # 路由 -> [内容哈希, 签名]
+        self.cached: Dict[str, list] = {}
+        if self.cache_path is not None and self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                data = {}
+            if data.get("params") == self.params:
+                self.cached = data.get("pages", {})
+
+        self.signatures: Dict[str, array] = {}
+        self.sections: Dict[str, str] = {}      # 路由 -> 页面所在目录
+        self.titles: Dict[str, str] = {}
+        self.related: Dict[str, List[Tuple[str, float]]] = {}
+        self.stats = {"pages": 0, "signed": 0, "cached": 0, "candidates": 0, "linked": 0}
+
+    def add(self, route: str, text: str) -> None:
+        """登记一个页面；内容哈希与缓存一致时沿用签名"""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+        self.titles[route] = parse_head(text)[0].title or route.rsplit("/", 1)[-1]
+        entry = self.cached.get(route)
+        if entry is not None and entry[0] == digest:
+            self.stats["cached"] += 1
+            self.signatures[route] = _decode(entry[1])
+            return
+        self.stats["signed"] += 1
+        sig = self.hasher.signature(shingles(tokenize(text), self.shingle_size))
+        self.signatures[route] = sig
+        self.cached[route] = [digest, _encode(sig)]
+
+    def update(self, pages: Optional[Dict[str, Path]] = None) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        签名全部页面并计算相关页面
+
+        pages 为 路由 -> 页面文件，默认为 content 目录的全部路由。
+        """
+        if pages is None:
+            pages = RouteIndex(self.content_dir).build().routes
+        for route, path in sorted(pages.items()):
+            self.sections[route] = path.parent.as_posix()
+            self.add(route, path.read_text(encoding="utf-8"))
+        # 已删除页面的签名不再保留
+        self.cached = {r: e for r, e in self.cached.items() if r in self.signatures}
+        self.stats["pages"] = len(self.signatures)
+        return self.compute()
+
+    def section(self, route: str) -> str:
+        return self.sections.get(route) or route.rsplit("/", 1)[0]
+
+    def candidates(self, routes: List[str]) -> set:
+        """LSH 分桶：任一段签名完全相同的页面对"""
+        rows = self.hasher.num_perm // self.bands
+        pairs = set()
+        for band in range(self.bands):
+            buckets: Dict[bytes, List[int]] = {}
+            lo, hi = band * rows, (band + 1) * rows
+            for i, route in enumerate(routes):
+                sig = self.signatures[route]
+                if sig[0] == PRIME:
+                    continue    # 没有正文
+                buckets.setdefault(sig[lo:hi].tobytes(), []).append(i)
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        if not self.same_section:
+            pairs = {(i, j) for i, j in pairs if self.section(routes[i]) != self.section(routes[j])}
+        return pairs
+
+    def scores(self, routes: List[str], pairs: List[Tuple[int, int]]) -> List[float]:
+        """候选对的 Jaccard 估计：签名中相同位置的比例"""
+        if not pairs:
+            return []
+        if np is not None:
+            matrix = np.array([self.signatures[r] for r in routes], dtype=np.uint32)
+            left = np.array([i for i, _ in pairs])
+            right = np.array([j for _, j in pairs])
+            return (matrix[left] == matrix[right]).mean(axis=1).tolist()
+        n = self.hasher.num_perm
+        return [
+            sum(x == y for x, y in zip(self.signatures[routes[i]], self.signatures[routes[j]])) / n
+            for i, j in pairs
+        ]
+
+    def compute(self) -> Dict[str, List[Tuple[str, float]]]:
+        routes = sorted(self.signatures)
+        pairs = sorted(self.candidates(routes))
+        self.stats["candidates"] = len(pairs)
+        found: Dict[str, List[Tuple[str, float]]] = {}
+        for (i, j), score in zip(pairs, self.scores(routes, pairs)):
+            if score < self.min_score or score >= self.max_score:
+                continue
+            score = round(score, 3)
+            found.setdefault(routes[i], []).append((routes[j], score))
+            found.setdefault(routes[j], []).append((routes[i], score))
+        self.related = {
+            route: sorted(items, key=lambda item: (-item[1], item[0]))[:self.top_k]
+            for route, items in sorted(found.items())
+        }
+        self.stats["linked"] = len(self.related)
+        return self.related
+
+    def save(self) -> None:
+        if self.dry_run:
+            return
+        linked = {r for items in self.related.values() for r, _ in items} | set(self.related)
+        data = {
+            "version": OUTPUT_VERSION,
+            "titles": {r: self.titles[r] for r in sorted(linked)},
+            "related": {r: [[t, s] for t, s in items] for r, items in self.related.items()},
+        }
+        write_text_atomic(self.output_path, json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if self.cache_path is not None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache = {"params": self.params, "pages": dict(sorted(self.cached.items()))}
+            write_text_atomic(self.cache_path, json.dumps(cache, ensure_ascii=False) + "\n")
+
+    def summary(self) -> str:
+        engine = "NumPy" if np is not None else "未安装 NumPy，逐个置换计算"
+        return (f"页面 {self.stats['pages']}，重新签名 {self.stats['signed']}，"
+                f"缓存命中 {self.stats['cached']}，候选对 {self.stats['candidates']}，"
+                f"有相关页面 {self.stats['linked']}（{engine}）")
@@ -0,0 +1,116 @@
+"""
+路由索引
+========
+
+一次扫描 content 目录与所有 _meta.json，建立 Nextra 路由表：
+    /docs/chapter-01/what-is-agent -> content/chapter-01/what-is-agent.mdx
+    /docs/chapter-01               -> content/chapter-01/index.mdx
+
+以 _ 或 . 开头的文件/目录不参与路由（与 Nextra 一致）。
+"""
+
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+DOCS_BASE = "/docs"
+PAGE_SUFFIXES = (".mdx", ".md")
+
+# _meta.js 顶层键（两格缩进）：  'chapter-01': ... / index: {
+META_JS_KEY = re.compile(r"^  (?:'([^']+)'|\"([^\"]+)\"|([\w$-]+))\s*:", re.MULTILINE)
+
+
+def read_meta(dir_path: Path) -> Optional[Dict]:
+    """读取目录的 _meta.json（或 _meta.js 的顶层键），不存在时返回 None"""
+    meta_json = dir_path / "_meta.json"
+    if meta_json.exists():
+        return json.loads(meta_json.read_text(encoding="utf-8"))
+    meta_js = dir_path / "_meta.js"
+    if meta_js.exists():
+        keys = META_JS_KEY.findall(meta_js.read_text(encoding="utf-8"))
+        return {next(k for k in groups if k): None for groups in keys}
+    return None
+
+
+class RouteIndex:
+    """content 目录的路由表"""
+
+    def __init__(self, content_dir: Path, base: str = DOCS_BASE):
+        self.content_dir = content_dir
+        self.base = base.rstrip("/")
+        self.routes: Dict[str, Path] = {}       # 路由 -> 页面文件
+        self.dirs: Dict[str, Path] = {}         # 目录路由 -> 目录
+        self.metas: Dict[str, Dict] = {}        # 目录路由 -> _meta 内容
+        self.meta_paths: Dict[str, Path] = {}   # 目录路由 -> _meta 文件
+        self.meta_errors: List[Tuple[Path, str]] = []
+
+    def route_for(self, rel_path: str) -> str:
+        """content 相对路径（posix，不含扩展名）转路由"""
+        parts = [p for p in rel_path.split("/") if p]
+        if parts and parts[-1] == "index":
+            parts.pop()
+        return "/".join([self.base] + parts) if parts else (self.base or "/")
+
+    def build(self) -> "RouteIndex":
+        for dirpath, dirnames, filenames in os.walk(self.content_dir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith(("_", ".")))
+            dir_path = Path(dirpath)
+            rel_dir = dir_path.relative_to(self.content_dir).as_posix()
+            rel_dir = "" if rel_dir == "." else rel_dir
+            dir_route = self.route_for(rel_dir)
+            self.dirs[dir_route] = dir_path
+
+            for name in ("_meta.json", "_meta.js"):
+                if name in filenames:
+                    self.meta_paths[dir_route] = dir_path / name
+                    try:
+                        self.metas[dir_route] = read_meta(dir_path)
+                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                        self.meta_errors.append((dir_path / name, str(e)))
+                    break
+
+            for name in filenames:
+                stem, ext = os.path.splitext(name)
+                if ext not in PAGE_SUFFIXES or name.startswith(("_", ".")):
+                    continue
+                rel = f"{rel_dir}/{stem}" if rel_dir else stem
+                self.routes[self.route_for(rel)] = dir_path / name
+        return self
+
+    def page_route(self, page: Path) -> str:
+        rel = page.relative_to(self.content_dir).with_suffix("").as_posix()
+        return self.route_for(rel)
+
+    def dir_route(self, page: Path) -> str:
+        """页面所在目录的路由（相对链接的解析基准）"""
+        rel = page.parent.relative_to(self.content_dir).as_posix()
+        return self.route_for("" if rel == "." else rel)
+
+    def normalize(self, url: str, page: Optional[Path] = None) -> str:
+        """把链接规范化为路由：去掉锚点/查询、扩展名、README/index，解析相对路径"""
+        path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+        if not path.startswith("/"):
+            base = self.dir_route(page) if page is not None else self.base
+            path = posixpath.join(base, path)
+        path = posixpath.normpath(path)
+        stem, ext = posixpath.splitext(path)
+        if ext in PAGE_SUFFIXES:
+            path = stem
+        head, tail = posixpath.split(path)
+        if tail.lower() in ("readme", "index"):
+            path = head
+        return path if path not in ("", ".") else "/"
+
+    def has_route(self, route: str) -> bool:
+        return route in self.routes
+
+    def listed_children(self, dir_route: str) -> Optional[Set[str]]:
+        """_meta 中列出的子项名；无 _meta 或含通配 '*' 时返回 None（全部可见）"""
+        meta = self.metas.get(dir_route)
+        if meta is None or "*" in meta:
+            return None
+        return set(meta.keys())
@@ -0,0 +1,277 @@
+"""
+路由清单、sitemap 与重定向
+==========================
+
+sync_from_source.py --routes 在同步结束后更新：
+
+    route-manifest.json     content 目录的全部路由：路由 -> 页面文件、源文件、内容哈希
+                            以及 redirects（旧路由 -> 新路由）；与 slug-registry.json 一样提交到仓库
+    public/sitemap.xml      由清单生成（需要 --site-url）
+    public/<旧路由>/index.html
+                            静态导出（GitHub Pages）用的跳转页；next start / Vercel 由
+                            next.config.mjs 的 redirects() 直接读取清单
+
+构建时 src/app/docs/[[...mdxPath]]/page.tsx 的 generateStaticParams 将清单与 Nextra
+遍历 content 目录的结果对照：清单遗漏的页面照常构建并警告，清单中没有页面的路由使构建失败。
+
+页面的源文件来自本次同步扫描的语料；本次未扫描到的页面查 slug 注册表，
+两者都没有记录的页面（如 sync_content.py 写入的页面）沿用上次清单。
+
+- 增量：页面文件的大小与 mtime 与缓存（.cache/route-hashes.json）一致时沿用哈希，
+  只有变化的页面会被读取
+- 重定向来自路由历史。上次清单中存在、本次消失的路由：
+    1. 同一源文件现在对应另一个路由（slug 改变）-> 重定向到新路由
+    2. 否则内容哈希只与一个新出现的路由相同（文件移动）-> 重定向到该路由
+    3. 都不满足时视为删除，只报告
+- 重定向链折叠（a -> b、b -> c 记为 a -> c）；旧路由重新出现时移除对应的重定向
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from .fsutil import write_text_atomic
+from .route_index import DOCS_BASE, PAGE_SUFFIXES, RouteIndex
+from .walk import DEFAULT_EXCLUDE
+
+MANIFEST_PATH = Path(__file__).resolve().parent.parent / "route-manifest.json"
+MANIFEST_VERSION = 1
+# 跳转页的标记：只清理由本模块写入的文件
+STUB_MARKER = '<meta name="generator" content="route-manifest">'
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def structure_digest(data: bytes) -> str:
+    """清单中路由、页面文件与重定向的哈希（忽略页面内容哈希：页面修改不改变路由结构）"""
+    manifest = json.loads(data)
+    routes = {route: entry.get("file") for route, entry in manifest.get("routes", {}).items()}
+    key = json.dumps([routes, manifest.get("redirects", {})], sort_keys=True, ensure_ascii=False)
+    return content_digest(key.encode("utf-8"))
+
+
+class RouteManifest:
+    def __init__(self, scope: str = "", base: str = DOCS_BASE):
+        self.scope = scope      # content 目录（相对清单所在目录）
+        self.base = base
+        self.routes: Dict[str, Dict[str, Optional[str]]] = {}   # 路由 -> {"file", "source", "hash"}
+        self.redirects: Dict[str, str] = {}                     # 旧路由 -> 新路由
+
+    @classmethod
+    def load(cls, path: Path, scope: str) -> Optional["RouteManifest"]:
+        """读取清单；不存在、版本或 content 目录不同时返回 None"""
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if data.get("version") != MANIFEST_VERSION or data.get("scope") != scope:
+            return None
+        manifest = cls(scope, data.get("base", DOCS_BASE))
+        manifest.routes = data.get("routes", {})
+        manifest.redirects = data.get("redirects", {})
+        return manifest
+
+    def save(self, path: Path) -> None:
+        data = {
+            "version": MANIFEST_VERSION,
+            "scope": self.scope,
+            "base": self.base,
+            "routes": dict(sorted(self.routes.items())),
+            "redirects": dict(sorted(self.redirects.items())),
+        }
+        write_text_atomic(path, json.dumps(data, indent=1, ensure_ascii=False) + "\n")
+
+    def link_history(self, previous: Optional["RouteManifest"]) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """
+        由上次的清单推导重定向，返回 (新增的重定向, 消失且没有去向的路由)
+
+        previous 中已有的重定向被继承并折叠。
+        """
+        if previous is None:
+            return [], []
+        redirects = dict(previous.redirects)
+        by_source = {e["source"]: r for r, e in self.routes.items() if e.get("source")}
+        by_hash: Dict[str, List[str]] = {}
+        for route in self.routes.keys() - previous.routes.keys():
+            by_hash.setdefault(self.routes[route]["hash"], []).append(route)
+
+        added: List[Tuple[str, str]] = []
+        removed: List[str] = []
+        for route, entry in previous.routes.items():
+            if route in self.routes:
+                continue
+            target = by_source.get(entry.get("source")) if entry.get("source") else None
+            if target is None and len(by_hash.get(entry["hash"], ())) == 1:
+                target = by_hash[entry["hash"]][0]
+            if target is None:
+                removed.append(route)
+                continue
+            redirects[route] = target
+            added.append((route, target))
+
+        self.redirects = {}
+        for old, target in redirects.items():
+            if old in self.routes:
+                continue    # 旧路由重新出现
+            seen = {old}
+            while target not in self.routes and target in redirects and target not in seen:
+                seen.add(target)
+                target = redirects[target]
+            if target in self.routes:
+                self.redirects[old] = target
+            elif old not in removed:
+                removed.append(old)
+        return added, removed
+
+    def sitemap(self, site_url: str) -> str:
+        site_url = site_url.rstrip("/")
+        urls = "".join(
+            f"  <url><loc>{escape(site_url + quote(route))}</loc></url>\n"
+            for route in sorted(self.routes)
+        )
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                f"{urls}</urlset>\n")
+
+
+def redirect_page(old: str, new: str) -> str:
+    """静态跳转页：相对链接，不依赖部署的 basePath"""
+    href = quote(posixpath.relpath(new, old)) + "/"
+    return ("<!doctype html>\n"
+            '<meta charset="utf-8">\n'
+            f"{STUB_MARKER}\n"
+            f'<meta http-equiv="refresh" content="0; url={href}">\n'
+            f'<link rel="canonical" href="{href}">\n'
+            f"<script>location.replace({json.dumps(href)} + location.hash)</script>\n"
+            f'<title>Redirecting</title>\n<a href="{href}">{escape(new)}</a>\n')
+
+
+class RouteOutputs:
+    """在同步结束后重建路由清单，并写出 sitemap 与跳转页"""
+
+    def __init__(
+        self,
+        content_dir: Path,
+        manifest_path: Path = MANIFEST_PATH,
+        cache_dir: Optional[Path] = None,
+        public_dir: Optional[Path] = None,
+        site_url: Optional[str] = None,
+        dry_run: bool = False
+    ):
+        self.content_dir = content_dir
+        self.manifest_path = manifest_path
+        self.hash_path = cache_dir / "route-hashes.json" if cache_dir is not None else None
+        self.public_dir = public_dir
+        self.site_url = site_url
+        self.dry_run = dry_run
+        self.scope = Path(os.path.relpath(content_dir, manifest_path.parent)).as_posix()
+        self.hashes: Dict[str, list] = {}   # 页面文件 -> [大小, mtime, 哈希]
+        if self.hash_path is not None and self.hash_path.exists():
+            try:
+                self.hashes = json.loads(self.hash_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                self.hashes = {}
+        self.warnings: List[str] = []
+        self.stats = {"routes": 0, "hashed": 0, "redirects": 0, "added": 0, "removed": 0}
+
+    def digest(self, path: Path, st) -> str:
+        key = str(path)
+        entry = self.hashes.get(key)
+        if entry is not None and entry[0] == st.st_size and entry[1] == st.st_mtime:
+            return entry[2]
+        self.stats["hashed"] += 1
+        digest = content_digest(path.read_bytes())
+        self.hashes[key] = [st.st_size, st.st_mtime, digest]
+        return digest
+
+    def build(self, sources: Dict[str, str], previous: Optional[RouteManifest]) -> RouteManifest:
+        """
+        扫描 content 目录建立清单
+
+        sources 为本次同步的 页面文件（相对 content 目录）-> 源文件；
+        未在本次同步中出现的页面沿用上次清单记录的源文件。
+        """
+        index = RouteIndex(self.content_dir)
+        manifest = RouteManifest(self.scope, index.base)
+        known = {e["file"]: e.get("source") for e in previous.routes.values()} if previous else {}
+        seen = set()
+        for dirpath, dirnames, filenames in os.walk(self.content_dir):
+            # 与 Nextra 一致：_ 或 . 开头的文件/目录不参与路由
+            dirnames[:] = sorted(d for d in dirnames
+                                 if not d.startswith(("_", ".")) and d not in DEFAULT_EXCLUDE)
+            for name in sorted(filenames):
+                stem, ext = os.path.splitext(name)
+                if ext not in PAGE_SUFFIXES or name.startswith(("_", ".")):
+                    continue
+                path = Path(dirpath) / name
+                rel = path.relative_to(self.content_dir).as_posix()
+                seen.add(str(path))
+                route = index.route_for(rel[:-len(ext)])
+                manifest.routes[route] = {
+                    "file": rel,
+                    "source": sources.get(rel, known.get(rel)),
+                    "hash": self.digest(path, path.stat()),
+                }
+        self.hashes = {k: v for k, v in self.hashes.items() if k in seen}
+        return manifest
+
+    def update(self, sources: Dict[str, str]) -> RouteManifest:
+        previous = RouteManifest.load(self.manifest_path, self.scope)
+        manifest = self.build(sources, previous)
+        added, removed = manifest.link_history(previous)
+        self.stats.update(routes=len(manifest.routes), redirects=len(manifest.redirects),
+                          added=len(added), removed=len(removed))
+        for old, new in added:
+            self.warnings.append(f"路由已改变: {old} -> {new}（已添加重定向）")
+        for route in removed:
+            self.warnings.append(f"路由已删除且没有去向: {route}")
+        if self.dry_run:
+            return manifest
+
+        manifest.save(self.manifest_path)
+        if self.hash_path is not None:
+            self.hash_path.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(self.hash_path, json.dumps(self.hashes, ensure_ascii=False) + "\n")
+        if self.public_dir is not None:
+            self.write_redirect_pages(manifest, previous)
+            if self.site_url:
+                self.public_dir.mkdir(parents=True, exist_ok=True)
+                write_text_atomic(self.public_dir / "sitemap.xml", manifest.sitemap(self.site_url))
+        return manifest
+
+    def stub_path(self, route: str) -> Path:
+        return self.public_dir.joinpath(*route.strip("/").split("/"), "index.html")
+
+    def write_redirect_pages(self, manifest: RouteManifest, previous: Optional[RouteManifest]) -> None:
+        # 清理不再需要的跳转页（只删除带标记的文件，路由重新出现时不会与页面冲突）
+        stale = set(previous.redirects) - set(manifest.redirects) if previous else set()
+        for route in stale:
+            stub = self.stub_path(route)
+            if stub.is_file() and STUB_MARKER in stub.read_text(encoding="utf-8"):
+                stub.unlink()
+                try:
+                    stub.parent.rmdir()
+                except OSError:
+                    pass
+        for old, new in manifest.redirects.items():
+            stub = self.stub_path(old)
+            if stub.exists() and STUB_MARKER not in stub.read_text(encoding="utf-8"):
+                self.warnings.append(f"跳转页与已有文件冲突，未写入: {stub}")
+                continue
+            stub.parent.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(stub, redirect_page(old, new))
+
+    def summary(self) -> str:
+        sitemap = "，sitemap.xml" if self.site_url and self.public_dir is not None else ""
+        return (f"路由 {self.stats['routes']}，重新计算哈希 {self.stats['hashed']}，"
+                f"重定向 {self.stats['redirects']}（新增 {self.stats['added']}），"
+                f"删除 {self.stats['removed']}{sitemap}")
@@ -0,0 +1,219 @@
+"""
+Slug 注册表
+===========
+
+标题 ↔ slug ↔ 源文件 的唯一来源，持久化在 apps/docs/slug-registry.json，
+sync_from_source.py 与 sync_content.py 共用，两个工具对同一页面的 slug 不会再不一致。
+
+文件格式：
+    {
+      "titles":  {"什么是智能体": "what-is-agent", "本章小结": "summary", "章节小结": "summary", ...},
+      "sources": {"chapter01/1.1-什么是智能体.md": "what-is-agent", ...}
+    }
+
+- titles 中多个标题可以指向同一个 slug（别名）
+- sources 记录每个源文件（相对源 docs 目录）最近一次同步使用的 slug
+- 加载时一次性建立反向索引，标题→slug、slug→标题、(章节, slug)→源文件 均为 O(1) 查找
+- 新标题按固定规则自动生成 slug 并登记；生成的 slug 已被其他标题占用（跨章节冲突）
+  或同一章节中两个源文件得到相同 slug 时，追加 -2、-3 … 并记录冲突
+- 初始内容取自原 generate_slug 对已提交目录树（content/import-agents）的输出，
+  tree_mismatches() 检查注册表是否仍能复现已发布的文件名
+- link_target() 把源文件之间的相对 .md 链接（如 1.3-构建第一个智能体.md、../chapter05/README.md）
+  解析为目标页面，同步时据此改写为页面路由
+"""
+
+import json
+import posixpath
+import re
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .convert import NUMBERED_STEM, upstream_title
+from .fsutil import write_text_atomic
+from .walk import chapter_number
+
+REGISTRY_PATH = Path(__file__).resolve().parent.parent / "slug-registry.json"
+
+
+def auto_slug(title: str) -> str:
+    """由标题生成 slug：英文转小写连字符，中文保留"""
+    slug = title.lower()
+    slug = re.sub(r'[^\w\u4e00-\u9fff]+', '-', slug)
+    slug = re.sub(r'-+', '-', slug)
+    slug = slug.strip('-')
+    return slug if slug else "page"
+
+
+class SlugRegistry:
+    def __init__(self, path: Path):
+        self.path = path
+        self.titles: Dict[str, str] = {}
+        self.sources: Dict[str, str] = {}
+        if path.exists():
+            data = json.loads(path.read_text(encoding="utf-8"))
+            self.titles = data.get("titles", {})
+            self.sources = data.get("sources", {})
+
+        # 反向索引
+        self.slug_titles: Dict[str, List[str]] = {}
+        for title, slug in self.titles.items():
+            self.slug_titles.setdefault(slug, []).append(title)
+        self.chapter_sources: Dict[Tuple[str, str], str] = {}
+        for source, slug in self.sources.items():
+            self.chapter_sources[(self.chapter_of(source), slug)] = source
+
+        self.collisions: List[str] = []
+        self.dirty = False
+
+    @staticmethod
+    def chapter_of(source: str) -> str:
+        parent = PurePosixPath(source).parent
+        return "" if str(parent) == "." else str(parent)
+
+    # ---- 查找 ----
+
+    def slug_for(self, title: str) -> Optional[str]:
+        return self.titles.get(title)
+
+    def titles_for(self, slug: str) -> List[str]:
+        return self.slug_titles.get(slug, [])
+
+    def slug_for_source(self, source: str) -> Optional[str]:
+        return self.sources.get(source)
+
+    def source_for(self, chapter: str, slug: str) -> Optional[str]:
+        """章节（源目录名，如 chapter01）中使用该 slug 的源文件"""
+        return self.chapter_sources.get((chapter, slug))
+
+    @staticmethod
+    def target_chapter(chapter: str) -> str:
+        """源章节目录名 -> 目标章节目录名（chapter07 -> chapter-07）"""
+        number = chapter_number(chapter) if chapter else None
+        return f"chapter-{number:02d}" if number is not None else chapter
+
+    def page_file(self, source: str, slug: str) -> str:
+        chapter = self.target_chapter(self.chapter_of(source))
+        return f"{chapter}/{slug}.mdx" if chapter else f"{slug}.mdx"
+
+    def pages(self) -> Dict[str, str]:
+        """已登记源文件对应的页面文件（相对同步目标目录）-> 源文件"""
+        return {self.page_file(source, slug): source for source, slug in self.sources.items()}
+
+    def link_target(self, source: str, url: str) -> Optional[str]:
+        """
+        源文件 source 中指向另一个源 .md 文件的相对链接 -> 目标页面文件（相对同步目标目录）
+
+        README.md 对应章节的 index.mdx；尚未登记的源文件按标题查 slug（前向链接）。
+        不是相对 .md 链接或无法解析时返回 None。
+        """
+        path = unquote(url.split("#", 1)[0].split("?", 1)[0])
+        if not path.lower().endswith(".md") or path.startswith("/") or "://" in path:
+            return None
+        linked = posixpath.normpath(posixpath.join(posixpath.dirname(source), path))
+        if linked.startswith("../"):
+            return None
+        if posixpath.basename(linked).lower() == "readme.md":
+            return self.page_file(linked, "index")
+        slug = self.sources.get(linked)
+        if slug is None:
+            # 编号的章号必须与所在章节一致（1.x 的链接写成 9.7-*.md 时不猜测）
+            match = NUMBERED_STEM.match(posixpath.basename(linked)[:-3])
+            chapter = chapter_number(self.chapter_of(linked))
+            if match is None or chapter is None or int(match.group(1)) == chapter:
+                slug = self.titles.get(upstream_title(linked))
+        return self.page_file(linked, slug) if slug else None
+
+    # ---- 登记 ----
+
+    def _add_title(self, title: str, slug: str) -> None:
+        self.titles[title] = slug
+        self.slug_titles.setdefault(slug, []).append(title)
+        self.dirty = True
+
+    def register(self, title: str) -> str:
+        """返回标题的 slug，未登记时自动生成并登记"""
+        slug = self.titles.get(title)
+        if slug is not None:
+            return slug
+
+        base = auto_slug(title)
+        slug = base
+        n = 2
+        while slug in self.slug_titles:
+            slug = f"{base}-{n}"
+            n += 1
+        if slug != base:
+            self.collisions.append(
+                f"slug '{base}' 已属于 {self.slug_titles[base]}，'{title}' 改用 '{slug}'"
+            )
+        self._add_title(title, slug)
+        return slug
+
+    def register_source(self, source: str, title: str) -> str:
+        """登记源文件（相对源 docs 目录的 POSIX 路径），返回其 slug
+
+        已登记的源文件保持原 slug，同一章节中 slug 被其他源文件占用时追加序号。
+        """
+        chapter = self.chapter_of(source)
+        slug = self.sources.get(source)
+        if slug is None:
+            slug = self.register(title)
+            owner = self.chapter_sources.get((chapter, slug))
+            if owner is not None and owner != source:
+                base = slug
+                n = 2
+                while (chapter, slug) in self.chapter_sources:
+                    slug = f"{base}-{n}"
+                    n += 1
+                self.collisions.append(f"{chapter or '/'}: '{base}' 已属于 {owner}，{source} 改用 '{slug}'")
+            self.sources[source] = slug
+            self.chapter_sources[(chapter, slug)] = source
+            self.dirty = True
+        return slug
+
+    def retain(self, chapter: str, present: set) -> None:
+        """移除章节中已不存在的源文件记录，改名后的源文件可以继承原 slug"""
+        for (ch, slug), source in list(self.chapter_sources.items()):
+            if ch == chapter and source not in present:
+                del self.chapter_sources[(ch, slug)]
+                del self.sources[source]
+                self.dirty = True
+
+    def save(self) -> bool:
+        """有新登记时写回注册表，返回是否写入"""
+        if not self.dirty:
+            return False
+        data = {
+            "titles": dict(sorted(self.titles.items(), key=lambda kv: (kv[1], kv[0]))),
+            "sources": dict(sorted(self.sources.items())),
+        }
+        write_text_atomic(self.path, json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+        self.dirty = False
+        return True
+
+
+def tree_mismatches(registry: SlugRegistry, tree_dir: Path) -> List[str]:
+    """对照已发布的目录树，列出注册表给出的 slug 与现有文件名不一致之处
+
+    检查两项：各 _meta.json 中每个页面的标题在注册表中得到的 slug 等于其文件名；
+    sources 中每个源文件对应的页面在目录树中存在。
+    """
+    problems = []
+    metas = [tree_dir / "_meta.json"] + sorted(tree_dir.glob("chapter-*/_meta.json"))
+    for meta_path in metas:
+        if not meta_path.exists():
+            continue
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        for slug, title in meta.items():
+            if slug == "index" or not (meta_path.parent / f"{slug}.mdx").exists():
+                continue
+            expected = registry.slug_for(title)
+            if expected != slug:
+                rel = meta_path.parent.relative_to(tree_dir).as_posix()
+                problems.append(f"{rel}/{slug}.mdx: 标题 '{title}' 在注册表中为 {expected!r}")
+
+    for page, source in registry.pages().items():
+        if not (tree_dir / page).exists():
+            problems.append(f"{source}: 页面不存在 {page}")
+    return problems
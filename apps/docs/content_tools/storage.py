@@ -0,0 +1,534 @@
+"""
+内容存储接口
+============
+
+同步与迁移工具对内容文件的读写、列目录、移动与删除都经过 Storage，
+而不是直接调用 Path / shutil / os.scandir：
+
+    LocalStorage     本地磁盘（默认）；写入走 write_bytes_atomic，与快照共享的硬链接不受影响
+    MemoryStorage    进程内的字典，用于测试与基准（排除磁盘与页缓存的干扰）；
+                     from_directory 可预载一棵真实目录树
+    BatchedStorage   包装另一个后端：写入先缓冲，flush 时在线程池中批量提交；
+                     读取能看到尚未提交的写入，删除、移动与列目录之前先 flush
+
+scan / walk 返回与 os.DirEntry 同形的条目（name、path、is_dir()、is_file()、stat()），
+调用方不需要区分后端。用法：
+
+    storage = LocalStorage()
+    with storage.batch() as batch:          # 退出时提交全部写入
+        batch.write_text(path, content)
+
+迁移日志、快照、图片/高亮缓存与 slug 注册表属于工具自身的状态，不经过 Storage。
+"""
+
+import os
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+from . import walk as _walk
+from .fsutil import write_bytes_atomic
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+
+class Storage(ABC):
+    """存储后端的公共接口；子类必须实现全部“基本操作”（缺少时无法实例化），其余操作由它们派生"""
+
+    # 写入是否落盘（False 时工具跳过快照、注册表等磁盘上的附属状态）
+    persistent = True
+
+    # --- 基本操作 ---
+
+    @abstractmethod
+    def read_bytes(self, path: PathLike) -> bytes:
+        raise NotImplementedError
+
+    @abstractmethod
+    def write_bytes(self, path: PathLike, data: bytes) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def stat(self, path: PathLike):
+        """返回带 st_size / st_mtime 的对象；不存在时抛出 FileNotFoundError"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_dir(self, path: PathLike) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def mkdir(self, path: PathLike) -> None:
+        """创建目录及其父目录（已存在时不报错）"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def unlink(self, path: PathLike) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rmtree(self, path: PathLike) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def move(self, src: PathLike, dst: PathLike) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_dir(self, path: PathLike) -> list:
+        """目录中的全部条目（不排序、不过滤）；目录不存在时返回空列表"""
+        raise NotImplementedError
+
+    # --- 派生操作 ---
+
+    def read_text(self, path: PathLike) -> str:
+        return self.read_bytes(path).decode("utf-8")
+
+    def read_prefix(self, path: PathLike, size: int) -> bytes:
+        """文件的前 size 个字节（frontmatter.read_head 使用）"""
+        return self.read_bytes(path)[:size]
+
+    def write_text(self, path: PathLike, content: str) -> None:
+        self.write_bytes(path, content.encode("utf-8"))
+
+    def exists(self, path: PathLike) -> bool:
+        try:
+            self.stat(path)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def is_file(self, path: PathLike) -> bool:
+        return self.exists(path) and not self.is_dir(path)
+
+    def scan(
+        self,
+        path: PathLike,
+        suffix: Optional[str] = None,
+        files: bool = True,
+        dirs: bool = False,
+        exclude: Sequence[str] = _walk.DEFAULT_EXCLUDE
+    ) -> list:
+        """列出单个目录（按名称排序），语义同 walk.scan"""
+        entries = []
+        for entry in self.list_dir(path):
+            if exclude and _walk._matches(entry.name, entry.name, exclude):
+                continue
+            if entry.is_dir():
+                if dirs:
+                    entries.append(entry)
+            elif files and (suffix is None or entry.name.endswith(suffix)):
+                entries.append(entry)
+        entries.sort(key=lambda e: e.name)
+        return entries
+
+    def walk(
+        self,
+        root: PathLike,
+        suffix: Optional[str] = None,
+        include: Sequence[str] = (),
+        exclude: Sequence[str] = _walk.DEFAULT_EXCLUDE,
+        dirs: bool = False
+    ) -> Iterator:
+        """深度优先惰性遍历，语义同 walk.walk"""
+        root = os.fspath(root)
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            subdirs = []
+            for entry in self.scan(os.path.join(root, rel_dir) if rel_dir else root, dirs=True, exclude=()):
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if exclude and _walk._matches(entry.name, rel, exclude):
+                    continue
+                if entry.is_dir():
+                    subdirs.append(rel)
+                    if dirs:
+                        yield entry
+                elif suffix is not None and not entry.name.endswith(suffix):
+                    continue
+                elif not include or _walk._matches(entry.name, rel, include):
+                    yield entry
+            pending.extend(reversed(subdirs))
+
+    def chapter_dirs(self, root: PathLike) -> list:
+        """root 下的章节目录，按章节编号排序"""
+        chapters = [
+            e for e in self.scan(root, files=False, dirs=True)
+            if _walk.chapter_number(e.name) is not None
+        ]
+        chapters.sort(key=lambda e: _walk.chapter_number(e.name))
+        return chapters
+
+    def flush(self) -> None:
+        """提交缓冲的写入（无缓冲的后端为空操作）"""
+
+    @contextmanager
+    def batch(self, workers: int = 8):
+        """批量写入：块内的写入缓冲起来，退出时并行提交"""
+        batched = BatchedStorage(self, workers=workers)
+        try:
+            yield batched
+        finally:
+            batched.flush()
+
+
+class LocalStorage(Storage):
+    """本地磁盘"""
+
+    def read_bytes(self, path: PathLike) -> bytes:
+        return Path(path).read_bytes()
+
+    def read_prefix(self, path: PathLike, size: int) -> bytes:
+        with open(path, "rb") as f:
+            return f.read(size)
+
+    def write_bytes(self, path: PathLike, data: bytes) -> None:
+        write_bytes_atomic(Path(path), data)
+
+    def stat(self, path: PathLike):
+        return os.stat(path)
+
+    def exists(self, path: PathLike) -> bool:
+        return os.path.exists(path)
+
+    def is_file(self, path: PathLike) -> bool:
+        return os.path.isfile(path)
+
+    def is_dir(self, path: PathLike) -> bool:
+        return os.path.isdir(path)
+
+    def mkdir(self, path: PathLike) -> None:
+        os.makedirs(path, exist_ok=True)
+
+    def unlink(self, path: PathLike) -> None:
+        os.unlink(path)
+
+    def rmtree(self, path: PathLike) -> None:
+        shutil.rmtree(path)
+
+    def move(self, src: PathLike, dst: PathLike) -> None:
+        shutil.move(os.fspath(src), os.fspath(dst))
+
+    def list_dir(self, path: PathLike) -> list:
+        return _walk.scan(path, dirs=True, exclude=())
+
+    # 直接使用 os.scandir 的实现（DirEntry 缓存 stat）
+    def scan(self, path, suffix=None, files=True, dirs=False, exclude=_walk.DEFAULT_EXCLUDE) -> list:
+        return _walk.scan(path, suffix=suffix, files=files, dirs=dirs, exclude=exclude)
+
+    def walk(self, root, suffix=None, include=(), exclude=_walk.DEFAULT_EXCLUDE, dirs=False):
+        return _walk.walk(root, suffix=suffix, include=include, exclude=exclude, dirs=dirs)
+
+    def chapter_dirs(self, root: PathLike) -> list:
+        return _walk.chapter_dirs(root)
+
+
+class MemoryStat:
+    __slots__ = ("st_size", "st_mtime")
+
+    def __init__(self, st_size: int, st_mtime: float):
+        self.st_size = st_size
+        self.st_mtime = st_mtime
+
+
+class MemoryEntry:
+    """MemoryStorage 的目录条目，接口与 os.DirEntry 相同"""
+    __slots__ = ("storage", "name", "path")
+
+    def __init__(self, storage: "MemoryStorage", name: str, path: str):
+        self.storage = storage
+        self.name = name
+        self.path = path
+
+    def is_dir(self) -> bool:
+        return self.storage.is_dir(self.path)
+
+    def is_file(self) -> bool:
+        return self.storage.is_file(self.path)
+
+    def stat(self) -> MemoryStat:
+        return self.storage.stat(self.path)
+
+    def __fspath__(self) -> str:
+        return self.path
+
+    def __repr__(self) -> str:
+        return f"<MemoryEntry {self.name!r}>"
+
+
+def _key(path: PathLike) -> str:
+    return os.path.abspath(os.fspath(path))
+
+
+class MemoryStorage(Storage):
+    """进程内存储：文件内容、mtime 与目录结构都保存在字典中（线程安全）"""
+
+    persistent = False
+
+    def __init__(self):
+        self.files: Dict[str, Tuple[bytes, float]] = {}
+        self.children: Dict[str, Set[str]] = {}     # 目录 -> 子项名称
+        self._clock = 0.0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_directory(cls, *roots: PathLike) -> "MemoryStorage":
+        """创建并预载一个或多个目录"""
+        storage = cls()
+        for root in roots:
+            storage.load(root)
+        return storage
+
+    def load(self, root: PathLike, exclude: Sequence[str] = _walk.DEFAULT_EXCLUDE) -> int:
+        """预载 root 下的全部文件（路径保持不变，mtime 取磁盘上的值），返回文件数"""
+        count = 0
+        self.mkdir(root)
+        for entry in _walk.walk(root, exclude=exclude, dirs=True):
+            if entry.is_dir():
+                self.mkdir(entry.path)
+            else:
+                with open(entry.path, "rb") as f:
+                    self._put(_key(entry.path), f.read(), entry.stat().st_mtime)
+                count += 1
+        return count
+
+    def _tick(self) -> float:
+        # mtime 严格递增，增量同步的新旧比较不会因时钟精度而相等
+        self._clock = max(time.time(), self._clock + 1e-6)
+        return self._clock
+
+    def _require_dir(self, key: str) -> None:
+        parent = os.path.dirname(key)
+        if parent != key and parent not in self.children:
+            raise FileNotFoundError(f"No such directory: {parent!r}")
+
+    def read_bytes(self, path: PathLike) -> bytes:
+        key = _key(path)
+        with self._lock:
+            if key not in self.files:
+                if key in self.children:
+                    raise IsADirectoryError(key)
+                raise FileNotFoundError(key)
+            return self.files[key][0]
+
+    def _put(self, key: str, data: bytes, mtime: float) -> None:
+        with self._lock:
+            if key in self.children:
+                raise IsADirectoryError(key)
+            self._require_dir(key)
+            self.files[key] = (bytes(data), mtime)
+            self.children[os.path.dirname(key)].add(os.path.basename(key))
+
+    def write_bytes(self, path: PathLike, data: bytes) -> None:
+        with self._lock:
+            self._put(_key(path), data, self._tick())
+
+    def stat(self, path: PathLike) -> MemoryStat:
+        key = _key(path)
+        with self._lock:
+            if key in self.files:
+                data, mtime = self.files[key]
+                return MemoryStat(len(data), mtime)
+            if key in self.children:
+                return MemoryStat(0, 0.0)
+        raise FileNotFoundError(key)
+
+    def is_dir(self, path: PathLike) -> bool:
+        return _key(path) in self.children
+
+    def is_file(self, path: PathLike) -> bool:
+        return _key(path) in self.files
+
+    def mkdir(self, path: PathLike) -> None:
+        key = _key(path)
+        with self._lock:
+            missing = []
+            while key not in self.children:
+                if key in self.files:
+                    raise FileExistsError(key)
+                missing.append(key)
+                parent = os.path.dirname(key)
+                if parent == key:
+                    break
+                key = parent
+            for key in reversed(missing):
+                self.children[key] = set()
+                parent = os.path.dirname(key)
+                if parent != key:
+                    self.children[parent].add(os.path.basename(key))
+
+    def unlink(self, path: PathLike) -> None:
+        key = _key(path)
+        with self._lock:
+            if key not in self.files:
+                raise FileNotFoundError(key)
+            del self.files[key]
+            self.children[os.path.dirname(key)].discard(os.path.basename(key))
+
+    def rmtree(self, path: PathLike) -> None:
+        key = _key(path)
+        with self._lock:
+            if key not in self.children:
+                raise FileNotFoundError(key)
+            for name in list(self.children[key]):
+                child = os.path.join(key, name)
+                if child in self.children:
+                    self.rmtree(child)
+                else:
+                    del self.files[child]
+            del self.children[key]
+            self.children[os.path.dirname(key)].discard(os.path.basename(key))
+
+    def move(self, src: PathLike, dst: PathLike) -> None:
+        src_key, dst_key = _key(src), _key(dst)
+        with self._lock:
+            # 与 shutil.move 相同：目标是已存在的目录时移入其中
+            if dst_key in self.children:
+                dst_key = os.path.join(dst_key, os.path.basename(src_key))
+            if src_key in self.files:
+                data, mtime = self.files[src_key]
+                self._put(dst_key, data, mtime)
+                self.unlink(src_key)
+                return
+            if src_key not in self.children:
+                raise FileNotFoundError(src_key)
+            self._require_dir(dst_key)
+            prefix = src_key + os.sep
+            moved = [k for k in self.children if k == src_key or k.startswith(prefix)]
+            for k in moved:
+                self.children[dst_key + k[len(src_key):]] = self.children.pop(k)
+            for k in [k for k in self.files if k.startswith(prefix)]:
+                self.files[dst_key + k[len(src_key):]] = self.files.pop(k)
+            self.children[os.path.dirname(src_key)].discard(os.path.basename(src_key))
+            self.children[os.path.dirname(dst_key)].add(os.path.basename(dst_key))
+
+    def list_dir(self, path: PathLike) -> List[MemoryEntry]:
+        key = _key(path)
+        with self._lock:
+            names = list(self.children.get(key, ()))
+        return [MemoryEntry(self, name, os.path.join(key, name)) for name in names]
+
+    def size(self) -> int:
+        """全部文件内容的总字节数"""
+        with self._lock:
+            return sum(len(data) for data, _ in self.files.values())
+
+
+class BatchedStorage(Storage):
+    """写入缓冲：write_* 只记入内存，flush 时在线程池中并行写入后端"""
+
+    def __init__(self, backend: Storage, workers: int = 8, max_pending: int = 64 * 1024 * 1024):
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.max_pending = max_pending      # 缓冲超过该字节数时自动提交
+        self.persistent = backend.persistent
+        self.pending: Dict[str, Tuple[PathLike, bytes]] = {}
+        self.pending_bytes = 0
+        self.flushed = 0
+        self._lock = threading.Lock()
+
+    def read_bytes(self, path: PathLike) -> bytes:
+        with self._lock:
+            item = self.pending.get(_key(path))
+        return item[1] if item is not None else self.backend.read_bytes(path)
+
+    def read_prefix(self, path: PathLike, size: int) -> bytes:
+        with self._lock:
+            item = self.pending.get(_key(path))
+        return item[1][:size] if item is not None else self.backend.read_prefix(path, size)
+
+    def write_bytes(self, path: PathLike, data: bytes) -> None:
+        key = _key(path)
+        with self._lock:
+            previous = self.pending.get(key)
+            if previous is not None:
+                self.pending_bytes -= len(previous[1])
+            self.pending[key] = (path, bytes(data))
+            self.pending_bytes += len(data)
+            full = self.pending_bytes >= self.max_pending
+        if full:
+            self.flush()
+
+    def stat(self, path: PathLike):
+        with self._lock:
+            item = self.pending.get(_key(path))
+        if item is not None:
+            return MemoryStat(len(item[1]), time.time())
+        return self.backend.stat(path)
+
+    def is_dir(self, path: PathLike) -> bool:
+        return self.backend.is_dir(path)
+
+    def is_file(self, path: PathLike) -> bool:
+        with self._lock:
+            if _key(path) in self.pending:
+                return True
+        return self.backend.is_file(path)
+
+    def mkdir(self, path: PathLike) -> None:
+        self.backend.mkdir(path)
+
+    # 以下操作可能与缓冲中的写入冲突，先提交再执行
+
+    def unlink(self, path: PathLike) -> None:
+        self.flush()
+        self.backend.unlink(path)
+
+    def rmtree(self, path: PathLike) -> None:
+        self.flush()
+        self.backend.rmtree(path)
+
+    def move(self, src: PathLike, dst: PathLike) -> None:
+        self.flush()
+        self.backend.move(src, dst)
+
+    def list_dir(self, path: PathLike) -> list:
+        self.flush()
+        return self.backend.list_dir(path)
+
+    def scan(self, path, suffix=None, files=True, dirs=False, exclude=_walk.DEFAULT_EXCLUDE) -> list:
+        self.flush()
+        return self.backend.scan(path, suffix=suffix, files=files, dirs=dirs, exclude=exclude)
+
+    def walk(self, root, suffix=None, include=(), exclude=_walk.DEFAULT_EXCLUDE, dirs=False):
+        self.flush()
+        return self.backend.walk(root, suffix=suffix, include=include, exclude=exclude, dirs=dirs)
+
+    def chapter_dirs(self, root: PathLike) -> list:
+        self.flush()
+        return self.backend.chapter_dirs(root)
+
+    def flush(self) -> None:
+        with self._lock:
+            items = list(self.pending.values())
+            self.pending = {}
+            self.pending_bytes = 0
+        if items:
+            if self.workers == 1 or len(items) == 1:
+                for path, data in items:
+                    self.backend.write_bytes(path, data)
+            else:
+                with ThreadPoolExecutor(max_workers=min(self.workers, len(items))) as pool:
+                    # list() 让写入错误在此处抛出
+                    list(pool.map(lambda item: self.backend.write_bytes(*item), items))
+            self.flushed += len(items)
+        self.backend.flush()
+
+
+BACKENDS = ("local", "memory", "batched")
+
+
+def open_storage(kind: str = "local", preload: Sequence[PathLike] = (), workers: int = 8) -> Storage:
+    """按名称创建后端（命令行 --storage 使用）；memory 后端预载 preload 中存在的目录"""
+    if kind == "local":
+        return LocalStorage()
+    if kind == "batched":
+        return BatchedStorage(LocalStorage(), workers=workers)
+    if kind == "memory":
+        return MemoryStorage.from_directory(*[p for p in preload if os.path.isdir(p)])
+    raise ValueError(f"未知的存储后端: {kind}（可选: {', '.join(BACKENDS)}）")
@@ -0,0 +1,93 @@
+"""
+流式目录遍历
+============
+
+基于 os.scandir 的惰性遍历，替代各工具中的 glob / rglob / iterdir + sorted：
+
+- 逐个产出 os.DirEntry，stat 结果由 DirEntry 缓存，mtime/size 不再重复系统调用
+- exclude 在进入目录之前剪枝（被排除的目录不会被列出），include 过滤文件
+- 每次只展开一个目录并在目录内排序，内存与单个目录的大小成正比，而不是整棵树
+- 章节目录按编号发现（chapter01 / chapter-01 / Chapter-1），不限定章节数量
+
+模式按 fnmatch 同时匹配文件名与相对路径（posix），例如 "_backup*"、"chapter-*/drafts"。
+"""
+
+import fnmatch
+import os
+import re
+from typing import Iterator, List, Optional, Sequence, Union
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+DEFAULT_EXCLUDE = (".*", "__pycache__", "node_modules")
+CHAPTER_DIR = re.compile(r"^chapter-?(\d+)$", re.IGNORECASE)
+
+
+def _matches(name: str, rel: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatchcase(name, p) or fnmatch.fnmatchcase(rel, p) for p in patterns)
+
+
+def scan(
+    path: PathLike,
+    suffix: Optional[str] = None,
+    files: bool = True,
+    dirs: bool = False,
+    exclude: Sequence[str] = DEFAULT_EXCLUDE
+) -> List[os.DirEntry]:
+    """列出单个目录（按名称排序），目录不存在时返回空列表"""
+    try:
+        it = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+    entries = []
+    with it:
+        for entry in it:
+            if exclude and _matches(entry.name, entry.name, exclude):
+                continue
+            if entry.is_dir():
+                if dirs:
+                    entries.append(entry)
+            elif files and (suffix is None or entry.name.endswith(suffix)):
+                entries.append(entry)
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+
+def walk(
+    root: PathLike,
+    suffix: Optional[str] = None,
+    include: Sequence[str] = (),
+    exclude: Sequence[str] = DEFAULT_EXCLUDE,
+    dirs: bool = False
+) -> Iterator[os.DirEntry]:
+    """深度优先惰性遍历 root 下的文件（dirs=True 时也产出目录，先于其内容）"""
+    root = os.fspath(root)
+    pending = [""]
+    while pending:
+        rel_dir = pending.pop()
+        subdirs = []
+        for entry in scan(os.path.join(root, rel_dir) if rel_dir else root, dirs=True, exclude=()):
+            rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if exclude and _matches(entry.name, rel, exclude):
+                continue
+            if entry.is_dir():
+                subdirs.append(rel)
+                if dirs:
+                    yield entry
+            elif suffix is not None and not entry.name.endswith(suffix):
+                continue
+            elif not include or _matches(entry.name, rel, include):
+                yield entry
+        pending.extend(reversed(subdirs))
+
+
+def chapter_number(name: str) -> Optional[int]:
+    match = CHAPTER_DIR.match(name)
+    return int(match.group(1)) if match else None
+
+
+def chapter_dirs(root: PathLike) -> List[os.DirEntry]:
+    """root 下的章节目录，按章节编号排序"""
+    chapters = [e for e in scan(root, files=False, dirs=True) if chapter_number(e.name) is not None]
+    chapters.sort(key=lambda e: chapter_number(e.name))
+    return chapters
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Converter Golden Corpus
+=======================
+证明 Markdown → MDX 转换器的改写不改变输出：对参考语料记录当前转换器输出的内容哈希，
+之后的修改或候选实现与之逐字节比较。
+
+功能：
+1. 语料：content 目录的全部页面，加上固定生成的边界用例（代码块、HTML 属性、注释、
+   表格 <br>、frontmatter 各种写法等，见 content_tools/golden.py）
+2. record：运行当前的 sanitize_for_mdx / convert_frontmatter / convert（两种方言），
+   把输出哈希写入快照（默认 apps/docs/golden-converters.json）
+3. check：重新运行并与快照比较；输入改变的用例记为过期，不视为输出改变
+4. --candidate 模块:函数：在多个进程中对同一输入交替运行参考实现与候选，
+   给出不一致用例的最小上下文字节差异与速度比
+
+用法：
+    python golden_corpus.py [record|check] [--candidate 模块:函数 --target 目标] [--workers N]
+
+参数：
+    command       record / check（默认）
+    --content     content 目录（默认: apps/docs/content）
+    --snapshot    快照路径（默认: apps/docs/golden-converters.json）
+    --candidate   候选函数，签名与被替换的函数相同
+    --target      候选替换的目标：sanitize / frontmatter / upstream / vitepress（默认: sanitize）
+    --repeat      每个用例的计时重复次数，取最短（默认: 3）
+    --max-diffs   最多显示的差异条数（默认: 10）
+    --workers     并行进程数（1 表示串行）
+
+示例：
+    python golden_corpus.py record
+    python golden_corpus.py check
+    python golden_corpus.py check --candidate fast_convert:sanitize_for_mdx --target sanitize
+"""
+
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from content_tools.fsutil import write_text_atomic
+from content_tools.golden import (
+    TARGETS,
+    Case,
+    CaseResult,
+    build_corpus,
+    byte_diff,
+    compare_snapshot,
+    load_function,
+    make_snapshot,
+    run_cases,
+)
+
+
+def format_ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f}ms"
+
+
+class GoldenCorpus:
+    def __init__(
+        self,
+        content_dir: Path,
+        snapshot_path: Path,
+        workers: Optional[int] = None,
+        repeat: int = 3,
+        max_diffs: int = 10
+    ):
+        self.content_dir = content_dir
+        self.snapshot_path = snapshot_path
+        self.workers = workers
+        self.repeat = repeat
+        self.max_diffs = max_diffs
+        self.stats = {"cases": 0, "content": 0, "edge": 0}
+        self.candidate_stats = (0, 0, 0)    # 候选：一致、不一致、出错
+
+    def log(self, msg: str, level: str = "INFO"):
+        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗"}
+        symbol = prefix.get(level, "•")
+        print(f"  {symbol} {msg}")
+
+    def load_snapshot(self) -> Optional[Dict]:
+        if not self.snapshot_path.exists():
+            return None
+        return json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+
+    def collect(self) -> List[Case]:
+        print("\n[1/3] 构建语料...")
+        cases = build_corpus(self.content_dir)
+        self.stats["cases"] = len(cases)
+        self.stats["content"] = sum(1 for c in cases if c.name.startswith("content/"))
+        self.stats["edge"] = len(cases) - self.stats["content"]
+        self.log(f"{self.stats['content']} 个 content 页面，{self.stats['edge']} 个边界用例")
+        return cases
+
+    def execute(self, cases: List[Case], targets, candidate: Optional[str] = None) -> List[CaseResult]:
+        label = f"参考实现与候选 {candidate}" if candidate else "参考实现"
+        print(f"\n[2/3] 运行{label}（{', '.join(targets)}）...")
+        start = time.perf_counter()
+        results = run_cases(cases, targets, candidate=candidate, repeat=self.repeat if candidate else 1,
+                            workers=self.workers)
+        self.log(f"用时 {time.perf_counter() - start:.2f}s")
+        return results
+
+    def record(self) -> int:
+        self.header("Record")
+        cases = self.collect()
+        results = self.execute(cases, TARGETS)
+        print("\n[3/3] 写入快照...")
+        snapshot = make_snapshot(cases, results)
+        write_text_atomic(self.snapshot_path, json.dumps(snapshot, indent=2, ensure_ascii=False, sort_keys=True) + "\n")
+        self.log(f"{self.snapshot_path}（{len(cases)} 个用例 × {len(TARGETS)} 个目标）")
+        self.footer()
+        return 0
+
+    def check(self, candidate: Optional[str] = None, target: str = "sanitize") -> int:
+        self.header("Check")
+        snapshot = self.load_snapshot()
+        cases = self.collect()
+        targets = (target,) if candidate else TARGETS
+        results = self.execute(cases, targets, candidate)
+
+        print("\n[3/3] 比较...")
+        failed = 0
+        if snapshot is None:
+            self.log(f"没有快照: {self.snapshot_path}（先运行 record）", "WARN")
+            report = None
+        else:
+            report = compare_snapshot(snapshot, cases, results)
+            for name, t in report["changed"]:
+                self.log(f"[{t}] {name}: 当前输出与快照不同", "ERROR")
+            failed += len(report["changed"])
+            if report["stale"] or report["new"] or report["missing"]:
+                self.log(f"快照已过期：输入改变 {len(report['stale'])}，新增 {len(report['new'])}，"
+                         f"移除 {len(report['missing'])}（重新运行 record）", "WARN")
+
+        if candidate:
+            failed += self.report_candidate(results, target)
+
+        print("\n" + "-" * 60)
+        print("检查完成!")
+        print(f"  • 用例: {self.stats['cases']}（content {self.stats['content']}，边界 {self.stats['edge']}）")
+        if report is not None:
+            same = self.stats["cases"] - len(report["stale"]) - len(report["new"])
+            print(f"  • 与快照比较: {same} 个用例，输出改变 {len(report['changed'])}")
+        if candidate:
+            self.speed(results, target)
+        print("-" * 60 + "\n")
+        return 1 if failed else 0
+
+    def report_candidate(self, results: List[CaseResult], target: str) -> int:
+        errors = [(r.name, r.errors[target]) for r in results if target in r.errors]
+        diffs = [(r.name, r.outputs[target]) for r in results if target in r.outputs]
+        for name, error in errors[:self.max_diffs]:
+            self.log(f"[{target}] {name}: 候选出错 {error}", "ERROR")
+        for name, (expected, actual) in diffs[:self.max_diffs]:
+            d = byte_diff(expected, actual)
+            self.log(f"[{target}] {name}: 第 {d['line']} 行第 {d['col']} 列（字节 {d['offset']}）", "ERROR")
+            ellipsis = "…" if d["truncated"] else ""
+            print(f"      - 参考: {ellipsis}{d['expected']!r}")
+            print(f"      + 候选: {ellipsis}{d['actual']!r}")
+        hidden = len(errors) + len(diffs) - min(len(errors), self.max_diffs) - min(len(diffs), self.max_diffs)
+        if hidden > 0:
+            self.log(f"… 另有 {hidden} 个用例不一致", "ERROR")
+        self.candidate_stats = (len(results) - len(errors) - len(diffs), len(diffs), len(errors))
+        return len(errors) + len(diffs)
+
+    def speed(self, results: List[CaseResult], target: str):
+        same, different, errors = self.candidate_stats
+        print(f"  • 候选: 一致 {same}，不一致 {different}，出错 {errors}")
+        timed = [r for r in results if target in r.candidate_elapsed]
+        reference = sum(r.elapsed[target] for r in timed)
+        candidate = sum(r.candidate_elapsed[target] for r in timed)
+        if timed and candidate > 0:
+            print(f"  • 速度: 参考 {format_ms(reference)}，候选 {format_ms(candidate)}，"
+                  f"{reference / candidate:.2f}×（{len(timed)} 个用例，每个取 {self.repeat} 次中最短）")
+
+    def header(self, title: str):
+        print("\n" + "=" * 60)
+        print(f"Converter Golden Corpus: {title}")
+        print("=" * 60)
+
+    def footer(self):
+        print("\n" + "-" * 60)
+        print(f"  • 用例: {self.stats['cases']}（content {self.stats['content']}，边界 {self.stats['edge']}）")
+        print("-" * 60 + "\n")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converter Golden Corpus")
+    parser.add_argument("command", nargs="?", choices=["record", "check"], default="check")
+    parser.add_argument("--content", type=str, help="content 目录（默认: apps/docs/content）")
+    parser.add_argument("--snapshot", type=str, help="快照路径（默认: apps/docs/golden-converters.json）")
+    parser.add_argument("--candidate", type=str, help="候选函数：模块:函数")
+    parser.add_argument("--target", choices=TARGETS, default="sanitize", help="候选替换的目标")
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数")
+    parser.add_argument("--max-diffs", type=int, default=10, help="最多显示的差异条数")
+    parser.add_argument("--workers", type=int, help="并行进程数")
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    content_dir = (Path(args.content) if args.content else script_dir / "content").resolve()
+    snapshot_path = (Path(args.snapshot) if args.snapshot else script_dir / "golden-converters.json").resolve()
+
+    if not content_dir.exists():
+        print(f"错误: content 目录不存在: {content_dir}")
+        sys.exit(1)
+
+    if args.candidate:
+        # 候选模块可以放在当前目录
+        sys.path.insert(0, os.getcwd())
+        try:
+            load_function(args.candidate)
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+
+    corpus = GoldenCorpus(content_dir, snapshot_path, workers=args.workers, repeat=args.repeat,
+                          max_diffs=args.max_diffs)
+    if args.command == "record":
+        sys.exit(corpus.record())
+    sys.exit(corpus.check(args.candidate, args.target))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,8 @@ import type { MDXComponents } from 'mdx/types'
 import { Alert } from '@/components/mdx/alert'
 import { Steps } from '@/components/mdx/steps'
 import { CodePlayground } from '@/components/mdx/code-playground'
+import { Diagram } from '@/components/mdx/diagram'
+import { Picture } from '@/components/mdx/picture'
 
 const docsComponents = getDocsMDXComponents()
 
@@ -17,6 +19,8 @@ export function useMDXComponents(components?: MDXComponents): MDXComponents {
     Steps,
     CodePlayground,
     CodeRun: CodePlayground, // Alias for backward compatibility
+    Diagram,
+    Picture,
     // Override default components if needed
     ...components,
   }
@@ -8,49 +8,347 @@ Nextra Content Migration Script
 1. 移动所有章节目录和文件到 content 根目录
 2. 生成新的根级 _meta.json
 3. 更新 MDX 文件中的内部链接（移除多余的 /docs 前缀）
-4. 备份原始目录结构
+4. 备份原始目录结构（快照存放在 content 之外，支持 reflink / 硬链接）
 
 用法：
-    python migrate_content.py [--dry-run] [--no-backup]
+    python migrate_content.py [--dry-run] [--no-backup] [--verbose | --quiet] [--events PATH]
+    python migrate_content.py --backup-mode copy       # 使用完整拷贝备份
+    python migrate_content.py --keep 3                 # 只保留最近 3 个快照
+    python migrate_content.py --list-snapshots         # 列出已有快照
+    python migrate_content.py --restore latest         # 从最近的快照恢复 docs 目录
+    python migrate_content.py --resume                 # 从日志继续中断的迁移
+    python migrate_content.py --rollback               # 按日志回滚中断的迁移
+
+迁移过程写入预写日志 (.migration-journal.jsonl，位于 content 之外)，
+每个移动 / 链接重写 / 配置生成都先记录 planned 再记录 done，
+中断后可只执行剩余操作，或按日志逆序撤销已完成的操作。
 """
 
 import os
 import sys
 import json
+import errno
 import shutil
-import re
+import threading
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List, Optional
+
+from content_tools.events import EventLog, open_events
+from content_tools.fsutil import write_text_atomic
+from content_tools.link_rewrite import DEFAULT_RULES, LinkRewriter, RewriteResult, load_rules
+from content_tools.storage import LocalStorage, Storage
+
+
+# Linux FICLONE ioctl（btrfs / xfs / overlayfs 上的 reflink）
+FICLONE = 0x40049409
+
+
+class SnapshotStore:
+    """
+    docs 目录的快照存储
+
+    快照存放在 content 根目录之外（Nextra 不会把它当作页面编译），
+    文件优先以 reflink 克隆，文件系统不支持时退化为硬链接，跨设备时退化为拷贝。
+    硬链接与原文件共享 inode，因此迁移过程中所有写入都必须通过
+    LocalStorage / write_text_atomic（写临时文件后 rename），以实现“修改时复制”。
+    """
+
+    MANIFEST_SUFFIX = ".json"
+    # 快照目录名：docs_<时间>（链接快照）与 _backup_docs_<时间>（--backup-mode copy）
+    PREFIXES = ("docs_", "_backup_docs_")
+
+    def __init__(self, root: Path, keep: int = 5):
+        self.root = root
+        self.keep = keep
+        self._reflink_ok: Optional[bool] = None
+        self.last_method = "empty"
+
+    # ---- 单文件链接 ----
+
+    def _try_reflink(self, src: Path, dst: Path) -> bool:
+        if self._reflink_ok is False or not sys.platform.startswith("linux"):
+            return False
+        try:
+            import fcntl
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            shutil.copystat(src, dst)
+            self._reflink_ok = True
+            return True
+        except (OSError, ImportError):
+            if dst.exists():
+                dst.unlink()
+            self._reflink_ok = False
+            return False
+
+    def _link_file(self, src: Path, dst: Path) -> str:
+        """克隆单个文件，返回实际使用的方式"""
+        if self._try_reflink(src, dst):
+            return "reflink"
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+        shutil.copy2(src, dst)
+        return "copy"
+
+    def clone_tree(self, src_dir: Path, dst_dir: Path, skip: tuple = (), copy: bool = False) -> Dict[str, List[int]]:
+        """克隆整个目录树（copy 为 True 时完整拷贝），返回 {相对路径: [size, mtime_ns]}"""
+        files: Dict[str, List[int]] = {}
+        methods = set()
+        for dirpath, dirnames, filenames in os.walk(src_dir):
+            dirnames.sort()
+            rel_dir = Path(dirpath).relative_to(src_dir)
+            (dst_dir / rel_dir).mkdir(parents=True, exist_ok=True)
+            for name in sorted(filenames):
+                rel = rel_dir / name
+                if rel.as_posix() in skip:
+                    continue
+                src = Path(dirpath) / name
+                if copy:
+                    shutil.copy2(src, dst_dir / rel)
+                    methods.add("copy")
+                else:
+                    methods.add(self._link_file(src, dst_dir / rel))
+                st = src.stat()
+                files[rel.as_posix()] = [st.st_size, st.st_mtime_ns]
+        self.last_method = "+".join(sorted(methods)) or "empty"
+        return files
+
+    # ---- 快照管理 ----
+
+    def manifest_path(self, snapshot: Path) -> Path:
+        return snapshot.parent / (snapshot.name + self.MANIFEST_SUFFIX)
+
+    def list(self) -> List[Path]:
+        """按时间顺序（旧 -> 新）列出快照目录（两种备份方式按名称中的时间统一排序）"""
+        if not self.root.exists():
+            return []
+        return sorted(
+            (d for d in self.root.iterdir() if d.is_dir() and self.manifest_path(d).exists()),
+            key=lambda d: d.name.split("docs_", 1)[-1]
+        )
+
+    def orphans(self) -> List[Path]:
+        """没有 manifest 的快照目录（创建过程中被中断）"""
+        if not self.root.exists():
+            return []
+        return sorted(
+            d for d in self.root.iterdir()
+            if d.is_dir() and d.name.startswith(self.PREFIXES) and not self.manifest_path(d).exists()
+        )
+
+    def resolve(self, name: str) -> Optional[Path]:
+        snapshots = self.list()
+        if not snapshots:
+            return None
+        if name == "latest":
+            return snapshots[-1]
+        for snap in snapshots:
+            if snap.name == name:
+                return snap
+        return None
+
+    def read_manifest(self, snapshot: Path) -> Dict:
+        return json.loads(self.manifest_path(snapshot).read_text(encoding="utf-8"))
+
+    def create(self, src_dir: Path, prefix: str = "docs", copy: bool = False, extra: Optional[Dict] = None) -> Path:
+        """
+        创建快照并写入 manifest（manifest 最后写入：没有 manifest 的目录视为未完成）
+
+        extra 合并进 manifest，用于记录 docs 之外需要一并恢复的内容。
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        snapshot = self.root / f"{prefix}_{timestamp}"
+        n = 1
+        while snapshot.exists():
+            n += 1
+            snapshot = self.root / f"{prefix}_{timestamp}_{n}"
+
+        try:
+            files = self.clone_tree(src_dir, snapshot, copy=copy)
+        except BaseException:
+            shutil.rmtree(snapshot, ignore_errors=True)
+            raise
+        manifest = {
+            "source": str(src_dir),
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "method": self.last_method,
+            "items": sorted(p.name for p in src_dir.iterdir()),
+            "files": files,
+            **(extra or {}),
+        }
+        write_text_atomic(self.manifest_path(snapshot), json.dumps(manifest, indent=2, ensure_ascii=False) + "\n")
+        return snapshot
+
+    def tainted_files(self, snapshot: Path) -> List[str]:
+        """
+        检查快照中被原地修改过的文件
+
+        硬链接快照与原文件共享 inode，若有工具绕过 write_text_atomic 原地写入，
+        快照内容也会随之改变；通过对比 manifest 中记录的 size / mtime 发现这种情况。
+        """
+        manifest = self.read_manifest(snapshot)
+        tainted = []
+        for rel, (size, mtime_ns) in manifest["files"].items():
+            path = snapshot / rel
+            if not path.exists():
+                tainted.append(rel)
+                continue
+            st = path.stat()
+            if st.st_size != size or st.st_mtime_ns != mtime_ns:
+                tainted.append(rel)
+        return tainted
+
+    def prune(self) -> List[Path]:
+        """删除中断遗留的快照目录，并按保留数量删除最旧的快照"""
+        removed = []
+        for orphan in self.orphans():
+            shutil.rmtree(orphan)
+            removed.append(orphan)
+        if self.keep <= 0:
+            return removed
+        snapshots = self.list()
+        for snap in snapshots[:-self.keep]:
+            shutil.rmtree(snap)
+            manifest_path = self.manifest_path(snap)
+            if manifest_path.exists():
+                manifest_path.unlink()
+            removed.append(snap)
+        return removed
+
+
+class MigrationJournal:
+    """
+    迁移预写日志（JSON Lines）
+
+    每条记录形如 {"id": "move:chapter-01", "state": "planned" | "done", ...}。
+    操作执行前先追加 planned 记录（含撤销所需信息），完成后追加 done 记录；
+    每次追加都 fsync，崩溃时最多丢失正在写入的最后一行。
+    """
+
+    def __init__(self, path: Path, dry_run: bool = False):
+        self.path = path
+        self.dry_run = dry_run
+        self.records: List[Dict] = []
+        self.latest: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> None:
+        """读取日志；忽略崩溃时写了一半的末行"""
+        self.records = []
+        self.latest = {}
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            self._track(record)
+
+    def _track(self, record: Dict) -> None:
+        self.records.append(record)
+        op_id = record.get("id")
+        if op_id:
+            merged = dict(self.latest.get(op_id, {}))
+            merged.update(record)
+            self.latest[op_id] = merged
+
+    def append(self, record: Dict) -> None:
+        with self._lock:
+            self._track(record)
+            if self.dry_run:
+                return
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def plan(self, op_id: str, **payload) -> None:
+        self.append({"id": op_id, "state": "planned", **payload})
+
+    def done(self, op_id: str, **payload) -> None:
+        self.append({"id": op_id, "state": "done", **payload})
+
+    def is_done(self, op_id: str) -> bool:
+        return self.latest.get(op_id, {}).get("state") == "done"
+
+    def header(self) -> Optional[Dict]:
+        for record in self.records:
+            if record.get("op") == "begin":
+                return record
+        return None
+
+    def operations(self) -> List[Dict]:
+        """按首次出现顺序返回每个操作的最新状态"""
+        ordered = []
+        seen = set()
+        for record in self.records:
+            op_id = record.get("id")
+            if op_id and op_id not in seen:
+                seen.add(op_id)
+                ordered.append(self.latest[op_id])
+        return ordered
+
+    def close(self) -> None:
+        """迁移成功或回滚完成后删除日志"""
+        if not self.dry_run and self.path.exists():
+            self.path.unlink()
 
 
 class ContentMigrator:
-    def __init__(self, content_dir: Path, dry_run: bool = False, backup: bool = True):
+    def __init__(
+        self,
+        content_dir: Path,
+        dry_run: bool = False,
+        backup: bool = True,
+        backup_mode: str = "snapshot",
+        snapshot_store: Optional[SnapshotStore] = None,
+        journal: Optional[MigrationJournal] = None,
+        rewriter: Optional[LinkRewriter] = None,
+        storage: Optional[Storage] = None,
+        events: Optional[EventLog] = None
+    ):
         self.content_dir = content_dir
         self.docs_dir = content_dir / "docs"
+        self.events = events if events is not None else EventLog("migrate_content")
         self.dry_run = dry_run
-        self.backup = backup
+        self.storage = storage if storage is not None else LocalStorage()
+        # 快照与迁移日志直接在磁盘上操作，内存后端（测试/基准）下不创建
+        self.backup = backup and self.storage.persistent
+        self.backup_mode = backup_mode
+        self.snapshots = snapshot_store or SnapshotStore(content_dir.parent / ".snapshots")
+        self.journal = journal or MigrationJournal(
+            content_dir.parent / ".migration-journal.jsonl",
+            dry_run=dry_run or not self.storage.persistent
+        )
+        self.rewriter = rewriter or LinkRewriter(DEFAULT_RULES)
         self.backup_dir = None
         self.migrated_items = []
         self.updated_files = []
 
-    def log(self, msg: str, level: str = "INFO"):
-        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗", "DRY": "○"}
-        symbol = prefix.get(level, "•")
-        print(f"  {symbol} {msg}")
+    def log(self, msg: str, level: str = "INFO", **fields):
+        self.events.log(msg, level, **fields)
 
     def validate(self) -> bool:
         """验证目录结构是否符合迁移条件"""
-        if not self.content_dir.exists():
+        if not self.storage.is_dir(self.content_dir):
             self.log(f"content 目录不存在: {self.content_dir}", "ERROR")
             return False
 
-        if not self.docs_dir.exists():
+        if not self.storage.is_dir(self.docs_dir):
             self.log(f"docs 子目录不存在: {self.docs_dir}", "ERROR")
             return False
 
         # 检查 content 根目录是否已有冲突文件
-        existing_items = set(p.name for p in self.content_dir.iterdir() if p.name != "docs")
-        docs_items = set(p.name for p in self.docs_dir.iterdir())
+        existing_items = set(e.name for e in self.storage.list_dir(self.content_dir) if e.name != "docs")
+        docs_items = set(e.name for e in self.storage.list_dir(self.docs_dir))
         conflicts = existing_items & docs_items
 
         if conflicts:
@@ -60,88 +358,210 @@ class ContentMigrator:
         return True
 
     def create_backup(self):
-        """创建 docs 目录的备份"""
+        """
+        创建 docs 目录的备份
+
+        snapshot 模式为链接快照，copy 模式为完整拷贝（_backup_docs_<时间>），两者都写 manifest、
+        参与 --keep 清理与 --restore；迁移会改写的根级 _meta.json 记录在 manifest 中。
+        """
         if not self.backup:
             return
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.backup_dir = self.content_dir / f"_backup_docs_{timestamp}"
+        copy = self.backup_mode == "copy"
+        if self.dry_run:
+            action = "创建备份" if copy else "创建快照"
+            self.log(f"[DRY-RUN] 将在 {self.snapshots.root} {action}", "DRY")
+            return
+
+        root_meta = self.content_dir / "_meta.json"
+        self.backup_dir = self.snapshots.create(
+            self.docs_dir,
+            prefix="_backup_docs" if copy else "docs",
+            copy=copy,
+            extra={"root_meta": self.storage.read_text(root_meta) if self.storage.exists(root_meta) else None}
+        )
+        self.log(f"{'备份' if copy else '快照'}已创建 ({self.snapshots.last_method}): {self.backup_dir}")
+        for removed in self.snapshots.prune():
+            self.log(f"清理旧快照: {removed.name}")
+
+    def restore(self, name: str = "latest") -> bool:
+        """从快照恢复 docs 目录，并移除已迁移到 content 根目录的对应项目"""
+        snapshot = self.snapshots.resolve(name)
+        if snapshot is None:
+            self.log(f"未找到快照: {name}", "ERROR")
+            return False
+
+        tainted = self.snapshots.tainted_files(snapshot)
+        if tainted:
+            self.log(f"快照中有 {len(tainted)} 个文件已被原地修改: {tainted[:5]}", "WARN")
+
+        manifest = self.snapshots.read_manifest(snapshot)
+        migrated = [
+            self.content_dir / item for item in manifest["items"]
+            if item != "_meta.json" and (self.content_dir / item).exists()
+        ]
+
+        root_meta = self.content_dir / "_meta.json"
 
         if self.dry_run:
-            self.log(f"[DRY-RUN] 将创建备份: {self.backup_dir}", "DRY")
+            self.log(f"[DRY-RUN] 将从 {snapshot.name} 恢复 {len(manifest['files'])} 个文件", "DRY")
+            for path in migrated:
+                self.log(f"[DRY-RUN] 将移除已迁移项目: {path.name}", "DRY")
+            if "root_meta" in manifest:
+                self.log(f"[DRY-RUN] 将还原根级 _meta.json", "DRY")
+            return True
+
+        if self.docs_dir.exists():
+            shutil.rmtree(self.docs_dir)
+        # 恢复后的文件同样以链接方式共享快照数据，后续写入需走 LocalStorage 的原子写入
+        self.snapshots.clone_tree(snapshot, self.docs_dir)
+        self.log(f"已从 {snapshot.name} 恢复 docs 目录 ({self.snapshots.last_method})", detail=False)
+
+        for path in migrated:
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+            self.log(f"移除已迁移项目: {path.name}")
+
+        # 根级 _meta.json 还原为快照时的内容（旧快照没有记录时保持不变）
+        if "root_meta" not in manifest:
+            self.log("快照没有记录根级 _meta.json，保持不变", "WARN")
+        elif manifest["root_meta"] is None:
+            if self.storage.exists(root_meta):
+                self.storage.unlink(root_meta)
+            self.log("删除根级 _meta.json")
         else:
-            shutil.copytree(self.docs_dir, self.backup_dir)
-            self.log(f"备份已创建: {self.backup_dir}")
+            self.storage.write_text(root_meta, manifest["root_meta"])
+            self.log("还原根级 _meta.json")
+        return True
 
     def collect_items_to_migrate(self) -> list:
         """收集需要迁移的所有项目"""
         items = []
-        for item in self.docs_dir.iterdir():
-            if item.name == "_meta.json":
+        for entry in self.storage.list_dir(self.docs_dir):
+            if entry.name == "_meta.json":
                 continue  # 旧的 _meta.json 需要特殊处理
-            items.append(item)
+            items.append(Path(entry.path))
         return sorted(items, key=lambda p: p.name)
 
-    def update_mdx_links(self, file_path: Path) -> bool:
-        """更新 MDX 文件中的链接路径"""
-        try:
-            content = file_path.read_text(encoding="utf-8")
-            original = content
-
-            # 模式 1: Markdown 链接 [text](/docs/chapter-XX) -> [text](/chapter-XX)
-            # 保留 /docs 作为文档根路径，只需确保链接正确
-            # 实际上 Nextra 路由在 /docs 下，所以链接应该保持 /docs/chapter-XX
-            # 但内容移到 content/ 后，Nextra 会自动映射
+    def rel(self, path: Path) -> str:
+        """content 目录内的相对路径（日志中使用）"""
+        return path.relative_to(self.content_dir).as_posix()
 
-            # 检查是否有需要更新的链接（如果存在嵌套的 /docs/docs/ 情况）
-            pattern = r'\]\(/docs/docs/'
-            if re.search(pattern, content):
-                content = re.sub(pattern, '](/docs/', content)
-
-            if content != original:
-                if self.dry_run:
-                    self.log(f"[DRY-RUN] 将更新链接: {file_path.name}", "DRY")
-                else:
-                    file_path.write_text(content, encoding="utf-8")
-                    self.log(f"更新链接: {file_path.name}")
-                return True
-            return False
+    def write_rewrite(self, result: RewriteResult):
+        """写入一次链接重写（先记录日志，可从多个线程调用）"""
+        rel_path = self.rel(result.path)
+        if self.dry_run:
+            self.log(f"[DRY-RUN] 将更新链接: {rel_path} ({result.replacements} 处)", "DRY", file=rel_path)
+            return
+        op_id = f"rewrite:{rel_path}"
+        self.journal.plan(op_id, op="rewrite", path=rel_path, undo=result.original)
+        self.storage.write_text(result.path, result.content)
+        self.journal.done(op_id)
+        self.log(f"更新链接: {rel_path} ({result.replacements} 处)", file=rel_path, replacements=result.replacements)
+
+    def restore_unfinished_rewrites(self) -> None:
+        """
+        恢复时先把 planned 但未 done 的链接重写还原为日志中的原文
+
+        写入可能已在崩溃前完成；不还原就从磁盘上的新内容再次重写，
+        章节重新编号等规则会被应用两次。
+        """
+        for op in self.journal.operations():
+            if op.get("op") != "rewrite" or op.get("state") == "done" or op.get("undo") is None:
+                continue
+            path = self.content_dir / op["path"]
+            if self.storage.exists(path):
+                self.storage.write_text(path, op["undo"])
+                self.log(f"还原未完成的链接重写: {op['path']}", "SKIP", file=op["path"])
+
+    def update_mdx_links(self, files: List[Path]) -> List[RewriteResult]:
+        """
+        批量更新 MDX 文件中的链接路径
+
+        Nextra 路由在 /docs 下，内容移到 content/ 后链接应保持 /docs/chapter-XX；
+        默认规则只修复嵌套的 /docs/docs/ 前缀，可通过 --rules 追加章节/slug 重写。
+        不含任何规则前缀的文件在字节级预筛选阶段即被跳过。
+        """
+        try:
+            # 本地磁盘直接用 mmap 预筛选，其他后端经 Storage 读取
+            reader = None if isinstance(self.storage, LocalStorage) else self.storage.read_bytes
+            return self.rewriter.run(files, writer=self.write_rewrite, reader=reader)
         except Exception as e:
-            self.log(f"更新文件失败 {file_path}: {e}", "ERROR")
-            return False
+            self.log(f"更新链接失败: {e}", "ERROR")
+            return []
+
+    def begin_journal(self, items: list):
+        """写入迁移计划：所有移动操作在执行前全部记为 planned"""
+        if self.dry_run:
+            return
+        self.journal.append({
+            "op": "begin",
+            "started": datetime.now().isoformat(timespec="seconds"),
+            "backup": str(self.backup_dir) if self.backup_dir else None,
+            "items": [item.name for item in items],
+        })
+        for item in items:
+            self.journal.plan(
+                f"move:{item.name}",
+                op="move",
+                src=self.rel(item),
+                dst=self.rel(self.content_dir / item.name),
+                is_dir=self.storage.is_dir(item)
+            )
 
     def migrate_items(self, items: list):
-        """迁移所有项目到 content 根目录"""
+        """迁移所有项目到 content 根目录（已在日志中完成的操作会被跳过）"""
+        moved = []
+        self.events.start(total=len(items), label="迁移")
         for item in items:
             dest = self.content_dir / item.name
+            op_id = f"move:{item.name}"
 
             if self.dry_run:
-                action = "目录" if item.is_dir() else "文件"
+                action = "目录" if self.storage.is_dir(item) else "文件"
                 self.log(f"[DRY-RUN] 将迁移{action}: {item.name}", "DRY")
+                moved.append(item)
+            elif self.journal.is_done(op_id):
+                self.log(f"已完成，跳过: {item.name}", "SKIP")
+                moved.append(dest)
+            elif not self.storage.exists(item) and self.storage.exists(dest):
+                # 移动已发生但 done 记录未写入（崩溃于两者之间）
+                self.journal.done(op_id)
+                self.log(f"已完成（补记日志）: {item.name}", "SKIP")
+                moved.append(dest)
             else:
-                shutil.move(str(item), str(dest))
+                self.storage.move(item, dest)
+                self.journal.done(op_id)
                 self.log(f"迁移: {item.name}")
+                moved.append(dest)
 
             self.migrated_items.append(item.name)
-
-            # 更新迁移后的 MDX 文件链接
-            if item.is_dir():
-                for mdx_file in (dest if not self.dry_run else item).rglob("*.mdx"):
-                    if self.update_mdx_links(mdx_file):
-                        self.updated_files.append(str(mdx_file))
-            elif item.suffix == ".mdx":
-                target = dest if not self.dry_run else item
-                if self.update_mdx_links(target):
-                    self.updated_files.append(str(target))
+            self.events.advance()
+        self.events.finish()
+
+        # 更新迁移后的 MDX 文件链接
+        mdx_files = []
+        for path in moved:
+            if self.storage.is_dir(path):
+                mdx_files.extend(Path(entry.path) for entry in self.storage.walk(path, suffix=".mdx"))
+            elif path.suffix == ".mdx":
+                mdx_files.append(path)
+        if not self.dry_run:
+            mdx_files = [f for f in mdx_files if not self.journal.is_done(f"rewrite:{self.rel(f)}")]
+
+        for result in self.update_mdx_links(mdx_files):
+            self.updated_files.append(str(result.path))
 
     def generate_root_meta(self):
         """生成新的根级 _meta.json"""
         # 读取原有的 docs/_meta.json
         old_meta_path = self.docs_dir / "_meta.json"
         old_meta = {}
-        if old_meta_path.exists():
+        if self.storage.exists(old_meta_path):
             try:
-                old_meta = json.loads(old_meta_path.read_text(encoding="utf-8"))
+                old_meta = json.loads(self.storage.read_text(old_meta_path))
             except:
                 pass
 
@@ -149,17 +569,11 @@ class ContentMigrator:
         new_meta = {}
 
         # 按顺序添加章节
-        chapter_dirs = sorted([
-            d.name for d in (self.content_dir if not self.dry_run else self.docs_dir).iterdir()
-            if d.is_dir() and d.name.startswith("chapter-")
-        ])
-
-        # 如果是 dry-run，从 docs_dir 获取章节列表
-        if self.dry_run:
-            chapter_dirs = sorted([
-                d.name for d in self.docs_dir.iterdir()
-                if d.is_dir() and d.name.startswith("chapter-")
-            ])
+        # dry-run 时尚未迁移，从 docs_dir 获取章节列表；按章节编号排序
+        chapters = [
+            entry.name
+            for entry in self.storage.chapter_dirs(self.docs_dir if self.dry_run else self.content_dir)
+        ]
 
         # 章节标题映射
         chapter_titles = {
@@ -185,13 +599,13 @@ class ContentMigrator:
         new_meta["index"] = "课程首页"
 
         # 添加所有章节
-        for chapter in chapter_dirs:
+        for chapter in chapters:
             new_meta[chapter] = chapter_titles.get(chapter, chapter)
 
         # 添加其他页面（如 learning-map, resources）
-        if "learning-map" in old_meta or (self.docs_dir / "learning-map").exists():
+        if "learning-map" in old_meta or self.storage.exists(self.docs_dir / "learning-map"):
             new_meta["learning-map"] = "学习地图"
-        if "resources" in old_meta or (self.docs_dir / "resources").exists():
+        if "resources" in old_meta or self.storage.exists(self.docs_dir / "resources"):
             new_meta["resources"] = "资源库"
 
         # 写入新的 _meta.json
@@ -199,19 +613,24 @@ class ContentMigrator:
 
         if self.dry_run:
             self.log(f"[DRY-RUN] 将创建根级 _meta.json", "DRY")
-            print(f"\n    新 _meta.json 内容预览:")
-            print(json.dumps(new_meta, indent=2, ensure_ascii=False))
+            self.events.section(f"\n    新 _meta.json 内容预览:", detail=True)
+            self.events.section(json.dumps(new_meta, indent=2, ensure_ascii=False), detail=True)
+        elif self.journal.is_done("meta:root"):
+            self.log("根级 _meta.json 已生成，跳过", "SKIP")
         else:
-            new_meta_path.write_text(
-                json.dumps(new_meta, indent=2, ensure_ascii=False) + "\n",
-                encoding="utf-8"
-            )
+            undo = self.storage.read_text(new_meta_path) if self.storage.exists(new_meta_path) else None
+            self.journal.plan("meta:root", op="meta", path=self.rel(new_meta_path), undo=undo)
+            self.storage.write_text(new_meta_path, json.dumps(new_meta, indent=2, ensure_ascii=False) + "\n")
+            self.journal.done("meta:root")
             self.log(f"创建根级 _meta.json")
 
     def cleanup_old_docs_dir(self):
         """清理旧的 docs 目录"""
+        if not self.storage.is_dir(self.docs_dir):
+            return
+
         # 检查 docs 目录是否为空（除了 _meta.json）
-        remaining = list(self.docs_dir.iterdir())
+        remaining = self.storage.scan(self.docs_dir, dirs=True, exclude=())
         remaining = [r for r in remaining if r.name != "_meta.json"]
 
         if not remaining:
@@ -220,54 +639,127 @@ class ContentMigrator:
             else:
                 # 删除 _meta.json 和 docs 目录
                 meta_file = self.docs_dir / "_meta.json"
-                if meta_file.exists():
-                    meta_file.unlink()
-                self.docs_dir.rmdir()
+                undo = self.storage.read_text(meta_file) if self.storage.exists(meta_file) else None
+                self.journal.plan("cleanup:docs", op="cleanup", path=self.rel(self.docs_dir), undo=undo)
+                # 目录中只剩 _meta.json（或已为空）
+                self.storage.rmtree(self.docs_dir)
+                self.journal.done("cleanup:docs")
                 self.log("删除空的 docs 目录")
         else:
             self.log(f"docs 目录仍有文件，保留: {[r.name for r in remaining]}", "WARN")
 
-    def run(self) -> bool:
+    def rollback(self) -> bool:
+        """按日志逆序撤销已完成（或可能已完成）的操作"""
+        self.journal.load()
+        operations = self.journal.operations()
+        self.log(f"日志中有 {len(operations)} 个操作，开始回滚", detail=False)
+
+        for op in reversed(operations):
+            kind = op.get("op")
+            path = self.content_dir / op["path"] if "path" in op else None
+
+            if kind == "move":
+                src = self.content_dir / op["src"]
+                dst = self.content_dir / op["dst"]
+                if self.storage.exists(dst) and not self.storage.exists(src):
+                    if self.dry_run:
+                        self.log(f"[DRY-RUN] 将撤销迁移: {op['dst']} -> {op['src']}", "DRY")
+                    else:
+                        self.storage.mkdir(src.parent)
+                        self.storage.move(dst, src)
+                        self.log(f"撤销迁移: {op['dst']} -> {op['src']}")
+            elif kind in ("rewrite", "meta") and "undo" in op:
+                if self.dry_run:
+                    self.log(f"[DRY-RUN] 将还原: {op['path']}", "DRY")
+                elif op["undo"] is None:
+                    if self.storage.exists(path):
+                        self.storage.unlink(path)
+                    self.log(f"删除: {op['path']}")
+                else:
+                    self.storage.write_text(path, op["undo"])
+                    self.log(f"还原: {op['path']}")
+            elif kind == "cleanup":
+                if self.dry_run:
+                    self.log(f"[DRY-RUN] 将重建目录: {op['path']}", "DRY")
+                else:
+                    self.storage.mkdir(path)
+                    if op.get("undo") is not None:
+                        self.storage.write_text(path / "_meta.json", op["undo"])
+                    self.log(f"重建目录: {op['path']}")
+
+        self.journal.close()
+        self.log("回滚完成", detail=False)
+        return True
+
+    def run(self, resume: bool = False, rollback: bool = False) -> bool:
         """执行迁移"""
-        print("\n" + "=" * 60)
-        print("Nextra Content Migration")
-        print("=" * 60)
+        self.events.section("\n" + "=" * 60)
+        self.events.section("Nextra Content Migration")
+        self.events.section("=" * 60)
 
         if self.dry_run:
-            print("\n[DRY-RUN 模式] 不会实际修改文件\n")
-
-        # Step 1: 验证
-        print("\n[1/5] 验证目录结构...")
-        if not self.validate():
+            self.events.section("\n[DRY-RUN 模式] 不会实际修改文件\n")
+
+        if self.journal.exists():
+            if rollback:
+                return self.rollback()
+            if not resume:
+                self.log(f"发现未完成的迁移日志: {self.journal.path}", "ERROR")
+                self.log("使用 --resume 继续迁移，或 --rollback 回滚", "ERROR")
+                return False
+        elif resume or rollback:
+            self.log(f"没有可用的迁移日志: {self.journal.path}", "ERROR")
             return False
-        self.log("验证通过")
 
-        # Step 2: 备份
-        print("\n[2/5] 创建备份...")
-        self.create_backup()
-
-        # Step 3: 收集迁移项
-        print("\n[3/5] 收集待迁移项目...")
-        items = self.collect_items_to_migrate()
-        self.log(f"发现 {len(items)} 个项目待迁移")
+        if resume:
+            # 从日志恢复：跳过验证与备份，按原计划继续
+            self.events.section("\n[1-3/5] 从日志恢复迁移计划...")
+            self.journal.load()
+            header = self.journal.header() or {}
+            if header.get("backup"):
+                self.backup_dir = Path(header["backup"])
+            items = [self.docs_dir / name for name in header.get("items", [])]
+            done = sum(1 for op in self.journal.operations() if op.get("state") == "done")
+            self.log(f"计划 {len(items)} 个项目，日志中已完成 {done} 个操作", detail=False)
+            self.restore_unfinished_rewrites()
+        else:
+            # Step 1: 验证
+            self.events.section("\n[1/5] 验证目录结构...")
+            if not self.validate():
+                return False
+            self.log("验证通过")
+
+            # Step 2: 备份
+            self.events.section("\n[2/5] 创建备份...")
+            self.create_backup()
+
+            # Step 3: 收集迁移项
+            self.events.section("\n[3/5] 收集待迁移项目...")
+            items = self.collect_items_to_migrate()
+            self.log(f"发现 {len(items)} 个项目待迁移", detail=False)
+            self.begin_journal(items)
 
         # Step 4: 执行迁移
-        print("\n[4/5] 执行迁移...")
+        self.events.section("\n[4/5] 执行迁移...")
         self.migrate_items(items)
 
         # Step 5: 生成新的 _meta.json
-        print("\n[5/5] 生成配置...")
+        self.events.section("\n[5/5] 生成配置...")
         self.generate_root_meta()
         self.cleanup_old_docs_dir()
+        self.storage.flush()
+        self.journal.close()
 
         # 报告
-        print("\n" + "-" * 60)
-        print("迁移完成!")
-        print(f"  • 迁移项目: {len(self.migrated_items)}")
-        print(f"  • 更新文件: {len(self.updated_files)}")
+        self.events.emit("summary", migrated=len(self.migrated_items), updated=len(self.updated_files),
+                         backup=str(self.backup_dir) if self.backup_dir else None)
+        self.events.echo("\n" + "-" * 60)
+        self.events.echo("迁移完成!")
+        self.events.echo(f"  • 迁移项目: {len(self.migrated_items)}")
+        self.events.echo(f"  • 更新文件: {len(self.updated_files)}")
         if self.backup_dir:
-            print(f"  • 备份位置: {self.backup_dir}")
-        print("-" * 60 + "\n")
+            self.events.echo(f"  • 备份位置: {self.backup_dir}")
+        self.events.echo("-" * 60 + "\n")
 
         return True
 
@@ -278,23 +770,69 @@ def main():
     parser = argparse.ArgumentParser(description="Nextra Content Migration Tool")
     parser.add_argument("--dry-run", action="store_true", help="预览模式，不实际执行")
     parser.add_argument("--no-backup", action="store_true", help="不创建备份")
+    parser.add_argument(
+        "--backup-mode",
+        choices=["snapshot", "copy"],
+        default="snapshot",
+        help="备份方式：snapshot（reflink/硬链接快照，默认）或 copy（完整拷贝）"
+    )
+    parser.add_argument(
+        "--snapshot-dir",
+        type=str,
+        help="快照存放目录（默认: apps/docs/.snapshots，位于 content 之外）"
+    )
+    parser.add_argument("--keep", type=int, default=5, help="保留的快照数量（0 表示不清理）")
+    parser.add_argument("--list-snapshots", action="store_true", help="列出已有快照")
+    parser.add_argument("--restore", type=str, metavar="NAME", help="从快照恢复（NAME 或 latest）")
+    parser.add_argument("--resume", action="store_true", help="按迁移日志继续中断的迁移")
+    parser.add_argument("--rollback", action="store_true", help="按迁移日志回滚中断的迁移")
+    parser.add_argument(
+        "--rules",
+        type=str,
+        help="额外的链接重写规则文件（JSON，见 content_tools/link_rewrite.py）"
+    )
+    parser.add_argument("--verbose", action="store_true", help="逐项打印日志（默认只显示进度）")
+    parser.add_argument("--quiet", action="store_true", help="只打印最终报告与警告/错误汇总")
+    parser.add_argument("--events", type=str, help="结构化事件流（JSON Lines）：文件路径或 fd:N")
     args = parser.parse_args()
 
     # 确定 content 目录路径
     script_dir = Path(__file__).parent
     content_dir = script_dir / "content"
+    snapshot_dir = Path(args.snapshot_dir) if args.snapshot_dir else (script_dir / ".snapshots")
+    store = SnapshotStore(snapshot_dir.resolve(), keep=args.keep)
+
+    if args.list_snapshots:
+        for snap in store.list():
+            manifest = store.read_manifest(snap)
+            print(f"  {snap.name}  {manifest['method']:<16} {len(manifest['files'])} 个文件")
+        sys.exit(0)
 
     if not content_dir.exists():
         print(f"错误: 找不到 content 目录: {content_dir}")
         sys.exit(1)
 
+    rules = list(DEFAULT_RULES)
+    if args.rules:
+        rules.extend(load_rules(Path(args.rules)))
+
     migrator = ContentMigrator(
         content_dir=content_dir,
         dry_run=args.dry_run,
-        backup=not args.no_backup
+        backup=not args.no_backup,
+        backup_mode=args.backup_mode,
+        snapshot_store=store,
+        rewriter=LinkRewriter(rules),
+        events=open_events("migrate_content", args.verbose, args.quiet, args.events, args.dry_run)
     )
 
-    success = migrator.run()
+    if args.restore:
+        success = migrator.restore(args.restore)
+        migrator.events.close()
+        sys.exit(0 if success else 1)
+
+    success = migrator.run(resume=args.resume, rollback=args.rollback)
+    migrator.events.close()
     sys.exit(0 if success else 1)
 
 
@@ -1,3 +1,4 @@
+import { readFileSync } from 'node:fs'
 import nextra from 'nextra'
 
 const withNextra = nextra({
@@ -10,11 +11,26 @@ const basePathRaw = process.env.NEXT_PUBLIC_BASE_PATH || ''
 const basePath = basePathRaw === '/' ? '' : basePathRaw
 const isGithubPages = process.env.GITHUB_PAGES === 'true'
 
+// Old routes recorded by `sync_from_source.py --routes` (static exports use the generated stub pages instead).
+function manifestRedirects() {
+  try {
+    const manifest = JSON.parse(readFileSync(new URL('./route-manifest.json', import.meta.url), 'utf-8'))
+    return Object.entries(manifest.redirects ?? {}).map(([source, destination]) => ({
+      source,
+      destination,
+      permanent: true,
+    }))
+  } catch {
+    return []
+  }
+}
+
 /** @type {import('next').NextConfig} */
 const nextConfig = {
   reactStrictMode: true,
   ...(isGithubPages ? { output: 'export', trailingSlash: true } : {}),
   ...(isGithubPages && basePath ? { basePath, assetPrefix: basePath } : {}),
+  ...(isGithubPages ? {} : { redirects: async () => manifestRedirects() }),
 
   // Image optimization
   images: {
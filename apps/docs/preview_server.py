@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+MDX Preview Server
+==================
+常驻的本地转换服务：预览单个上游 .md 转换后的 MDX，而不必运行整次同步。
+
+功能：
+1. 在 localhost 上接收文件路径或原始 Markdown（HTTP）
+2. 用 content_tools/convert.py 生成 MDX：engine=sync 为 sync_from_source.py 使用的
+   upstream 方言，engine=vitepress 为 scripts/migrate-content.py 使用的 vitepress 方言
+3. 返回 MDX、MDX 风险诊断（content_tools/mdx_lint.py）与各阶段耗时
+4. 结果按内容哈希缓存在有大小上限的 LRU 中；解释器启动与模块导入只发生一次
+
+用法：
+    python preview_server.py [--port 4010] [--source DIR] [--cache-mb 64]
+
+参数：
+    --host      监听地址（默认: 127.0.0.1，只接受本机请求）
+    --port      端口（默认: 4010）
+    --source    path 参数的根目录；只允许读取该目录内的文件（默认: 当前目录）
+    --cache-mb  LRU 缓存上限（MB，默认: 64）
+
+接口：
+    GET  /convert?path=chapter01/1.1-什么是智能体.md[&engine=sync|vitepress][&format=mdx]
+    POST /convert   {"markdown": "...", "filename": "1.1-标题.md", "engine": "sync"}
+                    或 {"path": "chapter01/1.1-标题.md"}
+    GET  /stats     缓存命中率与条目数
+    GET  /health
+
+    format=mdx 时直接返回 MDX 文本，否则返回 JSON：
+    {"mdx": ..., "diagnostics": [{"line", "col", "code", "level", "message"}],
+     "timing": {"convert_ms", "total_ms"}, "cached": bool, "hash": ...}
+
+示例：
+    python preview_server.py --source .tmp/deepractice-agents/docs
+    curl 'http://127.0.0.1:4010/convert?path=chapter01/1.1-什么是智能体.md&format=mdx'
+"""
+
+import hashlib
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from content_tools.convert import ConvertOptions, convert
+from content_tools.mdx_lint import LINT_VERSION
+
+# engine -> 转换方言
+ENGINES = {"sync": "upstream", "vitepress": "vitepress"}
+MAX_BODY = 8 * 1024 * 1024
+# /convert 的参数，均为字符串
+PARAMS = ("path", "markdown", "filename", "engine", "format")
+
+
+class PreviewCache:
+    """按内容哈希索引的 LRU，按结果的字节数限制总大小（线程安全）"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Tuple[Dict, int]]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            item = self.entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: str, value: Dict) -> None:
+        cost = len(value["mdx"].encode("utf-8")) + 256 * (len(value["diagnostics"]) + 1)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= self.entries.pop(key)[1]
+            self.entries[key] = (value, cost)
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.size -= evicted
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+
+class PreviewService:
+    def __init__(self, source_dir: Path, cache_bytes: int = 64 * 1024 * 1024):
+        self.source_dir = source_dir
+        self.cache = PreviewCache(cache_bytes)
+
+    def log(self, msg: str, level: str = "INFO"):
+        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗"}
+        symbol = prefix.get(level, "•")
+        print(f"  {symbol} {msg}")
+
+    def resolve(self, rel: str) -> Path:
+        """把 path 参数解析到 source 目录内；越界时抛出 PermissionError"""
+        path = (self.source_dir / rel).resolve()
+        if path != self.source_dir and self.source_dir not in path.parents:
+            raise PermissionError(f"路径不在 source 目录内: {rel}")
+        if not path.is_file():
+            raise FileNotFoundError(f"文件不存在: {rel}")
+        return path
+
+    def preview(self, markdown: str, filename: str, engine: str = "sync") -> Dict:
+        if engine not in ENGINES:
+            raise ValueError(f"未知的 engine: {engine}（可选: {', '.join(ENGINES)}）")
+        start = time.perf_counter()
+        key = hashlib.sha256(
+            "\0".join((engine, filename, LINT_VERSION, markdown)).encode("utf-8")
+        ).hexdigest()
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            return {**cached, "cached": True,
+                    "timing": {**cached["timing"], "total_ms": _ms(start)}}
+
+        # convert 是纯函数，可在多个请求线程中同时执行
+        options = ConvertOptions(dialect=ENGINES[engine], filename=Path(filename).name, lint=True)
+        mdx, found = convert(markdown, options)
+        converted = time.perf_counter()
+        diagnostics = [
+            {"line": d.line, "col": d.col, "code": d.code, "level": d.level, "message": d.message}
+            for d in found
+        ]
+        result = {
+            "hash": key,
+            "engine": engine,
+            "mdx": mdx,
+            "diagnostics": diagnostics,
+            "timing": {
+                "convert_ms": _ms(start, converted),
+                "total_ms": _ms(start),
+            },
+        }
+        self.cache.put(key, result)
+        return {**result, "cached": False}
+
+    def handle(self, params: Dict) -> Dict:
+        """处理一次 /convert 请求的参数"""
+        # JSON 请求体中的参数可以是任意类型
+        for name in PARAMS:
+            if params.get(name) is not None and not isinstance(params[name], str):
+                raise ValueError(f"{name} 参数必须是字符串")
+        engine = params.get("engine") or "sync"
+        if params.get("path"):
+            path = self.resolve(params["path"])
+            filename = path.relative_to(self.source_dir).as_posix()
+            markdown = path.read_text(encoding="utf-8")
+        elif params.get("markdown") is not None:
+            filename = params.get("filename") or "preview.md"
+            markdown = params["markdown"]
+        else:
+            raise ValueError("需要 path 或 markdown 参数")
+        return self.preview(markdown, filename, engine)
+
+
+def _ms(start: float, end: Optional[float] = None) -> float:
+    return round(((end if end is not None else time.perf_counter()) - start) * 1000, 2)
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    service: PreviewService = None
+
+    def send(self, status: int, body, content_type: str = "application/json"):
+        if content_type == "application/json":
+            body = json.dumps(body, ensure_ascii=False)
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def respond(self, params: Dict):
+        try:
+            result = self.service.handle(params)
+        except PermissionError as e:
+            return self.send(403, {"error": str(e)})
+        except FileNotFoundError as e:
+            return self.send(404, {"error": str(e)})
+        except (ValueError, UnicodeDecodeError) as e:
+            return self.send(400, {"error": str(e)})
+        except Exception as e:
+            self.service.log(f"转换失败: {e}", "ERROR")
+            return self.send(500, {"error": str(e)})
+
+        level = "WARN" if result["diagnostics"] else "INFO"
+        cached = "（缓存）" if result["cached"] else ""
+        self.service.log(f"{params.get('path') or params.get('filename') or '<markdown>'} "
+                         f"{result['timing']['total_ms']}ms{cached}", level)
+        if params.get("format") == "mdx":
+            return self.send(200, result["mdx"], "text/markdown")
+        self.send(200, result)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self.send(200, {"status": "ok"})
+        if url.path == "/stats":
+            return self.send(200, self.service.cache.stats())
+        if url.path == "/convert":
+            return self.respond({k: v[-1] for k, v in parse_qs(url.query).items()})
+        self.send(404, {"error": f"未知路径: {url.path}"})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/convert":
+            return self.send(404, {"error": f"未知路径: {url.path}"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return self.send(400, {"error": "Content-Length 无效"})
+        if length < 0:
+            return self.send(400, {"error": "Content-Length 无效"})
+        if length > MAX_BODY:
+            return self.send(413, {"error": "请求体过大"})
+        try:
+            body = self.rfile.read(length).decode("utf-8")
+        except UnicodeDecodeError as e:
+            return self.send(400, {"error": f"请求体不是有效的 UTF-8: {e}"})
+        if "json" in (self.headers.get("Content-Type") or ""):
+            try:
+                params = json.loads(body or "{}")
+            except json.JSONDecodeError as e:
+                return self.send(400, {"error": f"无法解析 JSON: {e}"})
+            if not isinstance(params, dict):
+                return self.send(400, {"error": "JSON 请求体必须是对象"})
+        else:
+            # 纯文本请求体即 Markdown，其余参数走查询字符串
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            params["markdown"] = body
+        self.respond(params)
+
+    def log_message(self, format, *args):
+        pass  # 由 respond 输出简洁日志
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MDX Preview Server")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="监听地址（默认: 127.0.0.1）")
+    parser.add_argument("--port", type=int, default=4010, help="端口（默认: 4010）")
+    parser.add_argument("--source", type=str, help="path 参数的根目录（默认: 当前目录）")
+    parser.add_argument("--cache-mb", type=int, default=64, help="LRU 缓存上限（MB）")
+    args = parser.parse_args()
+
+    source_dir = (Path(args.source) if args.source else Path.cwd()).resolve()
+    if not source_dir.is_dir():
+        print(f"错误: source 目录不存在: {source_dir}")
+        sys.exit(1)
+
+    PreviewHandler.service = PreviewService(source_dir, cache_bytes=args.cache_mb * 1024 * 1024)
+    server = ThreadingHTTPServer((args.host, args.port), PreviewHandler)
+
+    print("\n" + "=" * 60)
+    print("MDX Preview Server")
+    print("=" * 60)
+    print(f"源目录: {source_dir}")
+    print(f"地址: http://{args.host}:{args.port}/convert")
+    print(f"缓存上限: {args.cache_mb} MB\n")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stats = PreviewHandler.service.cache.stats()
+        print("\n" + "-" * 60)
+        print("服务已停止")
+        print(f"  • 缓存: {stats['entries']} 条，命中 {stats['hits']}，未命中 {stats['misses']}")
+        print("-" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    main()
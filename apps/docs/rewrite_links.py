@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Bulk Link Rewrite Script
+========================
+按规则批量重写 content 目录中 MDX 文件的内部链接，用于章节重构（重新编号、
+页面改名、前缀迁移）后一次性修正所有引用。
+
+功能：
+1. 从规则文件或命令行参数读取重写规则
+2. 字节级预筛选，跳过不含任何待改链接的文件
+3. 并行处理候选文件，原子写回
+
+用法：
+    python rewrite_links.py [--dry-run] [--rules RULES.json]
+                            [--chapter FROM=TO] [--slug CHAPTER/FROM=TO] [--prefix FROM=TO]
+
+示例：
+    python rewrite_links.py --chapter chapter-07=chapter-04 --chapter chapter-04=chapter-07 --dry-run
+    python rewrite_links.py --slug chapter-04/react-pattern=react-paradigm
+    python rewrite_links.py --rules restructure.json
+
+注意：只改写链接，不移动目录；目录与 _meta.json 的调整需另行完成。
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from content_tools.fsutil import write_text_atomic
+from content_tools.link_rewrite import LinkRewriter, load_rules, parse_rule_arg
+from content_tools.walk import walk
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bulk Link Rewrite Tool")
+    parser.add_argument("--dry-run", action="store_true", help="预览模式")
+    parser.add_argument("--rules", type=str, help="规则文件（JSON）")
+    parser.add_argument("--chapter", action="append", default=[], metavar="FROM=TO", help="章节重新编号")
+    parser.add_argument("--slug", action="append", default=[], metavar="CHAPTER/FROM=TO", help="页面改名")
+    parser.add_argument("--prefix", action="append", default=[], metavar="FROM=TO", help="URL 前缀迁移")
+    parser.add_argument("--content", type=str, help="content 目录路径（默认: apps/docs/content）")
+    parser.add_argument("--workers", type=int, help="并行线程数")
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    content_dir = Path(args.content) if args.content else (script_dir / "content")
+
+    if not content_dir.exists():
+        print(f"错误: content 目录不存在: {content_dir}")
+        sys.exit(1)
+
+    rules = load_rules(Path(args.rules)) if args.rules else []
+    try:
+        for kind in ("chapter", "slug", "prefix"):
+            rules.extend(parse_rule_arg(kind, value) for value in getattr(args, kind))
+    except ValueError as e:
+        print(f"错误: {e}")
+        sys.exit(1)
+
+    if not rules:
+        print("错误: 未指定任何重写规则")
+        sys.exit(1)
+
+    rewriter = LinkRewriter(rules)
+
+    def write(result):
+        write_text_atomic(result.path, result.content)
+
+    start = time.perf_counter()
+    files = [Path(entry.path) for entry in walk(content_dir, suffix=".mdx")]
+    results = rewriter.run(files, writer=None if args.dry_run else write, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        prefix = "[DRY-RUN] " if args.dry_run else ""
+        print(f"  ✓ {prefix}{result.path.relative_to(content_dir)} ({result.replacements} 处)")
+
+    print(f"\n扫描 {len(files)} 个文件，改写 {len(results)} 个，"
+          f"共 {sum(r.replacements for r in results)} 处，用时 {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
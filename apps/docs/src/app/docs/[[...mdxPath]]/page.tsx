@@ -1,8 +1,44 @@
+import { readFile } from 'node:fs/promises'
+import path from 'node:path'
 import { generateStaticParamsFor, importPage } from 'nextra/pages'
 import { useMDXComponents as getMDXComponents } from '../../../../mdx-components'
+import { RelatedPages } from '@/components/docs/related-pages'
 import type { ComponentType, ReactNode } from 'react'
 
-export const generateStaticParams = generateStaticParamsFor('mdxPath')
+const discoverStaticParams = generateStaticParamsFor('mdxPath')
+
+// Routes precomputed by `sync_from_source.py --routes`, checked against Nextra's walk of the
+// content tree. Pages missing from a stale manifest are still built; a manifest route with no
+// page fails the build instead of surfacing later as a broken import.
+export async function generateStaticParams() {
+  const discovered: { mdxPath: string[] }[] = await discoverStaticParams()
+  let manifest: { base?: string; routes?: Record<string, unknown> }
+  try {
+    manifest = JSON.parse(await readFile(path.join(process.cwd(), 'route-manifest.json'), 'utf-8'))
+  } catch {
+    return discovered
+  }
+
+  const base = manifest.base ?? '/docs'
+  const key = (segments: string[]) => segments.map(decodeURIComponent).join('/')
+  const pages = new Set(discovered.map((param) => key(param.mdxPath ?? [])))
+  const listed = new Set(
+    Object.keys(manifest.routes ?? {}).map((route) => key(route.slice(base.length).split('/').filter(Boolean)))
+  )
+
+  const orphaned = [...listed].filter((route) => !pages.has(route))
+  if (orphaned.length > 0) {
+    throw new Error(
+      `route-manifest.json lists routes with no page: ${orphaned.map((r) => `${base}/${r}`).join(', ')}; ` +
+        'rerun sync_from_source.py --routes'
+    )
+  }
+  const unlisted = [...pages].filter((route) => !listed.has(route))
+  if (listed.size > 0 && unlisted.length > 0) {
+    console.warn(`route-manifest.json is missing ${unlisted.length} pages; rerun sync_from_source.py --routes`)
+  }
+  return discovered
+}
 
 type DocsPageParams = {
   mdxPath?: string | string[]
@@ -52,6 +88,7 @@ export default async function Page(props: PageProps) {
   return (
     <Wrapper toc={toc} metadata={metadata} sourceCode={sourceCode}>
       <MDXContent params={{ ...params, mdxPath: resolvedMdxPath }} />
+      <RelatedPages route={`/docs/${resolvedMdxPath.map(decodeURIComponent).join('/')}`} />
     </Wrapper>
   )
 }
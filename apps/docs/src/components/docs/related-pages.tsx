@@ -0,0 +1,35 @@
+import Link from 'next/link'
+import relatedPages from '../../../related-pages.json'
+
+// Generated by `sync_from_source.py --related` (content_tools/related.py); nothing is computed at runtime.
+type RelatedIndex = {
+  titles: Record<string, string>
+  related: Record<string, [string, number][]>
+}
+
+const index = relatedPages as unknown as RelatedIndex
+
+export function RelatedPages({ route }: { route: string }) {
+  const items = index.related[route]
+  if (!items || items.length === 0) return null
+
+  return (
+    <nav aria-label="相关章节" className="mt-16 border-t border-surface-200 dark:border-surface-800 pt-8">
+      <h2 className="mb-4 text-sm font-semibold uppercase tracking-wide text-surface-500 dark:text-surface-400">
+        相关章节
+      </h2>
+      <ul className="space-y-2">
+        {items.map(([href]) => (
+          <li key={href}>
+            <Link
+              href={href}
+              className="text-brand-600 dark:text-brand-400 hover:underline underline-offset-4"
+            >
+              {index.titles[href] ?? href}
+            </Link>
+          </li>
+        ))}
+      </ul>
+    </nav>
+  )
+}
@@ -1,26 +1,70 @@
 'use client'
 
-import { useState, useCallback } from 'react'
+import { useState, useCallback, useEffect, useRef } from 'react'
 import { clsx } from 'clsx'
 import { motion, AnimatePresence } from 'framer-motion'
 
 interface CodePlaygroundProps {
-  code: string
+  /** Inline source. */
+  code?: string
+  /** Static code asset (e.g. /assets/code/<hash>.js), fetched when the playground scrolls into view. */
+  src?: string
   language?: 'javascript' | 'typescript'
   title?: string
   editable?: boolean
 }
 
+// Mirrors next.config.mjs: '/' means no basePath.
+const basePathRaw = process.env.NEXT_PUBLIC_BASE_PATH || ''
+const basePath = basePathRaw === '/' ? '' : basePathRaw
+
 export function CodePlayground({
-  code: initialCode,
+  code: inlineCode,
+  src,
   language = 'javascript',
   title,
   editable = true,
 }: CodePlaygroundProps) {
-  const [code, setCode] = useState(initialCode.trim())
+  const [initialCode, setInitialCode] = useState((inlineCode ?? '').trim())
+  const [code, setCode] = useState(initialCode)
+  const [isLoading, setIsLoading] = useState(Boolean(src && inlineCode === undefined))
   const [output, setOutput] = useState<string>('')
   const [isRunning, setIsRunning] = useState(false)
   const [error, setError] = useState<string | null>(null)
+  const containerRef = useRef<HTMLDivElement>(null)
+
+  useEffect(() => {
+    if (!src || inlineCode !== undefined || !containerRef.current) return
+
+    let cancelled = false
+    const load = async () => {
+      try {
+        const res = await fetch(`${basePath}${src}`)
+        if (!res.ok) throw new Error(`${res.status} ${res.statusText}`)
+        const text = (await res.text()).trim()
+        if (cancelled) return
+        setInitialCode(text)
+        setCode(text)
+      } catch (err) {
+        if (!cancelled) setError(`代码加载失败: ${err instanceof Error ? err.message : String(err)}`)
+      } finally {
+        if (!cancelled) setIsLoading(false)
+      }
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        observer.disconnect()
+        load()
+      }
+    }, { rootMargin: '200px' })
+    observer.observe(containerRef.current)
+
+    return () => {
+      cancelled = true
+      observer.disconnect()
+    }
+  }, [src, inlineCode])
 
   const runCode = useCallback(async () => {
     setIsRunning(true)
@@ -62,13 +106,13 @@ export function CodePlayground({
   }, [code])
 
   const resetCode = useCallback(() => {
-    setCode(initialCode.trim())
+    setCode(initialCode)
     setOutput('')
     setError(null)
   }, [initialCode])
 
   return (
-    <div className="my-8 overflow-hidden rounded-2xl border border-surface-200 bg-surface-0 shadow-sm ring-1 ring-surface-200 transition-shadow duration-300 hover:shadow-md dark:border-surface-700 dark:bg-surface-100/50 dark:ring-surface-700">
+    <div ref={containerRef} className="my-8 overflow-hidden rounded-2xl border border-surface-200 bg-surface-0 shadow-sm ring-1 ring-surface-200 transition-shadow duration-300 hover:shadow-md dark:border-surface-700 dark:bg-surface-100/50 dark:ring-surface-700">
       {/* Header */}
       <div className="flex items-center justify-between border-b border-surface-200 bg-surface-50/50 px-4 py-3 backdrop-blur-sm dark:border-surface-700 dark:bg-surface-100/30">
         <div className="flex items-center gap-3">
@@ -91,9 +135,9 @@ export function CodePlayground({
       {/* Code Editor */}
       <div className="relative group">
         <textarea
-          value={code}
+          value={isLoading ? '加载中...' : code}
           onChange={(e) => editable && setCode(e.target.value)}
-          readOnly={!editable}
+          readOnly={!editable || isLoading}
           className={clsx(
             'block w-full resize-none bg-[#1e1e1e] p-5 font-mono text-sm leading-relaxed text-gray-100',
             'focus:outline-none focus:ring-0',
@@ -114,7 +158,7 @@ export function CodePlayground({
         <div className="flex gap-2">
           <button
             onClick={runCode}
-            disabled={isRunning}
+            disabled={isRunning || isLoading}
             className={clsx(
               'group inline-flex items-center gap-2 rounded-lg px-4 py-2 text-sm font-semibold text-white shadow-sm transition-all active:scale-95',
               'bg-gradient-to-r from-brand-600 to-brand-500 hover:from-brand-500 hover:to-brand-400',
@@ -0,0 +1,77 @@
+'use client'
+
+import { useEffect, useId, useRef, useState } from 'react'
+
+interface DiagramProps {
+  /** Mermaid source asset (e.g. /assets/diagrams/<hash>.mmd), fetched when the diagram scrolls into view. */
+  src: string
+  /** Pre-rendered SVG; when present the mermaid runtime is never loaded. */
+  svg?: string
+  title?: string
+}
+
+// Mirrors next.config.mjs: '/' means no basePath.
+const basePathRaw = process.env.NEXT_PUBLIC_BASE_PATH || ''
+const basePath = basePathRaw === '/' ? '' : basePathRaw
+
+export function Diagram({ src, svg, title }: DiagramProps) {
+  const [markup, setMarkup] = useState<string | null>(null)
+  const [error, setError] = useState<string | null>(null)
+  const containerRef = useRef<HTMLDivElement>(null)
+  const id = `diagram-${useId().replace(/:/g, '')}`
+
+  useEffect(() => {
+    if (svg || !containerRef.current) return
+
+    let cancelled = false
+    const load = async () => {
+      try {
+        const res = await fetch(`${basePath}${src}`)
+        if (!res.ok) throw new Error(`${res.status} ${res.statusText}`)
+        const source = await res.text()
+        // The runtime is only downloaded by pages that still need client-side rendering.
+        const mermaid = (await import('mermaid')).default
+        const dark = document.documentElement.classList.contains('dark')
+        mermaid.initialize({ startOnLoad: false, theme: dark ? 'dark' : 'default' })
+        const { svg: rendered } = await mermaid.render(id, source)
+        if (!cancelled) setMarkup(rendered)
+      } catch (err) {
+        if (!cancelled) setError(`图表加载失败: ${err instanceof Error ? err.message : String(err)}`)
+      }
+    }
+
+    const observer = new IntersectionObserver((entries) => {
+      if (entries.some(entry => entry.isIntersecting)) {
+        observer.disconnect()
+        load()
+      }
+    }, { rootMargin: '200px' })
+    observer.observe(containerRef.current)
+
+    return () => {
+      cancelled = true
+      observer.disconnect()
+    }
+  }, [src, svg, id])
+
+  if (svg) {
+    return (
+      <div className="my-6 flex justify-center overflow-x-auto">
+        {/* eslint-disable-next-line @next/next/no-img-element */}
+        <img src={`${basePath}${svg}`} alt={title ?? 'diagram'} loading="lazy" decoding="async" />
+      </div>
+    )
+  }
+
+  return (
+    <div ref={containerRef} className="my-6 flex min-h-24 justify-center overflow-x-auto">
+      {error ? (
+        <pre className="text-sm text-red-500">{error}</pre>
+      ) : markup ? (
+        <div dangerouslySetInnerHTML={{ __html: markup }} />
+      ) : (
+        <div className="text-sm text-gray-400">图表加载中...</div>
+      )}
+    </div>
+  )
+}
@@ -1,3 +1,5 @@
 export { Alert } from './alert'
 export { Steps, Step } from './steps'
 export { CodePlayground } from './code-playground'
+export { Diagram } from './diagram'
+export { Picture } from './picture'
@@ -0,0 +1,40 @@
+import { type ImgHTMLAttributes } from 'react'
+
+interface PictureProps extends ImgHTMLAttributes<HTMLImageElement> {
+  /** Largest hashed variant (e.g. /assets/img/<hash>-1280.webp). */
+  src: string
+  /** All widths, e.g. "/assets/img/<hash>-640.webp 640w, /assets/img/<hash>-1280.webp 1280w". */
+  srcSet?: string
+}
+
+// Mirrors next.config.mjs: '/' means no basePath.
+const basePathRaw = process.env.NEXT_PUBLIC_BASE_PATH || ''
+const basePath = basePathRaw === '/' ? '' : basePathRaw
+
+const withBasePath = (url: string) => (url.startsWith('/') && !url.startsWith('//') ? `${basePath}${url}` : url)
+
+// Content width of the docs layout; the browser picks the smallest variant that covers it.
+const DEFAULT_SIZES = '(max-width: 768px) 100vw, 768px'
+
+export function Picture({ src, srcSet, sizes, alt = '', ...props }: PictureProps) {
+  const candidates = srcSet
+    ?.split(',')
+    .map(candidate => {
+      const [url, descriptor] = candidate.trim().split(/\s+/)
+      return descriptor ? `${withBasePath(url)} ${descriptor}` : withBasePath(url)
+    })
+    .join(', ')
+
+  return (
+    // eslint-disable-next-line @next/next/no-img-element
+    <img
+      src={withBasePath(src)}
+      srcSet={candidates}
+      sizes={candidates ? sizes ?? DEFAULT_SIZES : undefined}
+      alt={alt}
+      loading="lazy"
+      decoding="async"
+      {...props}
+    />
+  )
+}
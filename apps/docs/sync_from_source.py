@@ -10,14 +10,38 @@ Deepractice Content Sync Script
 3. 自动生成 _meta.json 配置
 4. 生成 URL 友好的文件名（slug）
 5. 支持增量更新和全量同步
+6. 可选：路由清单、sitemap.xml 与旧路由的重定向（--routes，见 content_tools/route_manifest.py）
+7. 可选：跨章节的相关页面索引（--related，MinHash + LSH，见 content_tools/related.py）
+8. 可选：Mermaid 图表提取为静态文件并按需加载，可预渲染为 SVG（--diagrams，见 content_tools/diagrams.py）
+9. 可选：按内容哈希写出本次同步的变更集，供部分构建/部署使用（--changeset，见 content_tools/changeset.py）
+10. 源文件之间的相对 .md 链接（如 1.3-构建第一个智能体.md、../chapter05/README.md）按 slug 注册表
+    改写为页面路由（/docs/chapter-01/first-agent），无法解析的链接保持原样，由 check_links.py 报告
 
 用法：
-    python sync_from_source.py [--dry-run] [--full] [--chapter CHAPTER]
+    python sync_from_source.py [--dry-run] [--full] [--chapter CHAPTER] [--assets]
 
 参数：
     --dry-run       预览模式，不实际修改文件
     --full          全量同步（删除旧文件后重新生成）
     --chapter       只同步指定章节（如 chapter01, chapter-01）
+    --assets        处理本地图片：哈希去重、生成 WebP 变体、改写引用
+    --highlight     用 Pygments 预高亮代码块（结果按内容哈希缓存）
+    --diagrams      把 mermaid 代码块提取为 public/assets/diagrams 下的静态文件，只有含图表的页面加载运行时
+    --diagram-renderer  图表预渲染器：stub（本地替身）/ mmdc / 模块:函数，结果按图表哈希缓存（隐含 --diagrams）
+    --budget        按页面体积预算报告超标页面（--budget-config 指定预算文件）
+    --split-oversized  在 ## 边界把超标页面拆分为子页面（隐含 --budget）
+    --pipeline      异步管道模式：有界并发读取 → 转换 → 有界并发写入（--io-depth 指定深度）
+    --slug-registry    slug 注册表路径（默认: apps/docs/slug-registry.json，与 sync_content.py 共用）
+    --cache-dir     持久缓存目录（图片、高亮缓存与导航依赖图 nav-graph.json）
+    --storage       存储后端：local（默认）/ batched（写入缓冲后批量提交）/ memory（只在内存中运行，用于基准）
+    --routes        更新 route-manifest.json（路由 -> 页面、源文件、内容哈希，以及旧路由的重定向）
+                    与 public/ 下的跳转页；--site-url 给出时同时生成 public/sitemap.xml
+    --related       生成 related-pages.json（每个页面的相关页面，站点直接渲染；安装 NumPy 时向量化计算）
+    --changeset     写出变更集 JSON：新增/修改/删除/改名的页面、_meta 文件与受影响的路由
+    --verbose       逐个文件打印日志（默认只显示一行进度：完成数、速率、剩余时间；--dry-run 时逐行）
+    --quiet         只打印最终报告，警告与错误在结束时汇总
+    --events        结构化事件流（JSON Lines，缓冲写入）：文件路径或 fd:N，见 content_tools/events.py
+    --content-root  路由的根目录（默认: apps/docs/content；--target 为其子目录时清单仍覆盖整个 content）
 
 示例：
     python sync_from_source.py --dry-run          # 预览同步
@@ -29,22 +53,27 @@ Deepractice Content Sync Script
 import os
 import sys
 import json
-import re
-import shutil
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
 from datetime import datetime
 
-
-@dataclass
-class FileMapping:
-    """源文件到目标文件的映射"""
-    source_path: Path
-    target_path: Path
-    slug: str
-    title: str
-    order: int  # 文件排序（从文件名提取的数字）
+from content_tools.assets import AssetPipeline
+from content_tools.changeset import ChangeTracker
+from content_tools.convert import NUMBERED_STEM, ConvertOptions, convert, sanitize_for_mdx
+from content_tools.corpus import Corpus, Page
+from content_tools.depgraph import DependencyGraph
+from content_tools.diagrams import DiagramExtractor, load_renderer
+from content_tools.events import EventLog, open_events
+from content_tools.highlight import CodeHighlighter
+from content_tools.page_budget import PageBudget, PageMetrics, PageSplitter, measure, split_siblings
+from content_tools.pipeline import DEFAULT_DEPTH, SKIP, run_pipeline
+from content_tools.references import Reference, replace_references
+from content_tools.related import OUTPUT_PATH as RELATED_PATH, RelatedIndex
+from content_tools.route_index import DOCS_BASE
+from content_tools.route_manifest import MANIFEST_PATH, RouteOutputs, structure_digest
+from content_tools.slug_registry import REGISTRY_PATH, SlugRegistry
+from content_tools.storage import BACKENDS, LocalStorage, Storage, open_storage
+from content_tools.walk import chapter_number
 
 
 class DeepracticeContentSync:
@@ -53,15 +82,60 @@ class DeepracticeContentSync:
         source_dir: Path,
         target_dir: Path,
         dry_run: bool = False,
-        full_sync: bool = False
+        full_sync: bool = False,
+        assets: Optional[AssetPipeline] = None,
+        highlighter: Optional[CodeHighlighter] = None,
+        diagrams: Optional[DiagramExtractor] = None,
+        budget: Optional[PageBudget] = None,
+        split_oversized: bool = False,
+        slugs: Optional[SlugRegistry] = None,
+        io_depth: Optional[int] = None,
+        storage: Optional[Storage] = None,
+        nav_graph: Optional[Path] = None,
+        routes: Optional[RouteOutputs] = None,
+        related: Optional[RelatedIndex] = None,
+        changes: Optional[ChangeTracker] = None,
+        changeset_path: Optional[Path] = None,
+        events: Optional[EventLog] = None,
+        link_base: Optional[str] = None
     ):
         self.source_dir = source_dir
         self.target_dir = target_dir
         self.dry_run = dry_run
         self.full_sync = full_sync
-
-        # 根目录额外页面（非章节）
-        self.root_pages_meta: Dict[str, str] = {}
+        self.assets = assets
+        self.highlighter = highlighter
+        self.diagrams = diagrams
+        self.budget = budget
+        self.split_oversized = split_oversized
+        self.page_metrics: List[PageMetrics] = []
+        # 标题 ↔ slug ↔ 源文件，与 sync_content.py 共用
+        self.slugs = slugs if slugs is not None else SlugRegistry(REGISTRY_PATH)
+        # 目标目录对应的路由前缀（如 /docs/import-agents），None 时不改写源文件之间的 .md 链接
+        self.link_base = link_base
+
+        # 本次扫描到的全部页面（根目录页面的章节为 ""），同步、_meta 生成与报告共用
+        self.corpus = Corpus(source_dir, target_dir)
+        # 异步管道的并发深度（None 时逐个文件同步）
+        self.io_depth = io_depth
+        # 源文件与目标文件的读写都经过 storage
+        self.storage = storage if storage is not None else LocalStorage()
+
+        # 导航产物（_meta.json、index.mdx）的依赖图：只重新生成输入发生变化的产物
+        # nav_graph 为 None 或全量同步时没有历史，全部重新生成
+        self.nav_graph = nav_graph
+        self.graph = DependencyGraph()
+        self.previous_graph = None
+        if nav_graph is not None and not full_sync:
+            self.previous_graph = DependencyGraph.load(nav_graph, str(target_dir))
+        # 路由清单、sitemap 与重定向（在全部页面写入、拆分之后更新）
+        self.routes = routes
+        self.related = related
+        # 同步前后的 content 快照，比较得到变更集
+        self.changes = changes
+        self.changeset_path = changeset_path
+        # 日志与进度（默认逐行打印，与命令行的 --verbose 相同）
+        self.events = events if events is not None else EventLog("sync_from_source")
 
         # 统计
         self.stats = {
@@ -69,7 +143,9 @@ class DeepracticeContentSync:
             "created": 0,
             "updated": 0,
             "skipped": 0,
-            "errors": 0
+            "errors": 0,
+            "nav_written": 0,
+            "nav_unchanged": 0
         }
 
         # 章节名称映射（用于 _meta.json）
@@ -92,22 +168,21 @@ class DeepracticeContentSync:
             "chapter-16": "第十六章：未来展望",
         }
 
-    def log(self, msg: str, level: str = "INFO"):
-        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗", "DRY": "○", "SKIP": "→"}
-        symbol = prefix.get(level, "•")
-        print(f"  {symbol} {msg}")
+    def log(self, msg: str, level: str = "INFO", **fields):
+        self.events.log(msg, level, **fields)
 
     def normalize_chapter_name(self, name: str) -> str:
-        """将 chapter01 标准化为 chapter-01"""
-        match = re.match(r'^chapter(\d+)$', name, re.IGNORECASE)
-        if match:
-            return f"chapter-{match.group(1).zfill(2)}"
+        """将 chapter01 / chapter-1 标准化为 chapter-01"""
+        number = chapter_number(name)
+        if number is not None:
+            return f"chapter-{number:02d}"
         return name
 
-    def extract_file_info(self, filename: str) -> Tuple[int, str, str]:
+    def extract_file_info(self, filename: str, source: Optional[str] = None) -> Tuple[int, str, str]:
         """
         从文件名提取排序号、slug 和标题
         例如: "1.1-什么是智能体.md" -> (11, "what-is-agent", "什么是智能体")
+        给出 source（相对源目录的路径）时按源文件登记 slug
         """
         stem = Path(filename).stem
 
@@ -116,396 +191,342 @@ class DeepracticeContentSync:
             return (0, "index", "章节概览")
 
         # 匹配模式: X.Y-标题 或 X.Y-Title
-        match = re.match(r'^(\d+)\.(\d+)-(.+)$', stem)
+        match = NUMBERED_STEM.match(stem)
         if match:
             major, minor, title = match.groups()
             order = int(major) * 100 + int(minor)
-            slug = self.generate_slug(title)
-            return (order, slug, title)
+        else:
+            # 其他文件
+            order, title = 999, stem
 
-        # 其他文件
-        slug = self.generate_slug(stem)
-        return (999, slug, stem)
+        slug = self.slugs.register_source(source, title) if source else self.generate_slug(title)
+        return (order, slug, title)
 
     def generate_slug(self, title: str) -> str:
-        """生成 URL 友好的 slug"""
-        # 中文标题到英文 slug 的映射
-        slug_map = {
-            "什么是智能体": "what-is-agent",
-            "智能体如何工作": "how-agent-works",
-            "构建第一个智能体": "first-agent",
-            "智能体应用生态": "agent-ecosystem",
-            "习题与讨论": "exercises",
-            "本章小结": "summary",
-
-            "符号主义时代": "symbolic-era",
-            "构建规则聊天机器人": "rule-chatbot",
-            "心智社会理论": "society-of-mind",
-            "学习范式演进": "learning-paradigm",
-            "智能体爆发时代": "agent-explosion",
-
-            "语言模型简史": "language-model-history",
-            "Prompt工程基础": "prompt-engineering",
-            "LLM的能力与边界": "llm-capabilities",
-            "从LLM到智能体架构": "llm-to-agent",
-
-            "五分钟体验PromptX": "promptx-quickstart",
-            "上下文鸿沟": "context-gap",
-            "语义鸿沟": "semantic-gap",
-            "Nuwa角色创建": "nuwa-role",
-            "Luban工具创建": "luban-tool",
-            "Engram记忆网络": "engram-memory",
-
-            "AgentX简介与设计哲学": "agentx-intro",
-            "快速开始": "quick-start",
-            "核心概念": "core-concepts",
-            "运行时系统": "runtime-system",
-            "与PromptX集成": "promptx-integration",
-
-            "从单智能体到多智能体": "single-to-multi",
-            "4P理论": "4p-theory",
-            "AI任务状态机": "ai-state-machine",
-            "PATEOAS": "pateoas",
-            "AI组织化": "ai-organization",
-
-            "Multigent架构深入": "multigent-deep",
-            "Orchestra方法实战": "orchestra-practice",
-            "运行时与调度器实现": "runtime-scheduler",
-
-            "综合实战项目": "comprehensive-project",
-            "项目一": "project-1",
-            "项目二": "project-2",
-            "项目三": "project-3",
-
-            "Monogent架构深入": "monogent-deep",
-            "Experience与Evolution实战": "experience-evolution",
-            "七阶段管道实现": "seven-stage-pipeline",
-
-            # Chapter 07 (paradigms)
-            "环境准备与基础工具": "environment-setup",
-            "ReAct范式": "react-pattern",
-            "Plan-and-Solve范式": "plan-and-solve",
-            "Reflection范式": "reflection",
-            "范式与框架对照": "paradigm-framework-compare",
-
-            # Chapter 09 extras
-            "双基质策略设计": "dual-matrix-strategy",
-            "与AgentX-PromptX集成": "agentx-promptx-integration",
-
-            # Root pages
-            "前言": "preface",
-            "教材章节重构建议-完整版": "restructure-suggestions-full",
-            "章节重构建议": "restructure-suggestions",
-        }
-
-        if title in slug_map:
-            return slug_map[title]
-
-        # 自动生成 slug（英文转小写连字符，中文用拼音或保留）
-        slug = title.lower()
-        slug = re.sub(r'[^\w\u4e00-\u9fff]+', '-', slug)
-        slug = re.sub(r'-+', '-', slug)
-        slug = slug.strip('-')
-
-        return slug if slug else "page"
+        """生成 URL 友好的 slug（查注册表，新标题自动登记）"""
+        return self.slugs.register(title)
 
     def sync_root_pages(self) -> None:
         """同步源 docs 根目录下的非章节 Markdown 页面"""
         # 只处理根目录的 .md，跳过 index.md（由 sync_index 处理）
-        for md_file in sorted(self.source_dir.glob("*.md")):
+        md_files = self.storage.scan(self.source_dir, suffix=".md")
+        self.slugs.retain("", {f.name for f in md_files})
+
+        for entry in md_files:
             self.stats["scanned"] += 1
 
-            if md_file.name.lower() == "index.md":
+            if entry.name.lower() == "index.md":
                 continue
 
-            title = Path(md_file.name).stem
-            slug = self.generate_slug(title)
-            target = self.target_dir / f"{slug}.mdx"
-
-            try:
-                content = self.convert_md_to_mdx(md_file, title)
-
-                if self.dry_run:
-                    self.log(f"[DRY-RUN] {md_file.name} -> {target.name}", "DRY")
-                else:
-                    target.write_text(content, encoding="utf-8")
-                    self.log(f"{md_file.name} -> {target.name}")
-
-                self.root_pages_meta[slug] = title
-                self.stats["updated"] += 1
-            except Exception as e:
-                self.stats["errors"] += 1
-                self.log(f"错误 {md_file.name}: {e}", "ERROR")
+            title = Path(entry.name).stem
+            slug = self.slugs.register_source(entry.name, title)
+            # 与章节页面相同：源文件未改动时跳过
+            self.sync_file(self.corpus.add(entry.name, "", slug, title, 999, entry.stat().st_mtime))
 
     def sanitize_for_mdx(self, content: str) -> str:
-        """清理内容使其兼容 MDX"""
-        # 0. 先保护代码块
-        code_blocks = []
-        def save_code_block(match):
-            code_blocks.append(match.group(0))
-            return f"__CODE_BLOCK_{len(code_blocks) - 1}__"
-
-        # 保存 ``` 代码块
-        content = re.sub(r'```[\s\S]*?```', save_code_block, content)
-        # 保存 ` 行内代码
-        content = re.sub(r'`[^`]+`', save_code_block, content)
-
-        # 1. 自闭合标签：<br> -> <br />，<hr> -> <hr />
-        content = re.sub(r'<br\s*>', '<br />', content)
-        content = re.sub(r'<hr\s*>', '<hr />', content)
-
-        # 2. 修复 HTML 标签中的属性问题
-        def fix_html_tag(match):
-            tag = match.group(0)
-            # 不处理代码块占位符
-            if '__CODE_BLOCK_' in tag:
-                return tag
-
-            # 找到所有属性并修复
-            # 模式：识别 attr="...任意内容直到真正的结束引号..."
-            def fix_attributes(tag_content):
-                result = []
-                i = 0
-                while i < len(tag_content):
-                    # 查找属性开始 name="
-                    attr_match = re.match(r'(\w+)="', tag_content[i:])
-                    if attr_match:
-                        attr_name = attr_match.group(1)
-                        i += len(attr_match.group(0))
-
-                        # 收集属性值直到遇到真正的结束引号
-                        # 真正的结束引号后面是空格、/ 或 >
-                        value_chars = []
-                        while i < len(tag_content):
-                            char = tag_content[i]
-                            # 检查是否是结束引号
-                            if char == '"':
-                                # 检查后面是否是属性结束标志
-                                next_char = tag_content[i+1] if i+1 < len(tag_content) else ''
-                                if next_char in [' ', '/', '>', '\t', '\n', '']:
-                                    break
-                                else:
-                                    # 不是真正的结束引号，跳过
-                                    i += 1
-                                    continue
-                            # 跳过中文引号
-                            elif char in ['"', '"', ''', ''']:
-                                i += 1
-                                continue
-                            else:
-                                value_chars.append(char)
-                                i += 1
-
-                        value = ''.join(value_chars)
-                        result.append(f'{attr_name}="{value}"')
-                        i += 1  # 跳过结束引号
-                    else:
-                        result.append(tag_content[i])
-                        i += 1
-
-                return ''.join(result)
-
-            # 提取标签名和内容
-            if tag.startswith('</'):
-                return tag  # 闭合标签不处理
-
-            # 分离 < 和 >
-            inner = tag[1:-1] if tag.endswith('>') else tag[1:]
-            if inner.endswith('/'):
-                inner = inner[:-1]
-                is_self_closing = True
-            else:
-                is_self_closing = False
-
-            fixed = fix_attributes(inner)
-
-            # 重建标签
-            if tag.startswith('<img') or tag.startswith('<br') or tag.startswith('<hr'):
-                return f'<{fixed} />'
-            elif is_self_closing:
-                return f'<{fixed} />'
-            else:
-                return f'<{fixed}>'
-
-        # 匹配 HTML 标签
-        content = re.sub(r'<[^>]+>', fix_html_tag, content)
-
-        # 3. 恢复代码块
-        for i, block in enumerate(code_blocks):
-            content = content.replace(f"__CODE_BLOCK_{i}__", block)
-
-        # 4. 处理 HTML 注释（MDX 不支持）
-        content = re.sub(r'<!--[\s\S]*?-->', '', content)
-
-        # 5. 修复表格中的 <br> 标签
-        content = re.sub(r'\|([^|]*)<br>([^|]*)\|', r'|\1<br />\2|', content)
-
-        return content
+        """清理内容使其兼容 MDX（见 content_tools/convert.py）"""
+        return sanitize_for_mdx(content)
 
-    def convert_md_to_mdx(self, source_file: Path, title: str) -> str:
+    def convert_md_to_mdx(self, source_file: Path, title: str, page: Optional[str] = None) -> str:
         """将 .md 转换为 .mdx 格式"""
-        content = source_file.read_text(encoding="utf-8")
+        return self.convert_text(self.storage.read_text(source_file), source_file, title, page)
 
-        # 应用 MDX 兼容性清理
-        content = self.sanitize_for_mdx(content)
+    def convert_text(self, content: str, source_file: Path, title: str, page: Optional[str] = None) -> str:
+        """转换已读入的 .md 内容（source_file 用于解析相对图片路径，page 为图表清单中的页面路径）"""
+        # Mermaid 图表提取为静态文件（在 sanitize 之前，图表源码保持原样）
+        if self.diagrams is not None:
+            content = self.diagrams.extract(content, page or source_file.name)
 
-        # 检查是否已有 frontmatter
-        if content.startswith("---"):
-            return content
+        # MDX 兼容性清理 + frontmatter
+        content, _ = convert(content, ConvertOptions(title=title, filename=source_file.name))
 
-        # 从内容提取第一个标题作为描述
-        first_heading = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
-        description = first_heading.group(1) if first_heading else title
+        # 源文件之间的 .md 链接改写为页面路由
+        if self.link_base is not None:
+            content = self.rewrite_source_links(content, source_file)
 
-        # 清理 description 中的特殊字符
-        description = description.replace('"', '\\"')
+        # 本地图片改写为哈希命名的输出
+        if self.assets is not None:
+            content = self.assets.rewrite(content, source_file)
 
-        frontmatter = f'''---
-title: "{title}"
-description: "{description}"
----
+        # 代码块预高亮
+        if self.highlighter is not None:
+            content = self.highlighter.highlight_page(content)
 
-'''
-        return frontmatter + content
+        return content
 
-    def scan_source_chapter(self, chapter_dir: Path) -> List[FileMapping]:
-        """扫描源章节目录，返回文件映射列表"""
-        mappings = []
+    def rewrite_source_links(self, content: str, source_file: Path) -> str:
+        """相对 .md 链接 -> 目标页面的路由（保留锚点）"""
+        source = source_file.relative_to(self.source_dir).as_posix()
+
+        def replace(ref: Reference) -> Optional[str]:
+            if ref.kind != "link" or ref.is_external or ref.is_anchor:
+                return None
+            target = self.slugs.link_target(source, ref.url)
+            if target is None:
+                return None
+            route = target[:-len(".mdx")]
+            if route == "index" or route.endswith("/index"):
+                route = route[:-len("index")].rstrip("/")
+            fragment = "#" + ref.url.split("#", 1)[1] if "#" in ref.url else ""
+            return f"{self.link_base}/{route}".rstrip("/") + fragment
+
+        return replace_references(content, replace)
+
+    def scan_source_chapter(self, chapter_dir: Path) -> List[Page]:
+        """扫描源章节目录，登记到语料并返回按顺序排列的页面"""
         chapter_name = self.normalize_chapter_name(chapter_dir.name)
-        target_chapter_dir = self.target_dir / chapter_name
 
-        for md_file in chapter_dir.glob("*.md"):
-            self.stats["scanned"] += 1
-            order, slug, title = self.extract_file_info(md_file.name)
-
-            # 确定目标文件名
-            target_filename = "index.mdx" if slug == "index" else f"{slug}.mdx"
-            target_path = target_chapter_dir / target_filename
+        md_files = self.storage.scan(chapter_dir, suffix=".md")
+        self.slugs.retain(chapter_dir.name, {f"{chapter_dir.name}/{f.name}" for f in md_files})
 
-            mappings.append(FileMapping(
-                source_path=md_file,
-                target_path=target_path,
-                slug=slug,
-                title=title,
-                order=order
-            ))
+        for entry in md_files:
+            self.stats["scanned"] += 1
+            source = f"{chapter_dir.name}/{entry.name}"
+            order, slug, title = self.extract_file_info(entry.name, source)
+            self.corpus.add(source, chapter_name, slug, title, order, entry.stat().st_mtime)
 
-        # 按顺序排序
-        mappings.sort(key=lambda m: m.order)
-        return mappings
+        return self.corpus.chapter(chapter_name)
 
-    def generate_chapter_meta(self, mappings: List[FileMapping]) -> Dict:
+    def generate_chapter_meta(self, chapter_name: str) -> Dict:
         """生成章节的 _meta.json"""
-        meta = {}
-        for m in mappings:
-            meta[m.slug] = m.title
-        return meta
+        return self.corpus.meta(chapter_name)
 
-    def sync_chapter(self, chapter_dir: Path):
-        """同步单个章节"""
+    def prepare_chapter(self, chapter_dir: Path) -> List[Page]:
+        """扫描章节并准备目标目录，返回待同步的页面"""
         chapter_name = self.normalize_chapter_name(chapter_dir.name)
         target_chapter_dir = self.target_dir / chapter_name
 
-        print(f"\n[{chapter_name}] 同步中...")
+        self.events.section(f"\n[{chapter_name}] 同步中...", detail=True)
 
         # 扫描源文件
-        mappings = self.scan_source_chapter(chapter_dir)
-        if not mappings:
+        pages = self.scan_source_chapter(chapter_dir)
+        if not pages:
             self.log(f"无 .md 文件", "SKIP")
-            return
+            return []
 
         # 全量同步时先清空目标目录
-        if self.full_sync and target_chapter_dir.exists():
+        if self.full_sync and self.storage.is_dir(target_chapter_dir):
             if self.dry_run:
                 self.log(f"[DRY-RUN] 将清空目录: {chapter_name}", "DRY")
             else:
-                shutil.rmtree(target_chapter_dir)
+                self.storage.rmtree(target_chapter_dir)
                 self.log(f"清空目录: {chapter_name}")
 
         # 确保目标目录存在
         if not self.dry_run:
-            target_chapter_dir.mkdir(parents=True, exist_ok=True)
+            self.storage.mkdir(target_chapter_dir)
 
-        # 同步文件
-        for m in mappings:
-            self.sync_file(m)
+        return pages
 
-        # 生成 _meta.json
-        meta = self.generate_chapter_meta(mappings)
+    def write_chapter_meta(self, chapter_name: str):
+        """生成章节的 _meta.json"""
+        target_chapter_dir = self.target_dir / chapter_name
+        meta = self.generate_chapter_meta(chapter_name)
         meta_path = target_chapter_dir / "_meta.json"
 
+        # 保留此前拆分 index.mdx 生成的子页面（紧跟在 index 之后）
+        # （拆分产物只在磁盘上生成，内存后端中没有）
+        siblings = {}
+        if self.storage.persistent and target_chapter_dir.exists():
+            siblings = split_siblings(target_chapter_dir)
+        if siblings:
+            head = {"index": meta.pop("index")} if "index" in meta else {}
+            meta = {**head, **siblings, **meta}
+
+        # 章节导航只依赖各页面的 slug / 标题 / 顺序，正文变化不影响
+        artifact = f"{chapter_name}/_meta.json"
+        self.graph.declare(artifact)
+        for page in self.corpus.chapter(chapter_name):
+            self.graph.depend(artifact, f"page:{page.source}", f"{page.slug}\t{page.title}\t{page.order}")
+        for key, title in siblings.items():
+            self.graph.depend(artifact, f"split:{chapter_name}/{key}", title)
+
+        if not self.needs_update(artifact, meta_path):
+            return
         if self.dry_run:
-            self.log(f"[DRY-RUN] 将生成 _meta.json ({len(meta)} 条)", "DRY")
-        else:
-            meta_path.write_text(
-                json.dumps(meta, indent=2, ensure_ascii=False) + "\n",
-                encoding="utf-8"
-            )
-            self.log(f"生成 _meta.json ({len(meta)} 条)")
+            self.log(f"[DRY-RUN] 将生成 {artifact} ({len(meta)} 条)", "DRY")
+        elif self.write_if_changed(meta_path, json.dumps(meta, indent=2, ensure_ascii=False) + "\n"):
+            self.log(f"生成 {artifact} ({len(meta)} 条)")
+
+    def needs_update(self, artifact: str, target: Path) -> bool:
+        """导航产物是否需要重新生成：输入有变化，或目标文件不存在"""
+        if self.storage.exists(target) and artifact not in self.graph.affected(self.previous_graph):
+            self.stats["nav_unchanged"] += 1
+            self.log(f"{artifact} 输入未变化", "SKIP")
+            return False
+        if self.previous_graph is not None:
+            reasons = self.graph.explain(artifact, self.previous_graph)
+            if reasons:
+                shown = ", ".join(reasons[:3]) + (f" 等 {len(reasons)} 项" if len(reasons) > 3 else "")
+                self.log(f"{artifact} 受影响: {shown}")
+        return True
+
+    def write_if_changed(self, path: Path, content: str) -> bool:
+        """内容与现有文件相同时不写入（保持 mtime，构建缓存不失效），返回是否写入"""
+        if self.storage.is_file(path) and self.storage.read_text(path) == content:
+            self.stats["nav_unchanged"] += 1
+            self.log(f"{path.relative_to(self.target_dir).as_posix()} 内容未变化", "SKIP")
+            return False
+        self.storage.write_text(path, content)
+        self.stats["nav_written"] += 1
+        return True
 
-    def sync_file(self, mapping: FileMapping):
-        """同步单个文件"""
-        source = mapping.source_path
-        target = mapping.target_path
+    def sync_chapter(self, chapter_dir: Path):
+        """同步单个章节"""
+        pages = self.prepare_chapter(chapter_dir)
+        if not pages:
+            return
 
-        # 检查是否需要更新
-        if target.exists() and not self.full_sync:
-            source_mtime = source.stat().st_mtime
-            target_mtime = target.stat().st_mtime
+        # 同步文件
+        self.events.grow(len(pages))
+        for page in pages:
+            self.sync_file(page)
+            self.events.advance()
 
-            if source_mtime <= target_mtime:
-                self.stats["skipped"] += 1
-                return
+        self.write_chapter_meta(pages[0].chapter)
 
+    def check_target(self, page: Page) -> Optional[bool]:
+        """返回目标文件是否已存在；源文件未改动、无需同步时返回 None"""
         try:
-            content = self.convert_md_to_mdx(source, mapping.title)
+            target_mtime = self.storage.stat(page.target_path).st_mtime
+        except FileNotFoundError:
+            return False
+        # 源文件 mtime 在扫描时已缓存
+        if not self.full_sync and (page.mtime or self.storage.stat(page.source_path).st_mtime) <= target_mtime:
+            return None
+        return True
+
+    def write_page(self, page: Page, content: str):
+        target = page.target_path
+        self.storage.mkdir(target.parent)
+        self.storage.write_text(target, content)
+
+    def record_page(self, page: Page, existed: bool):
+        """记录一个已转换页面的日志与统计"""
+        source = page.source_path
+        target = page.target_path
+        if self.dry_run:
+            self.log(f"[DRY-RUN] {source.name} -> {target.name}", "DRY", file=page.source, target=page.target)
+        else:
+            self.log(f"{source.name} -> {target.name}", file=page.source, target=page.target)
+        if existed:
+            self.stats["updated"] += 1
+        else:
+            self.stats["created"] += 1
 
-            if self.dry_run:
-                self.log(f"[DRY-RUN] {source.name} -> {target.name}", "DRY")
-            else:
-                target.parent.mkdir(parents=True, exist_ok=True)
-                target.write_text(content, encoding="utf-8")
-                self.log(f"{source.name} -> {target.name}")
+    def sync_file(self, page: Page):
+        """同步单个文件"""
+        existed = self.check_target(page)
+        if existed is None:
+            self.stats["skipped"] += 1
+            return
 
-            if target.exists():
-                self.stats["updated"] += 1
-            else:
-                self.stats["created"] += 1
+        try:
+            content = self.convert_md_to_mdx(page.source_path, page.title, page.target)
+            if self.budget is not None:
+                self.page_metrics.append(measure(page.target_path, content))
+            if not self.dry_run:
+                self.write_page(page, content)
+            self.record_page(page, existed)
 
         except Exception as e:
             self.stats["errors"] += 1
-            self.log(f"错误 {source.name}: {e}", "ERROR")
+            self.log(f"错误 {page.source_path.name}: {e}", "ERROR", file=page.source)
+
+    def sync_pages_async(self, pages: List[Page]):
+        """异步管道：并发读取源文件 → 转换（单线程 executor）→ 并发写入"""
+        def read(page: Page):
+            existed = self.check_target(page)
+            if existed is None:
+                return SKIP
+            return existed, self.storage.read_text(page.source_path)
+
+        def convert(page: Page, data):
+            existed, content = data
+            content = self.convert_text(content, page.source_path, page.title, page.target)
+            if self.budget is not None:
+                self.page_metrics.append(measure(page.target_path, content))
+            return existed, content
+
+        def write(page: Page, data):
+            existed, content = data
+            if not self.dry_run:
+                self.write_page(page, content)
+            return existed
+
+        for result in run_pipeline(pages, read, convert, write, depth=self.io_depth):
+            self.events.advance()
+            if result.skipped:
+                self.stats["skipped"] += 1
+            elif result.error is not None:
+                self.stats["errors"] += 1
+                self.log(f"错误 {result.job.source_path.name} ({result.stage}): {result.error}", "ERROR",
+                         file=result.job.source, stage=result.stage)
+            else:
+                self.record_page(result.job, result.value)
+
+    def check_budgets(self):
+        """报告超出体积预算的页面，并按需拆分"""
+        offenders = []
+        for metrics in self.page_metrics:
+            violations = metrics.violations(self.budget)
+            if violations:
+                offenders.append((metrics, violations))
+
+        if not offenders:
+            self.log(f"{len(self.page_metrics)} 个页面均在预算内", detail=False)
+            return
+
+        offenders.sort(key=lambda item: item[0].estimated_js, reverse=True)
+        splitter = PageSplitter(dry_run=self.dry_run)
+        for metrics, violations in offenders:
+            rel = metrics.path.relative_to(self.target_dir)
+            self.log(f"{rel}: {', '.join(violations)}", "WARN")
+            if not self.split_oversized:
+                continue
+            # 拆分直接在磁盘上进行
+            if not self.storage.persistent or not metrics.path.exists():
+                continue
+            created = splitter.split(metrics.path)
+            if not created:
+                self.log(f"{rel}: 少于两个 ## 小节，无法拆分", "SKIP")
+            elif self.dry_run:
+                self.log(f"[DRY-RUN] 将拆分 {rel} 为 {len(created)} 个子页面", "DRY")
+            else:
+                self.log(f"拆分 {rel} 为 {len(created)} 个子页面")
 
     def generate_root_meta(self):
         """生成根目录的 _meta.json"""
         meta = {"index": "课程首页"}
+        artifact = "_meta.json"
+        self.graph.declare(artifact)
 
         # 根目录页面（除 index 以外）
-        for slug, title in sorted(self.root_pages_meta.items()):
-            meta[slug] = title
-
-        # 添加所有存在的章节
-        for i in range(1, 17):
-            chapter_name = f"chapter-{str(i).zfill(2)}"
-            chapter_dir = self.target_dir / chapter_name
-            if chapter_dir.exists() and any(chapter_dir.glob("*.mdx")):
+        for page in sorted(self.corpus.chapter(""), key=lambda p: p.slug):
+            meta[page.slug] = page.title
+            self.graph.depend(artifact, f"page:{page.source}", f"{page.slug}\t{page.title}")
+
+        # 添加所有存在的章节（按编号，不限数量）
+        for entry in self.storage.chapter_dirs(self.target_dir):
+            chapter_name = entry.name
+            if self.storage.scan(entry.path, suffix=".mdx"):
                 meta[chapter_name] = self.chapter_titles.get(chapter_name, chapter_name)
+                self.graph.depend(artifact, f"chapter:{chapter_name}", meta[chapter_name])
 
         # 添加其他目录
         for extra in ["learning-map", "resources"]:
             extra_dir = self.target_dir / extra
-            if extra_dir.exists():
+            if self.storage.exists(extra_dir):
                 meta[extra] = extra.replace("-", " ").title()
+                self.graph.depend(artifact, f"extra:{extra}", meta[extra])
 
         meta_path = self.target_dir / "_meta.json"
 
+        if not self.needs_update(artifact, meta_path):
+            return
         if self.dry_run:
             self.log(f"[DRY-RUN] 将更新根 _meta.json ({len(meta)} 条)", "DRY")
-        else:
-            meta_path.write_text(
-                json.dumps(meta, indent=2, ensure_ascii=False) + "\n",
-                encoding="utf-8"
-            )
+        elif self.write_if_changed(meta_path, json.dumps(meta, indent=2, ensure_ascii=False) + "\n"):
             self.log(f"更新根 _meta.json ({len(meta)} 条)")
 
     def sync_index(self):
@@ -513,38 +534,87 @@ description: "{description}"
         source_index = self.source_dir / "index.md"
         target_index = self.target_dir / "index.mdx"
 
-        if source_index.exists():
-            content = self.convert_md_to_mdx(source_index, "智能体工程化实战")
+        if self.storage.exists(source_index):
+            st = self.storage.stat(source_index)
+            self.graph.depend("index.mdx", "source:index.md", f"{st.st_mtime}\t{st.st_size}")
+            if not self.needs_update("index.mdx", target_index):
+                return
+
+            content = self.convert_md_to_mdx(source_index, "智能体工程化实战", "index.mdx")
 
             if self.dry_run:
                 self.log(f"[DRY-RUN] 将更新 index.mdx", "DRY")
-            else:
-                target_index.write_text(content, encoding="utf-8")
+            elif self.write_if_changed(target_index, content):
                 self.log(f"更新 index.mdx")
 
+    def update_routes(self):
+        """重建路由清单；页面的源文件来自本次扫描的语料，未扫描到的页面查 slug 注册表"""
+        # 清单记录的是磁盘上的页面，内存后端中没有
+        if not self.storage.persistent:
+            self.log("内存存储不更新路由清单", "SKIP")
+            return
+        content_dir = self.routes.content_dir
+        prefix = self.target_dir.relative_to(content_dir).as_posix()
+        prefix = "" if prefix == "." else prefix + "/"
+        sources = {f"{prefix}{target}": source for target, source in self.slugs.pages().items()}
+        sources.update((f"{prefix}{page.target}", page.source) for page in self.corpus)
+        if self.storage.exists(self.source_dir / "index.md"):
+            sources[f"{prefix}index.mdx"] = "index.md"
+
+        self.routes.update(sources)
+        for warning in self.routes.warnings:
+            self.log(warning, "WARN")
+        if self.dry_run:
+            self.log(f"[DRY-RUN] 将更新 {self.routes.manifest_path.name}", "DRY")
+        self.log(self.routes.summary(), detail=False)
+
+    def update_related(self):
+        """为 content 目录的全部页面计算相关页面（未改动的页面沿用缓存的签名）"""
+        if not self.storage.persistent:
+            self.log("内存存储不更新相关页面", "SKIP")
+            return
+        self.related.update()
+        self.related.save()
+        if self.dry_run:
+            self.log(f"[DRY-RUN] 将更新 {self.related.output_path.name}", "DRY")
+        self.log(self.related.summary(), detail=False)
+
+    def write_changeset(self):
+        """比较同步前后的快照，写出变更集"""
+        if not self.storage.persistent:
+            self.log("内存存储不生成变更集", "SKIP")
+            return
+        self.changes.compute()
+        if self.dry_run:
+            self.log(f"[DRY-RUN] 将写入 {self.changeset_path.name}", "DRY")
+        else:
+            self.changes.save(self.changeset_path)
+        self.log(self.changes.summary(), detail=False)
+
     def run(self, chapter_filter: Optional[str] = None) -> bool:
         """执行同步"""
-        print("\n" + "=" * 60)
-        print("Deepractice Content Sync")
-        print("=" * 60)
-        print(f"源目录: {self.source_dir}")
-        print(f"目标目录: {self.target_dir}")
+        self.events.section("\n" + "=" * 60)
+        self.events.section("Deepractice Content Sync")
+        self.events.section("=" * 60)
+        self.events.section(f"源目录: {self.source_dir}")
+        self.events.section(f"目标目录: {self.target_dir}")
 
         if self.dry_run:
-            print("\n[DRY-RUN 模式] 不会实际修改文件")
+            self.events.section("\n[DRY-RUN 模式] 不会实际修改文件")
         if self.full_sync:
-            print("[FULL 模式] 全量同步")
+            self.events.section("[FULL 模式] 全量同步")
 
         # 验证源目录
-        if not self.source_dir.exists():
+        if not self.storage.is_dir(self.source_dir):
             self.log(f"源目录不存在: {self.source_dir}", "ERROR")
             return False
 
+        # 同步前的快照（--full 删除旧文件之前）
+        if self.changes is not None and self.storage.persistent:
+            self.changes.begin()
+
         # 获取章节列表
-        chapters = sorted([
-            d for d in self.source_dir.iterdir()
-            if d.is_dir() and d.name.lower().startswith("chapter")
-        ], key=lambda d: d.name)
+        chapters = [Path(entry.path) for entry in self.storage.chapter_dirs(self.source_dir)]
 
         if chapter_filter:
             normalized = self.normalize_chapter_name(chapter_filter.replace("-", ""))
@@ -553,27 +623,95 @@ description: "{description}"
                 self.log(f"未找到章节: {chapter_filter}", "ERROR")
                 return False
 
-        print(f"\n发现 {len(chapters)} 个章节")
+        self.events.section(f"\n发现 {len(chapters)} 个章节")
 
         # 同步各章节
-        for chapter_dir in chapters:
-            self.sync_chapter(chapter_dir)
+        if self.io_depth:
+            # 异步管道：先准备全部章节，所有页面进入同一条管道，最后生成各章节 _meta.json
+            prepared = [(chapter_dir, self.prepare_chapter(chapter_dir)) for chapter_dir in chapters]
+            pages = [page for _, chapter_pages in prepared for page in chapter_pages]
+            self.events.section(f"\n[管道] 同步 {len(pages)} 个页面（并发深度 {self.io_depth}）...")
+            self.events.start(total=len(pages), label="同步")
+            self.sync_pages_async(pages)
+            for _, chapter_pages in prepared:
+                if chapter_pages:
+                    self.write_chapter_meta(chapter_pages[0].chapter)
+        else:
+            # 页面总数随章节扫描逐步增加
+            self.events.start(label="同步")
+            for chapter_dir in chapters:
+                self.sync_chapter(chapter_dir)
+        self.events.finish()
 
         # 同步根文件
-        print("\n[根目录] 同步中...")
+        self.events.section("\n[根目录] 同步中...")
         self.sync_index()
         self.sync_root_pages()
         self.generate_root_meta()
 
+        # 保存导航依赖图（只同步部分章节时保留其他章节的记录）
+        if self.nav_graph is not None and not self.dry_run and self.storage.persistent:
+            self.graph.save(
+                self.nav_graph,
+                str(self.target_dir),
+                keep=self.previous_graph if chapter_filter else None
+            )
+
+        for collision in self.slugs.collisions:
+            self.log(f"slug 冲突: {collision}", "WARN")
+        # 提交缓冲的写入（batched 后端）
+        self.storage.flush()
+
+        # 内存后端只用于测试与基准，不改动磁盘上的注册表
+        if not self.dry_run and self.storage.persistent and self.slugs.save():
+            self.log(f"更新 slug 注册表: {self.slugs.path.name}")
+
+        if self.budget is not None:
+            self.events.section("\n[预算] 检查页面体积...")
+            self.check_budgets()
+
+        if self.routes is not None:
+            self.events.section("\n[路由] 更新路由清单...")
+            self.update_routes()
+
+        if self.related is not None:
+            self.events.section("\n[相关] 计算相关页面...")
+            self.update_related()
+
+        if self.assets is not None:
+            self.events.section("\n[资源] 写入图片缓存...")
+            self.assets.save()
+            for warning in self.assets.warnings:
+                self.log(warning, "WARN")
+            self.log(self.assets.summary(), detail=False)
+
+        if self.diagrams is not None:
+            self.events.section("\n[图表] 写入图表清单...")
+            self.diagrams.save()
+            for warning in self.diagrams.warnings:
+                self.log(warning, "WARN")
+            self.log(self.diagrams.summary(), detail=False)
+
+        if self.highlighter is not None:
+            self.highlighter.close()
+            self.log(self.highlighter.summary(), "INFO" if self.highlighter.available else "WARN", detail=False)
+
+        if self.changes is not None:
+            self.events.section("\n[变更] 比较内容哈希...")
+            self.write_changeset()
+
         # 报告
-        print("\n" + "-" * 60)
-        print("同步完成!")
-        print(f"  • 扫描: {self.stats['scanned']}")
-        print(f"  • 创建: {self.stats['created']}")
-        print(f"  • 更新: {self.stats['updated']}")
-        print(f"  • 跳过: {self.stats['skipped']}")
-        print(f"  • 错误: {self.stats['errors']}")
-        print("-" * 60 + "\n")
+        self.events.emit("summary", **self.stats)
+        self.events.echo("\n" + "-" * 60)
+        self.events.echo("同步完成!")
+        self.events.echo(f"  • 语料: {self.corpus.summary()}")
+        self.events.echo(f"  • 扫描: {self.stats['scanned']}")
+        self.events.echo(f"  • 创建: {self.stats['created']}")
+        self.events.echo(f"  • 更新: {self.stats['updated']}")
+        self.events.echo(f"  • 跳过: {self.stats['skipped']}")
+        self.events.echo(f"  • 导航: 重新生成 {self.stats['nav_written']}，未变化 {self.stats['nav_unchanged']}")
+        self.events.echo(f"  • 错误: {self.stats['errors']}")
+        self.events.echo("-" * 60 + "\n")
 
         return self.stats["errors"] == 0
 
@@ -595,6 +733,30 @@ def main():
         type=str,
         help="目标 content 目录路径（默认: apps/docs/content）"
     )
+    parser.add_argument("--assets", action="store_true", help="处理本地图片（哈希去重 + WebP 变体）")
+    parser.add_argument("--highlight", action="store_true", help="预高亮代码块（需要 Pygments）")
+    parser.add_argument("--highlight-theme", type=str, default="github-dark", help="Pygments 主题")
+    parser.add_argument("--diagrams", action="store_true", help="提取 mermaid 图表为静态文件（按需加载）")
+    parser.add_argument("--diagram-renderer", type=str, help="图表预渲染器：stub / mmdc / 模块:函数（隐含 --diagrams）")
+    parser.add_argument("--budget", action="store_true", help="检查页面体积预算")
+    parser.add_argument("--budget-config", type=str, help="预算配置文件（JSON）")
+    parser.add_argument("--split-oversized", action="store_true", help="在 ## 边界拆分超标页面")
+    parser.add_argument("--public", type=str, help="静态资源目录（默认: apps/docs/public）")
+    parser.add_argument("--cache-dir", type=str, help="持久缓存目录（默认: apps/docs/.cache）")
+    parser.add_argument("--slug-registry", type=str, help="slug 注册表（默认: apps/docs/slug-registry.json）")
+    parser.add_argument("--pipeline", action="store_true", help="异步管道模式：并发读写，转换在 executor 中执行")
+    parser.add_argument("--io-depth", type=int, default=DEFAULT_DEPTH, help="异步管道的并发深度（默认: 16）")
+    parser.add_argument("--storage", choices=BACKENDS, default="local", help="存储后端（默认: local）")
+    parser.add_argument("--routes", action="store_true", help="更新路由清单、重定向与 sitemap")
+    parser.add_argument("--route-manifest", type=str, help="路由清单路径（默认: apps/docs/route-manifest.json）")
+    parser.add_argument("--related", action="store_true", help="生成相关页面索引 related-pages.json")
+    parser.add_argument("--related-output", type=str, help="相关页面索引路径（默认: apps/docs/related-pages.json）")
+    parser.add_argument("--changeset", type=str, help="变更集输出路径（JSON），不给出时不生成")
+    parser.add_argument("--content-root", type=str, help="路由的根目录（默认: apps/docs/content）")
+    parser.add_argument("--verbose", action="store_true", help="逐个文件打印日志（默认只显示进度）")
+    parser.add_argument("--quiet", action="store_true", help="只打印最终报告与警告/错误汇总")
+    parser.add_argument("--events", type=str, help="结构化事件流（JSON Lines）：文件路径或 fd:N")
+    parser.add_argument("--site-url", type=str, help="sitemap.xml 中的站点地址（含 basePath），为空时不生成")
     args = parser.parse_args()
 
     # 路径配置
@@ -606,14 +768,104 @@ def main():
     target_dir = Path(args.target) if args.target else (script_dir / "content")
     target_dir = target_dir.resolve()
 
+    assets = None
+    if args.assets:
+        assets = AssetPipeline(
+            public_dir=Path(args.public) if args.public else (script_dir / "public"),
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            public_source_dir=source_dir / "public",
+            dry_run=args.dry_run
+        )
+
+    highlighter = None
+    if args.highlight:
+        highlighter = CodeHighlighter(
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            theme=args.highlight_theme,
+            dry_run=args.dry_run
+        )
+
+    content_root = Path(args.content_root).resolve() if args.content_root else (script_dir / "content").resolve()
+    if content_root != target_dir and content_root not in target_dir.parents:
+        content_root = target_dir
+
+    # 链接改写使用的路由前缀：target 在 content 根目录中的位置
+    relative = target_dir.relative_to(content_root).as_posix()
+    link_base = DOCS_BASE if relative == "." else f"{DOCS_BASE}/{relative}"
+
+    routes = None
+    if args.routes:
+        routes = RouteOutputs(
+            content_dir=content_root,
+            manifest_path=Path(args.route_manifest) if args.route_manifest else MANIFEST_PATH,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            public_dir=Path(args.public) if args.public else (script_dir / "public"),
+            site_url=args.site_url,
+            dry_run=args.dry_run
+        )
+
+    related = None
+    if args.related:
+        related = RelatedIndex(
+            content_dir=content_root,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            output_path=Path(args.related_output) if args.related_output else RELATED_PATH,
+            dry_run=args.dry_run
+        )
+
+    diagrams = None
+    if args.diagrams or args.diagram_renderer:
+        try:
+            renderer = load_renderer(args.diagram_renderer)
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"错误: {e}")
+            sys.exit(1)
+        diagrams = DiagramExtractor(
+            public_dir=Path(args.public) if args.public else (script_dir / "public"),
+            renderer=renderer,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            dry_run=args.dry_run
+        )
+
+    changes = None
+    if args.changeset:
+        outputs = [(routes.manifest_path, structure_digest)] if routes is not None else []
+        if related is not None:
+            outputs.append(related.output_path)
+        changes = ChangeTracker(
+            content_dir=content_root,
+            cache_dir=Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache"),
+            outputs=outputs
+        )
+
+    budget = None
+    if args.budget or args.budget_config or args.split_oversized:
+        budget = PageBudget.from_file(Path(args.budget_config)) if args.budget_config else PageBudget()
+
     syncer = DeepracticeContentSync(
         source_dir=source_dir,
         target_dir=target_dir,
         dry_run=args.dry_run,
-        full_sync=args.full
+        full_sync=args.full,
+        assets=assets,
+        highlighter=highlighter,
+        diagrams=diagrams,
+        budget=budget,
+        split_oversized=args.split_oversized,
+        slugs=SlugRegistry(Path(args.slug_registry) if args.slug_registry else REGISTRY_PATH),
+        io_depth=args.io_depth if args.pipeline else None,
+        storage=open_storage(args.storage, preload=[source_dir, target_dir]),
+        nav_graph=(Path(args.cache_dir) if args.cache_dir else (script_dir / ".cache")) / "nav-graph.json",
+        routes=routes,
+        related=related,
+        changes=changes,
+        changeset_path=Path(args.changeset) if args.changeset else None,
+        events=open_events("sync_from_source", args.verbose, args.quiet, args.events, args.dry_run),
+        link_base=link_base
     )
 
     success = syncer.run(chapter_filter=args.chapter)
+    syncer.events.close()
     sys.exit(0 if success else 1)
 
 
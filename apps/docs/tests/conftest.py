@@ -0,0 +1,19 @@
+"""apps/docs 的脚本与 content_tools 以源码目录方式导入（与脚本运行时相同）"""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from content_tools.events import EventLog  # noqa: E402
+
+
+@pytest.fixture
+def events():
+    """不输出到终端的事件日志"""
+    log = EventLog("test", mode="quiet", stream=io.StringIO())
+    yield log
+    log.close()
@@ -0,0 +1,39 @@
+"""check_links.py：基线中的已知问题不影响结果，新问题照常报告"""
+
+import json
+
+from check_links import LinkChecker
+
+
+def make_tree(tmp_path, body):
+    content = tmp_path / "content"
+    content.mkdir()
+    (content / "index.mdx").write_text(f"# home\n\n{body}\n", encoding="utf-8")
+    return content
+
+
+def test_baseline_hides_only_known_issues(tmp_path):
+    content = make_tree(tmp_path, "[a](./Preface.md)\n[b](/docs/missing)")
+    baseline = tmp_path / "link-issues.json"
+    baseline.write_text(json.dumps({"issues": [
+        {"file": "index.mdx", "code": "dangling-link", "message": "链接目标不存在: ./Preface.md"},
+        {"file": "index.mdx", "code": "dangling-link", "message": "链接目标不存在: gone.md"},
+    ]}, ensure_ascii=False), encoding="utf-8")
+
+    checker = LinkChecker(content, tmp_path / "public", workers=1, baseline=baseline)
+    errors, warnings = checker.run()
+    assert (errors, warnings) == (1, 0)
+    assert [i.message for i in checker.issues if not i.known] == ["链接目标不存在: /docs/missing"]
+    assert checker.fixed == [("index.mdx", "dangling-link", "链接目标不存在: gone.md")]
+
+
+def test_repeated_issue_beyond_baseline_count_is_new(tmp_path):
+    content = make_tree(tmp_path, "[a](x.md)\n[b](x.md)")
+    checker = LinkChecker(content, tmp_path / "public", workers=1)
+    checker.run()
+    baseline = tmp_path / "link-issues.json"
+    checker.write_baseline(baseline)
+
+    (content / "index.mdx").write_text("# home\n\n[a](x.md)\n[b](x.md)\n[c](x.md)\n", encoding="utf-8")
+    errors, _ = LinkChecker(content, tmp_path / "public", workers=1, baseline=baseline).run()
+    assert errors == 1
@@ -0,0 +1,24 @@
+"""content_tools/events.py：退出钩子只属于 open_events 创建的日志"""
+
+import gc
+import io
+import weakref
+
+from content_tools.events import EventLog, open_events
+
+
+def test_plain_event_log_is_not_kept_alive():
+    ref = weakref.ref(EventLog("test", mode="quiet", stream=io.StringIO()))
+    gc.collect()
+    assert ref() is None
+
+
+def test_open_events_close_unregisters_exit_hook(tmp_path):
+    events = open_events("test", quiet=True, sink=str(tmp_path / "events.jsonl"))
+    events.emit("summary", ok=1)
+    events.close()
+    assert events.sink.closed
+    ref = weakref.ref(events)
+    del events
+    gc.collect()
+    assert ref() is None
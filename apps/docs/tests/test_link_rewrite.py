@@ -0,0 +1,65 @@
+"""content_tools/link_rewrite.py：规则组合、互换编号与路径段边界"""
+
+from content_tools.link_rewrite import DEFAULT_RULES, LinkRewriter, RewriteRule, parse_rule_arg
+
+
+def rewriter(*specs):
+    rules = [RewriteRule.from_dict(spec) for spec in specs]
+    return LinkRewriter(rules + DEFAULT_RULES)
+
+
+def chapter(old, new):
+    return {"type": "chapter", "from": old, "to": new}
+
+
+def slug(ch, old, new):
+    return {"type": "slug", "chapter": ch, "from": old, "to": new}
+
+
+def test_slug_and_chapter_rules_compose():
+    r = rewriter(chapter("chapter-07", "chapter-04"), slug("chapter-07", "react-pattern", "react-paradigm"))
+    text, count = r.rewrite_text("[ReAct](/docs/chapter-07/react-pattern#loop)")
+    assert text == "[ReAct](/docs/chapter-04/react-paradigm#loop)"
+    assert count == 1
+
+
+def test_prefix_and_chapter_rules_compose():
+    r = rewriter(chapter("chapter-07", "chapter-04"))
+    text, _ = r.rewrite_text('<a href="/docs/docs/chapter-07/intro">x</a>')
+    assert text == '<a href="/docs/chapter-04/intro">x</a>'
+
+
+def test_swapped_chapters_are_not_chained():
+    r = rewriter(chapter("chapter-07", "chapter-04"), chapter("chapter-04", "chapter-07"))
+    text, count = r.rewrite_text("[a](/docs/chapter-07/x) [b](/docs/chapter-04/y)")
+    assert text == "[a](/docs/chapter-04/x) [b](/docs/chapter-07/y)"
+    assert count == 2
+
+
+def test_chapter_rule_matches_whole_segment():
+    r = rewriter(chapter("chapter-1", "chapter-2"))
+    text, count = r.rewrite_text("[a](/docs/chapter-10/x) [b](/docs/chapter-1)")
+    assert text == "[a](/docs/chapter-10/x) [b](/docs/chapter-2)"
+    assert count == 1
+
+
+def test_only_link_positions_are_rewritten():
+    r = rewriter(chapter("chapter-07", "chapter-04"))
+    source = "正文提到 /docs/chapter-07/x\n\n[ref]: /docs/chapter-07/y\n"
+    text, count = r.rewrite_text(source)
+    assert text == "正文提到 /docs/chapter-07/x\n\n[ref]: /docs/chapter-04/y\n"
+    assert count == 1
+
+
+def test_unchanged_file_returns_none(tmp_path):
+    page = tmp_path / "a.mdx"
+    page.write_text("[a](/docs/chapter-03/x)\n", encoding="utf-8")
+    r = rewriter(chapter("chapter-07", "chapter-04"))
+    assert r.rewrite_file(page) is None
+    assert r.run([page]) == []
+
+
+def test_parse_rule_arg():
+    assert parse_rule_arg("slug", "chapter-04/old=new") == RewriteRule(
+        "slug", "/docs/chapter-04/old", "/docs/chapter-04/new"
+    )
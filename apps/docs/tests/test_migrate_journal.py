@@ -0,0 +1,80 @@
+"""migrate_content.py 的迁移日志：中断后 --resume / --rollback"""
+
+from pathlib import Path
+
+import pytest
+
+from content_tools.link_rewrite import LinkRewriter, RewriteRule
+from migrate_content import ContentMigrator, MigrationJournal
+
+# 互换式重新编号：同一链接被重写两次会得到 chapter-03
+RULES = [
+    RewriteRule.from_dict({"type": "chapter", "from": "chapter-01", "to": "chapter-02"}),
+    RewriteRule.from_dict({"type": "chapter", "from": "chapter-02", "to": "chapter-03"}),
+]
+PAGE = "---\ntitle: A\n---\n\n[下一节](/docs/chapter-01/b)\n"
+
+
+class Crash(BaseException):
+    """模拟进程在写入之后、done 记录之前被终止"""
+
+
+class CrashingJournal(MigrationJournal):
+    def done(self, op_id: str, **payload) -> None:
+        if op_id.startswith("rewrite:"):
+            raise Crash(op_id)
+        super().done(op_id, **payload)
+
+
+@pytest.fixture
+def content(tmp_path: Path) -> Path:
+    content = tmp_path / "content"
+    (content / "docs" / "chapter-01").mkdir(parents=True)
+    (content / "docs" / "chapter-01" / "a.mdx").write_text(PAGE, encoding="utf-8")
+    (content / "docs" / "chapter-01" / "b.mdx").write_text("# B\n", encoding="utf-8")
+    return content
+
+
+def migrator(content: Path, events, journal_cls=MigrationJournal) -> ContentMigrator:
+    return ContentMigrator(
+        content,
+        backup=False,
+        journal=journal_cls(content.parent / ".migration-journal.jsonl"),
+        rewriter=LinkRewriter(RULES),
+        events=events
+    )
+
+
+def crash_during_rewrite(content: Path, events) -> None:
+    with pytest.raises(Crash):
+        migrator(content, events, CrashingJournal).run()
+    # 写入已经发生，日志中只有 planned
+    assert "/docs/chapter-02/b" in (content / "chapter-01" / "a.mdx").read_text(encoding="utf-8")
+    assert (content.parent / ".migration-journal.jsonl").exists()
+
+
+def test_resume_applies_rewrite_once(content, events):
+    crash_during_rewrite(content, events)
+
+    assert migrator(content, events).run(resume=True)
+    text = (content / "chapter-01" / "a.mdx").read_text(encoding="utf-8")
+    assert "(/docs/chapter-02/b)" in text
+    assert not (content.parent / ".migration-journal.jsonl").exists()
+
+
+def test_resume_is_idempotent_across_repeated_crashes(content, events):
+    crash_during_rewrite(content, events)
+    with pytest.raises(Crash):
+        migrator(content, events, CrashingJournal).run(resume=True)
+
+    assert migrator(content, events).run(resume=True)
+    assert "(/docs/chapter-02/b)" in (content / "chapter-01" / "a.mdx").read_text(encoding="utf-8")
+
+
+def test_rollback_restores_original_layout(content, events):
+    crash_during_rewrite(content, events)
+
+    assert migrator(content, events).run(rollback=True)
+    assert (content / "docs" / "chapter-01" / "a.mdx").read_text(encoding="utf-8") == PAGE
+    assert not (content / "chapter-01").exists()
+    assert not (content / "_meta.json").exists()
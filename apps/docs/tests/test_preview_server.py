@@ -0,0 +1,77 @@
+"""preview_server.py：请求参数的类型检查"""
+
+import json
+import threading
+from http.client import HTTPConnection
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from preview_server import PreviewHandler, PreviewService
+
+
+@pytest.fixture
+def server(tmp_path):
+    PreviewHandler.service = PreviewService(tmp_path)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PreviewHandler)
+    thread = threading.Thread(target=httpd.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield httpd.server_address
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def post(address, body):
+    conn = HTTPConnection(*address, timeout=10)
+    conn.request("POST", "/convert", json.dumps(body), {"Content-Type": "application/json"})
+    response = conn.getresponse()
+    data = json.loads(response.read().decode("utf-8"))
+    conn.close()
+    return response.status, data
+
+
+@pytest.mark.parametrize("body", [
+    {"markdown": 42},
+    {"markdown": ["# a"]},
+    {"markdown": "# a", "filename": {"name": "a.md"}},
+    {"markdown": "# a", "engine": ["sync"]},
+    {"path": 1},
+    ["# a"],
+])
+def test_non_string_params_are_rejected(server, body):
+    status, data = post(server, body)
+    assert status == 400
+    assert "error" in data
+
+
+def test_string_params_are_converted(server):
+    status, data = post(server, {"markdown": "# Title\n\ntext\n", "filename": "1.1-Title.md"})
+    assert status == 200
+    assert data["mdx"].startswith("---\n")
+
+
+def post_raw(address, body: bytes, headers):
+    conn = HTTPConnection(*address, timeout=10)
+    conn.putrequest("POST", "/convert")
+    for name, value in headers.items():
+        conn.putheader(name, value)
+    conn.endheaders()
+    conn.send(body)
+    response = conn.getresponse()
+    data = json.loads(response.read().decode("utf-8"))
+    conn.close()
+    return response.status, data
+
+
+@pytest.mark.parametrize("length", ["abc", "-1"])
+def test_invalid_content_length_is_rejected(server, length):
+    status, data = post_raw(server, b"# a", {"Content-Type": "text/markdown", "Content-Length": length})
+    assert status == 400
+    assert "error" in data
+
+
+def test_non_utf8_body_is_rejected(server):
+    body = "# 标题".encode("gbk")
+    status, data = post_raw(server, body, {"Content-Type": "text/markdown", "Content-Length": str(len(body))})
+    assert status == 400
+    assert "UTF-8" in data["error"]
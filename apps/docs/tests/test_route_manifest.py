@@ -0,0 +1,70 @@
+"""content_tools/route_manifest.py：路由历史推导重定向与源文件记录"""
+
+from content_tools.route_manifest import RouteManifest, RouteOutputs
+
+
+def manifest(routes, redirects=None):
+    m = RouteManifest("content")
+    m.routes = {
+        route: {"file": route[len("/docs/"):] + ".mdx", "source": source, "hash": digest}
+        for route, (source, digest) in routes.items()
+    }
+    m.redirects = dict(redirects or {})
+    return m
+
+
+def test_slug_change_redirects_by_source():
+    previous = manifest({"/docs/ch/react-pattern": ("ch07/7.2-ReAct.md", "aaa")})
+    current = manifest({"/docs/ch/react-paradigm": ("ch07/7.2-ReAct.md", "bbb")})
+    added, removed = current.link_history(previous)
+    assert added == [("/docs/ch/react-pattern", "/docs/ch/react-paradigm")]
+    assert removed == []
+    assert current.redirects == {"/docs/ch/react-pattern": "/docs/ch/react-paradigm"}
+
+
+def test_moved_page_redirects_by_unique_hash():
+    previous = manifest({"/docs/a/page": (None, "aaa")})
+    current = manifest({"/docs/b/page": (None, "aaa")})
+    added, _ = current.link_history(previous)
+    assert added == [("/docs/a/page", "/docs/b/page")]
+
+
+def test_ambiguous_hash_is_reported_as_removed():
+    previous = manifest({"/docs/a/page": (None, "aaa")})
+    current = manifest({"/docs/b/one": (None, "aaa"), "/docs/b/two": (None, "aaa")})
+    added, removed = current.link_history(previous)
+    assert added == []
+    assert removed == ["/docs/a/page"]
+    assert current.redirects == {}
+
+
+def test_redirect_chains_are_folded():
+    previous = manifest({"/docs/b": ("s.md", "h1")}, {"/docs/a": "/docs/b"})
+    current = manifest({"/docs/c": ("s.md", "h2")})
+    current.link_history(previous)
+    assert current.redirects == {"/docs/a": "/docs/c", "/docs/b": "/docs/c"}
+
+
+def test_reappearing_route_drops_its_redirect():
+    previous = manifest({"/docs/b": ("s.md", "h1")}, {"/docs/a": "/docs/b"})
+    current = manifest({"/docs/a": ("s.md", "h1"), "/docs/b": ("t.md", "h2")})
+    added, removed = current.link_history(previous)
+    assert (added, removed) == ([], [])
+    assert current.redirects == {}
+
+
+def test_build_records_sources_and_keeps_previous(tmp_path):
+    content = tmp_path / "content"
+    (content / "chapter-01").mkdir(parents=True)
+    (content / "index.mdx").write_text("# home\n", encoding="utf-8")
+    (content / "chapter-01" / "intro.mdx").write_text("# intro\n", encoding="utf-8")
+    (content / "chapter-01" / "_meta.json").write_text("{}\n", encoding="utf-8")
+    outputs = RouteOutputs(content, manifest_path=tmp_path / "route-manifest.json")
+
+    first = outputs.update({"chapter-01/intro.mdx": "chapter01/1.1-Intro.md"})
+    assert first.routes["/docs/chapter-01/intro"]["source"] == "chapter01/1.1-Intro.md"
+    assert first.routes["/docs"]["source"] is None
+
+    # 本次同步没有经过的页面沿用上次记录的源文件
+    second = outputs.update({})
+    assert second.routes["/docs/chapter-01/intro"]["source"] == "chapter01/1.1-Intro.md"
@@ -0,0 +1,70 @@
+"""content_tools/slug_registry.py：已发布文件名的复现与 slug 稳定性"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from content_tools.slug_registry import REGISTRY_PATH, SlugRegistry, tree_mismatches
+from sync_from_source import DeepracticeContentSync
+
+TREE = Path(__file__).resolve().parent.parent / "content" / "import-agents"
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """已提交注册表的副本，登记不会写回仓库"""
+    path = tmp_path / "slug-registry.json"
+    shutil.copy(REGISTRY_PATH, path)
+    return SlugRegistry(path)
+
+
+def test_committed_registry_matches_tree(registry):
+    assert tree_mismatches(registry, TREE) == []
+
+
+def test_fresh_sync_reproduces_committed_file_names(tmp_path, registry, events):
+    syncer = DeepracticeContentSync(tmp_path / "src", tmp_path / "out", dry_run=True, slugs=registry, events=events)
+    for source, slug in list(registry.sources.items()):
+        name = Path(source).name
+        assert syncer.extract_file_info(name, source)[1] == slug
+        # 没有按源文件登记时，由标题得到同一 slug
+        assert syncer.extract_file_info(name)[1] == slug
+    assert not registry.dirty
+    assert registry.collisions == []
+
+
+def test_renumbered_source_keeps_slug(registry):
+    registry.retain("chapter07", {"chapter07/7.3-ReAct范式.md"})
+    assert registry.register_source("chapter07/7.3-ReAct范式.md", "ReAct范式") == "react-pattern"
+    assert registry.source_for("chapter07", "react-pattern") == "chapter07/7.3-ReAct范式.md"
+
+
+def test_collisions_get_numbered_suffix(tmp_path):
+    registry = SlugRegistry(tmp_path / "slug-registry.json")
+    assert registry.register("Quick Start") == "quick-start"
+    assert registry.register("quick start") == "quick-start-2"
+    assert registry.register_source("chapter01/1.1-A.md", "Quick Start") == "quick-start"
+    assert registry.register_source("chapter01/1.2-B.md", "Quick Start") == "quick-start-2"
+    assert len(registry.collisions) == 2
+
+    registry.save()
+    reloaded = SlugRegistry(registry.path)
+    assert reloaded.register_source("chapter01/1.2-B.md", "Quick Start") == "quick-start-2"
+    assert not reloaded.dirty
+
+
+def test_pages_map_sources_to_target_files(registry):
+    pages = registry.pages()
+    assert pages["chapter-07/react-pattern.mdx"] == "chapter07/7.2-ReAct范式.md"
+    assert pages["preface.mdx"] == "前言.md"
+
+
+def test_link_target_resolves_upstream_md_links(registry):
+    source = "chapter01/README.md"
+    assert registry.link_target(source, "1.3-构建第一个智能体.md#step") == "chapter-01/first-agent.mdx"
+    assert registry.link_target(source, "../chapter05/README.md") == "chapter-05/index.mdx"
+    # 章号与所在章节不一致、未登记的标题、外部链接都不猜测
+    assert registry.link_target(source, "9.7-习题与讨论.md") is None
+    assert registry.link_target(source, "./Preface.md") is None
+    assert registry.link_target(source, "https://example.com/a.md") is None
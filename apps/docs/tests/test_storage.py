@@ -0,0 +1,19 @@
+"""content_tools/storage.py：后端必须实现全部基本操作"""
+
+import pytest
+
+from content_tools.storage import BatchedStorage, LocalStorage, MemoryStorage, Storage
+
+
+def test_builtin_backends_are_complete():
+    LocalStorage()
+    BatchedStorage(MemoryStorage()).flush()
+
+
+def test_incomplete_backend_fails_at_creation():
+    class ReadOnly(Storage):
+        def read_bytes(self, path):
+            return b""
+
+    with pytest.raises(TypeError, match="write_bytes"):
+        ReadOnly()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+MDX Hazard Validator
+====================
+在 next build 之前扫描 content 目录中的全部 .mdx，报告会让 MDX 编译失败的写法。
+
+功能：
+1. 并行扫描每个页面：未闭合代码块、不平衡的 JSX 标签、正文中裸露的 { }、
+   < 后紧跟数字、HTML 注释、<URL> 自动链接等（规则见 content_tools/mdx_lint.py）
+2. 以 file:line:col 输出诊断
+3. 结果按内容哈希缓存在 .cache/mdx-lint.json，未改动的页面不再重复扫描
+
+用法：
+    python validate_mdx.py [--content DIR] [--fail-on LEVEL] [--workers N] [--no-cache]
+
+参数：
+    --content   content 目录（默认: apps/docs/content）
+    --cache-dir 缓存目录（默认: apps/docs/.cache）
+    --no-cache  忽略并且不写入缓存
+    --fail-on   error（默认）/ warning / never，决定何种问题导致非零退出码
+    --workers   并行进程数（1 表示串行）
+
+示例：
+    python validate_mdx.py
+    python validate_mdx.py --content content/import-agents --fail-on warning
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from content_tools.fsutil import write_text_atomic
+from content_tools.mdx_lint import LINT_VERSION, Diagnostic, lint
+from content_tools.walk import walk
+
+
+def lint_page(content: str) -> List[list]:
+    """扫描单个页面（在工作进程中执行），返回可序列化的诊断"""
+    return [[d.line, d.col, d.code, d.message] for d in lint(content)]
+
+
+class MDXValidator:
+    def __init__(
+        self,
+        content_dir: Path,
+        cache_dir: Optional[Path] = None,
+        workers: Optional[int] = None
+    ):
+        self.content_dir = content_dir
+        self.cache_path = cache_dir / "mdx-lint.json" if cache_dir is not None else None
+        self.workers = workers or os.cpu_count() or 1
+        self.cache: Dict[str, List[list]] = {}
+        if self.cache_path is not None and self.cache_path.exists():
+            try:
+                data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                if data.get("version") == LINT_VERSION:
+                    self.cache = data.get("results", {})
+            except json.JSONDecodeError:
+                pass
+        self.results: List[Tuple[Path, Diagnostic]] = []
+        self.stats = {"pages": 0, "cached": 0, "scanned": 0}
+
+    def log(self, msg: str, level: str = "INFO"):
+        prefix = {"INFO": "✓", "WARN": "⚠", "ERROR": "✗"}
+        symbol = prefix.get(level, "•")
+        print(f"  {symbol} {msg}")
+
+    def collect(self) -> List[Tuple[Path, str, Optional[str]]]:
+        """读取全部页面并计算内容哈希，返回 (路径, 哈希, 未命中缓存时的内容)"""
+        pages = []
+        for entry in walk(self.content_dir, suffix=".mdx"):
+            data = Path(entry.path).read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if digest in self.cache:
+                pages.append((Path(entry.path), digest, None))
+            else:
+                pages.append((Path(entry.path), digest, data.decode("utf-8")))
+        return pages
+
+    def scan(self, pages: List[Tuple[Path, str, Optional[str]]]):
+        pending = [(digest, content) for _, digest, content in pages if content is not None]
+        # 同一内容只扫描一次
+        unique = dict(pending)
+        contents = list(unique.values())
+        if self.workers <= 1 or len(contents) < 2:
+            found = [lint_page(c) for c in contents]
+        else:
+            chunksize = max(1, len(contents) // (self.workers * 4))
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                found = list(pool.map(lint_page, contents, chunksize=chunksize))
+        self.cache.update(zip(unique.keys(), found))
+
+        for path, digest, content in pages:
+            self.stats["pages"] += 1
+            self.stats["scanned" if content is not None else "cached"] += 1
+            for line, col, code, message in self.cache[digest]:
+                self.results.append((path, Diagnostic(line, col, code, message)))
+
+    def save(self, digests: set):
+        """写入缓存（只保留当前存在的内容）"""
+        if self.cache_path is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        results = {k: v for k, v in self.cache.items() if k in digests}
+        write_text_atomic(
+            self.cache_path,
+            json.dumps({"version": LINT_VERSION, "results": results}, ensure_ascii=False) + "\n"
+        )
+
+    def report(self):
+        for path, d in sorted(self.results, key=lambda r: (str(r[0]), r[1].line, r[1].col)):
+            rel = os.path.relpath(path, self.content_dir)
+            self.log(f"{rel}:{d.line}:{d.col} [{d.code}] {d.message}", d.level)
+
+    def run(self) -> Tuple[int, int]:
+        """执行检查，返回 (错误数, 警告数)"""
+        print("\n" + "=" * 60)
+        print("MDX Hazard Validation")
+        print("=" * 60)
+        start = time.perf_counter()
+
+        print("\n[1/2] 读取页面...")
+        pages = self.collect()
+        self.log(f"{len(pages)} 个页面")
+
+        print("\n[2/2] 扫描 MDX 风险...")
+        self.scan(pages)
+        self.save({digest for _, digest, _ in pages})
+        self.report()
+
+        errors = sum(1 for _, d in self.results if d.level == "ERROR")
+        warnings = sum(1 for _, d in self.results if d.level == "WARN")
+
+        print("\n" + "-" * 60)
+        print("检查完成!")
+        print(f"  • 页面: {self.stats['pages']}（扫描 {self.stats['scanned']}，缓存命中 {self.stats['cached']}）")
+        print(f"  • 错误: {errors}")
+        print(f"  • 警告: {warnings}")
+        print(f"  • 用时: {time.perf_counter() - start:.2f}s")
+        print("-" * 60 + "\n")
+
+        return errors, warnings
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MDX Hazard Validator")
+    parser.add_argument("--content", type=str, help="content 目录（默认: apps/docs/content）")
+    parser.add_argument("--cache-dir", type=str, help="缓存目录（默认: apps/docs/.cache）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用内容哈希缓存")
+    parser.add_argument(
+        "--fail-on",
+        choices=["error", "warning", "never"],
+        default="error",
+        help="何种级别的问题导致非零退出码"
+    )
+    parser.add_argument("--workers", type=int, help="并行进程数")
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).parent
+    content_dir = (Path(args.content) if args.content else script_dir / "content").resolve()
+    cache_dir = None
+    if not args.no_cache:
+        cache_dir = (Path(args.cache_dir) if args.cache_dir else script_dir / ".cache").resolve()
+
+    if not content_dir.exists():
+        print(f"错误: content 目录不存在: {content_dir}")
+        sys.exit(1)
+
+    validator = MDXValidator(content_dir, cache_dir=cache_dir, workers=args.workers)
+    errors, warnings = validator.run()
+
+    if args.fail_on == "error" and errors:
+        sys.exit(1)
+    if args.fail_on == "warning" and (errors or warnings):
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
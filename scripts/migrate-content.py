@@ -7,277 +7,320 @@ Markdown to MDX Migration Script
 1. 转换 frontmatter 格式
 2. 将 Vue 组件语法转换为 JSX
 3. 修复图片路径
-4. 处理 Mermaid 图表
+4. 可选：Mermaid 图表提取为按哈希命名的静态文件，页面按需加载运行时，可预渲染为 SVG
+   （--extract-diagrams，--diagram-renderer 指定渲染器，见 content_tools/diagrams.py）
 5. 生成 _meta.json 导航配置
+6. 可选：本地图片哈希去重并生成 WebP 变体（--assets）
+7. 可选：CodeRun 代码体提取为按需加载的静态文件（--extract-playgrounds）
+8. 可选：异步管道模式，并发读写源/目标文件（--pipeline，--io-depth 指定深度）
+9. 可选：多进程转换（--workers N，转换规则见 content_tools/convert.py）：流式读取、有界在途页面，
+   按源文件顺序写入；单个页面出错不影响其他页面，错误带规则名与位置
+10. 可选：存储后端（--storage local / batched / memory；memory 只在内存中运行，用于基准）
+11. 导航标题只读取页面开头的 frontmatter，按 路径 + 大小 + mtime 缓存（apps/docs/.cache/titles.json）
+12. 默认只显示一行进度（速率、剩余时间）；--verbose 逐个文件打印，--quiet 只打印报告，
+    --events 写出 JSON Lines 事件流（见 content_tools/events.py），其中包括转换诊断
+13. 失败的文件记录在 apps/docs/.cache/migrate-failures.json（--failures 指定），
+    --retry-failed 只重新转换这些文件；含失败文件的目录不生成 _meta.json，
+    重试成功后再生成，结果与一次成功的迁移相同
 """
 
 import os
-import re
+import sys
 import json
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import argparse
 
+# 共享模块位于 apps/docs/content_tools
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "apps" / "docs"))
+
+from content_tools.assets import AssetPipeline
+from content_tools.convert import ConvertError, ConvertOptions, convert, convert_stream
+from content_tools.corpus import Corpus, Page
+from content_tools.diagrams import DiagramExtractor, load_renderer
+from content_tools.events import EventLog, open_events
+from content_tools.frontmatter import TitleCache
+from content_tools.fsutil import write_text_atomic
+from content_tools.pipeline import DEFAULT_DEPTH, run_pipeline
+from content_tools.playground import PlaygroundExtractor
+from content_tools.storage import BACKENDS, LocalStorage, Storage, open_storage
+from content_tools.walk import walk
+
 
 class MarkdownToMDXConverter:
     """Markdown 到 MDX 转换器"""
 
-    def __init__(self, source_dir: str, target_dir: str):
+    def __init__(
+        self,
+        source_dir: str,
+        target_dir: str,
+        assets: Optional[AssetPipeline] = None,
+        playgrounds: Optional[PlaygroundExtractor] = None,
+        diagrams: Optional[DiagramExtractor] = None,
+        io_depth: Optional[int] = None,
+        storage: Optional[Storage] = None,
+        workers: Optional[int] = None,
+        titles: Optional[TitleCache] = None,
+        events: Optional[EventLog] = None,
+        failures_path: Optional[Path] = None,
+        only: Optional[Iterable[str]] = None
+    ):
         self.source_dir = Path(source_dir)
         self.target_dir = Path(target_dir)
+        self.storage = storage if storage is not None else LocalStorage()
+        self.assets = assets
+        self.playgrounds = playgrounds
+        self.diagrams = diagrams
+        # 异步管道的并发深度（None 时逐个文件转换）
+        self.io_depth = io_depth
+        # 转换进程数（None 或 1 时在当前进程中转换）
+        self.workers = workers
+        # 导航标题缓存（None 时只在本次运行内缓存）
+        self.titles = titles if titles is not None else TitleCache()
+        self.events = events if events is not None else EventLog("migrate-content")
+        # 失败记录（None 时不写出）；only 为源目录相对路径，只转换这些文件（--retry-failed）
+        self.failures_path = failures_path
+        self.only = set(only) if only is not None else None
+        # 本次迁移的页面（源文件 -> 同名 .mdx），转换、失败记录与报告共用
+        self.corpus = Corpus(self.source_dir, self.target_dir)
         self.converted_count = 0
-        self.error_files: List[str] = []
+        self.diagnostic_count = 0
+        self.failures: List[Dict] = []    # {file, rule, line, col, message}
 
     def convert_all(self) -> None:
         """转换所有文件"""
-        print(f"开始迁移: {self.source_dir} -> {self.target_dir}")
+        self.events.section(f"开始迁移: {self.source_dir} -> {self.target_dir}")
 
         # 确保目标目录存在
-        self.target_dir.mkdir(parents=True, exist_ok=True)
-
-        # 遍历源目录
-        for md_file in self.source_dir.rglob("*.md"):
-            try:
-                self.convert_file(md_file)
-                self.converted_count += 1
-            except Exception as e:
-                print(f"  [错误] {md_file}: {e}")
-                self.error_files.append(str(md_file))
+        self.storage.mkdir(self.target_dir)
+
+        # 遍历源目录（先列出全部文件，进度显示需要总数）
+        pages = self.scan_sources()
+        self.events.start(total=len(pages), label="转换")
+        if self.io_depth:
+            self.convert_all_async(pages)
+        elif self.workers and self.workers > 1:
+            self.convert_all_parallel(pages)
+        else:
+            for page in pages:
+                try:
+                    self.convert_file(page)
+                    self.converted_count += 1
+                except Exception as e:
+                    self.fail(page, e)
+        self.events.finish()
+        self.failures.sort(key=lambda f: f["file"])
 
         # 生成 _meta.json 文件
         self.generate_meta_files()
-
-        print(f"\n迁移完成:")
-        print(f"  成功: {self.converted_count} 个文件")
-        print(f"  失败: {len(self.error_files)} 个文件")
-
-    def convert_file(self, source_file: Path) -> None:
+        self.storage.flush()
+        if self.storage.persistent:
+            self.titles.save()
+            self.save_failures()
+
+        if self.assets is not None:
+            self.assets.save()
+            for warning in self.assets.warnings:
+                self.events.log(warning, "WARN")
+            self.events.log(f"[资源] {self.assets.summary()}", detail=False)
+
+        if self.playgrounds is not None:
+            self.playgrounds.save()
+            self.events.log(f"[代码] {self.playgrounds.summary()}", detail=False)
+
+        if self.diagrams is not None:
+            self.diagrams.save()
+            for warning in self.diagrams.warnings:
+                self.events.log(warning, "WARN")
+            self.events.log(f"[图表] {self.diagrams.summary()}", detail=False)
+
+        self.events.emit("summary", converted=self.converted_count, failed=len(self.failures),
+                         diagnostics=self.diagnostic_count)
+        self.events.echo(f"\n迁移完成: {self.corpus.summary()}")
+        self.events.echo(f"  成功: {self.converted_count} 个文件")
+        self.events.echo(f"  失败: {len(self.failures)} 个文件")
+        if self.diagnostic_count:
+            self.events.echo(f"  诊断: {self.diagnostic_count} 条（见事件流）")
+        if self.failures and self.failures_path is not None and self.storage.persistent:
+            self.events.echo(f"  失败记录: {self.failures_path}（--retry-failed 只重新转换这些文件）")
+
+    def scan_sources(self) -> List[Page]:
+        """登记源目录中的 .md 文件，目标为同一相对路径的 .mdx（--retry-failed 时只登记失败的文件）"""
+        pages = []
+        for entry in self.storage.walk(self.source_dir, suffix=".md"):
+            rel_path = Path(entry.path).relative_to(self.source_dir)
+            source = rel_path.as_posix()
+            if self.only is not None and source not in self.only:
+                continue
+            chapter = rel_path.parent.as_posix()
+            pages.append(self.corpus.add(source, "" if chapter == "." else chapter, rel_path.stem, rel_path.stem, 0))
+        return pages
+
+    def fail(self, page: Page, error: BaseException) -> None:
+        """记录一个转换失败的文件：出错的规则与位置"""
+        rel_path = page.source
+        if isinstance(error, ConvertError):
+            record = {"file": rel_path, "rule": error.rule, "line": error.line, "col": error.col,
+                      "message": error.message}
+        else:
+            rule = "io" if isinstance(error, (OSError, UnicodeError)) else "convert"
+            record = {"file": rel_path, "rule": rule, "line": None, "col": None,
+                      "message": f"{type(error).__name__}: {error}"}
+        self.events.log(f"{rel_path}: {error}", "ERROR", **record)
+        self.events.advance()
+        self.failures.append(record)
+
+    def report_diagnostics(self, page: Page, diagnostics) -> None:
+        """转换诊断只进入事件流"""
+        for d in diagnostics:
+            self.events.emit("diagnostic", file=page.source, level=d.level.lower(), line=d.line, col=d.col,
+                             code=d.code, message=d.message)
+        self.diagnostic_count += len(diagnostics)
+
+    def failed_dirs(self) -> set:
+        """含失败文件的目标目录"""
+        return {(self.target_dir / f["file"]).parent for f in self.failures}
+
+    def save_failures(self) -> None:
+        """写出失败记录；全部成功时删除旧的记录"""
+        if self.failures_path is None:
+            return
+        if not self.failures:
+            if self.failures_path.exists():
+                self.failures_path.unlink()
+            return
+        self.failures_path.parent.mkdir(parents=True, exist_ok=True)
+        record = {"source": str(self.source_dir), "target": str(self.target_dir), "failures": self.failures}
+        write_text_atomic(self.failures_path, json.dumps(record, indent=2, ensure_ascii=False) + "\n")
+
+    def read_source(self, page: Page) -> str:
+        return self.storage.read_text(page.source_path)
+
+    def convert_file(self, page: Page) -> None:
         """转换单个文件"""
-        # 计算相对路径
-        rel_path = source_file.relative_to(self.source_dir)
-        target_file = self.target_dir / rel_path.with_suffix(".mdx")
-
-        # 确保目标目录存在
-        target_file.parent.mkdir(parents=True, exist_ok=True)
-
         # 读取源文件
-        content = source_file.read_text(encoding="utf-8")
+        content = self.read_source(page)
 
         # 转换内容
-        converted = self.convert_content(content, source_file.name)
+        converted = self.convert_source(page, content)
 
         # 写入目标文件
-        target_file.write_text(converted, encoding="utf-8")
-        print(f"  [转换] {rel_path} -> {rel_path.with_suffix('.mdx')}")
-
-    def convert_content(self, content: str, filename: str) -> str:
-        """转换文件内容"""
-        # 1. 处理 frontmatter
-        content = self.convert_frontmatter(content, filename)
-
-        # 2. 转换 Vue 组件为 JSX
-        content = self.convert_vue_to_jsx(content)
-
-        # 3. 修复图片路径
-        content = self.convert_image_paths(content)
-
-        # 4. 处理 HTML 标签
-        content = self.convert_html_tags(content)
-
-        # 5. 处理 Mermaid 图表
-        content = self.convert_mermaid(content)
-
-        return content
-
-    def convert_frontmatter(self, content: str, filename: str) -> str:
-        """转换 frontmatter"""
-        # 匹配 frontmatter
-        fm_pattern = r"^---\s*\n(.*?)\n---\s*\n"
-        match = re.match(fm_pattern, content, re.DOTALL)
-
-        if match:
-            fm_content = match.group(1)
-            rest_content = content[match.end():]
-
-            # 解析并简化 frontmatter
-            new_fm = self.simplify_frontmatter(fm_content, filename)
-            return f"---\n{new_fm}---\n\n{rest_content}"
-        else:
-            # 没有 frontmatter，添加基本的
-            title = self.extract_title(content, filename)
-            return f"---\ntitle: {title}\n---\n\n{content}"
-
-    def simplify_frontmatter(self, fm_content: str, filename: str) -> str:
-        """简化 frontmatter，只保留必要字段"""
-        lines = fm_content.strip().split("\n")
-        result = {}
-
-        current_key = None
-        for line in lines:
-            if ":" in line and not line.startswith(" "):
-                key, value = line.split(":", 1)
-                key = key.strip()
-                value = value.strip()
-                if key in ["title", "description"]:
-                    result[key] = value
-                current_key = key
-            elif current_key and line.startswith(" "):
-                # 多行值，跳过
-                pass
-
-        # 确保有 title
-        if "title" not in result:
-            result["title"] = self.filename_to_title(filename)
-
-        return "\n".join(f"{k}: {v}" for k, v in result.items()) + "\n"
-
-    def convert_vue_to_jsx(self, content: str) -> str:
-        """将 Vue 组件语法转换为 JSX"""
-        # Callout 组件
-        # <Callout type="info">content</Callout>
-        content = re.sub(
-            r"<Callout\s+type=[\"'](\w+)[\"']\s*>",
-            r'<Alert type="\1">',
-            content
-        )
-        content = content.replace("</Callout>", "</Alert>")
-
-        # 带 title 的 Callout
-        content = re.sub(
-            r"<Callout\s+type=[\"'](\w+)[\"']\s+title=[\"']([^\"']+)[\"']\s*>",
-            r'<Alert type="\1" title="\2">',
-            content
-        )
-
-        # Steps 组件
-        content = re.sub(
-            r"<Steps>",
-            r"<Steps>",
-            content
-        )
+        self.write_target(page, converted)
 
-        # CodeRun 组件
-        content = re.sub(
-            r"<CodeRun\s+lang=[\"'](\w+)[\"']\s*>",
-            r'<CodePlayground language="\1" code={`',
-            content
-        )
-        content = re.sub(
-            r"</CodeRun>",
-            r"`} />",
-            content
-        )
-
-        # Demo 组件 - 转换为简单的图片或视频
-        content = re.sub(
-            r"<Demo\s+src=[\"']([^\"']+)[\"']\s*/>",
-            r"![](\1)",
-            content
-        )
+    def convert_source(self, page: Page, content: str) -> str:
+        """转换已读入的源文件内容"""
+        content = self.extract_assets(content, page.target)
+        converted, diagnostics = convert(content, self.options(page.source_path.name))
+        self.report_diagnostics(page, diagnostics)
+        if self.assets is not None:
+            converted = self.assets.rewrite(converted, page.source_path)
+        return converted
 
-        return content
+    def write_target(self, page: Page, converted: str) -> None:
+        target_file = page.target_path
 
-    def convert_image_paths(self, content: str) -> str:
-        """修复图片路径"""
-        # GitHub raw 图片保持不变
-        # 本地图片路径转换
-        content = re.sub(
-            r"!\[([^\]]*)\]\(/images/([^)]+)\)",
-            r"![\1](/images/\2)",
-            content
-        )
+        # 确保目标目录存在
+        self.storage.mkdir(target_file.parent)
+        self.storage.write_text(target_file, converted)
+        self.events.log(f"[转换] {page.source} -> {page.target}", file=page.source, target=page.target)
+        self.events.advance()
+
+    def read_jobs(self, pages: List[Page]) -> Iterator[Tuple[Page, Tuple[str, ConvertOptions]]]:
+        """按需读取源文件（convert_stream 只取用在途窗口所需的页面）"""
+        for page in pages:
+            try:
+                content = self.extract_assets(self.read_source(page), page.target)
+            except Exception as e:
+                self.fail(page, e)
+                continue
+            yield page, (content, self.options(page.source_path.name))
 
-        # 处理 HTML img 标签
-        content = re.sub(
-            r'<img\s+src=["\']([^"\']+)["\']([^>]*)>',
-            lambda m: f'<img src="{m.group(1)}"{m.group(2)} />',
-            content
+    def convert_all_parallel(self, pages: List[Page]) -> None:
+        """流式读取，在多个进程中转换（见 convert_stream），按源文件顺序逐个写入"""
+        for page, result in convert_stream(self.read_jobs(pages), workers=self.workers):
+            if result.error is not None:
+                self.fail(page, result.error)
+                continue
+            self.report_diagnostics(page, result.diagnostics)
+            try:
+                converted = result.text
+                if self.assets is not None:
+                    converted = self.assets.rewrite(converted, page.source_path)
+                self.write_target(page, converted)
+                self.converted_count += 1
+            except Exception as e:
+                self.fail(page, e)
+
+    def convert_all_async(self, pages: List[Page]) -> None:
+        """异步管道：并发读取 → 转换（单线程 executor）→ 并发写入"""
+        results = run_pipeline(
+            pages,
+            read=self.read_source,
+            convert=self.convert_source,
+            write=self.write_target,
+            depth=self.io_depth
         )
+        for result in results:
+            if result.error is not None:
+                self.fail(result.job, result.error)
+            else:
+                self.converted_count += 1
 
+    def extract_assets(self, content: str, page: str) -> str:
+        """CodeRun 代码体与 Mermaid 图表先提取为静态文件（有状态，不进入转换核心）"""
+        if self.playgrounds is not None:
+            content = self.playgrounds.extract(content, page)
+        if self.diagrams is not None:
+            content = self.diagrams.extract(content, page)
         return content
 
-    def convert_html_tags(self, content: str) -> str:
-        """转换 HTML 标签为 JSX 兼容格式"""
-        # 自闭合标签
-        content = re.sub(r"<br>", r"<br />", content)
-        content = re.sub(r"<hr>", r"<hr />", content)
-
-        # class -> className
-        content = re.sub(r'\bclass=(["\'])', r"className=\1", content)
-
-        # style 属性（简单处理）
-        # style="color: red" -> style={{ color: 'red' }}
-        # 这个比较复杂，暂时保留原样
-
-        return content
-
-    def convert_mermaid(self, content: str) -> str:
-        """处理 Mermaid 图表"""
-        # Mermaid 代码块保持不变，Nextra 支持
-        # 只需确保语法正确
-        return content
+    def convert_content(self, content: str, filename: str, page: Optional[str] = None) -> str:
+        """转换文件内容（转换规则见 content_tools/convert.py 的 vitepress 方言）"""
+        content = self.extract_assets(content, page or filename)
+        converted, _ = convert(content, self.options(filename))
+        return converted
 
-    def extract_title(self, content: str, filename: str) -> str:
-        """从内容中提取标题"""
-        # 尝试从 H1 标题提取
-        match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
-        if match:
-            return match.group(1).strip()
-        return self.filename_to_title(filename)
-
-    def filename_to_title(self, filename: str) -> str:
-        """将文件名转换为标题"""
-        name = Path(filename).stem
-        # 移除数字前缀如 "1.1-"
-        name = re.sub(r"^\d+(\.\d+)?-?", "", name)
-        # 将连字符转换为空格
-        name = name.replace("-", " ").replace("_", " ")
-        return name.strip() or "Untitled"
+    def options(self, filename: str) -> ConvertOptions:
+        return ConvertOptions(dialect="vitepress", filename=filename)
 
     def generate_meta_files(self) -> None:
         """生成 _meta.json 导航配置文件"""
-        for dir_path in self.target_dir.rglob("*"):
-            if dir_path.is_dir():
-                self.generate_meta_for_dir(dir_path)
+        # 含失败文件的目录暂不生成（重试成功后再生成，标题与排序才完整）
+        skipped = self.failed_dirs()
+        for entry in self.storage.walk(self.target_dir, dirs=True):
+            if entry.is_dir() and Path(entry.path) not in skipped:
+                self.generate_meta_for_dir(Path(entry.path))
 
     def generate_meta_for_dir(self, dir_path: Path) -> None:
         """为单个目录生成 _meta.json"""
         meta_file = dir_path / "_meta.json"
-        if meta_file.exists():
+        if self.storage.exists(meta_file):
             return  # 已存在则跳过
 
         # 收集目录中的文件
         items = {}
-        for item in sorted(dir_path.iterdir()):
+        for entry in self.storage.scan(dir_path, dirs=True):
+            item = Path(entry.path)
             if item.name.startswith("_"):
                 continue
-            if item.is_file() and item.suffix == ".mdx":
+            if not entry.is_dir() and item.suffix == ".mdx":
                 name = item.stem
                 title = self.get_file_title(item)
                 items[name] = title
-            elif item.is_dir():
+            elif entry.is_dir():
                 items[item.name] = item.name.replace("-", " ").title()
 
         if items:
-            meta_file.write_text(
-                json.dumps(items, ensure_ascii=False, indent=2),
-                encoding="utf-8"
-            )
-            print(f"  [生成] {meta_file.relative_to(self.target_dir)}")
+            self.storage.write_text(meta_file, json.dumps(items, ensure_ascii=False, indent=2))
+            self.events.log(f"[生成] {meta_file.relative_to(self.target_dir)}")
 
     def get_file_title(self, file_path: Path) -> str:
-        """从文件中获取标题"""
+        """从文件中获取标题：frontmatter 的 title，其次 H1（只读取文件开头）"""
         try:
-            content = file_path.read_text(encoding="utf-8")
-            # 从 frontmatter 提取 title
-            match = re.search(r"^title:\s*(.+)$", content, re.MULTILINE)
-            if match:
-                return match.group(1).strip().strip("\"'")
-            # 从 H1 提取
-            match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
-            if match:
-                return match.group(1).strip()
+            title = self.titles.title(file_path, self.storage)
+            if title:
+                return title
         except Exception:
             pass
         return file_path.stem.replace("-", " ").title()
@@ -305,6 +348,79 @@ def main():
         action="store_true",
         help="仅显示将要执行的操作，不实际转换"
     )
+    parser.add_argument(
+        "--assets",
+        action="store_true",
+        help="处理本地图片：哈希去重、生成 WebP 变体并改写引用"
+    )
+    parser.add_argument(
+        "--extract-playgrounds",
+        action="store_true",
+        help="把 CodeRun 代码体写成按哈希命名的静态文件，页面只保留引用"
+    )
+    parser.add_argument(
+        "--extract-diagrams",
+        action="store_true",
+        help="把 mermaid 代码块写成按哈希命名的静态文件，只有含图表的页面加载图表运行时"
+    )
+    parser.add_argument(
+        "--diagram-renderer",
+        help="图表预渲染器：stub（本地替身）/ mmdc / 模块:函数；结果按图表哈希缓存（隐含 --extract-diagrams）"
+    )
+    parser.add_argument(
+        "--public",
+        default="apps/docs/public",
+        help="静态资源输出目录 (默认: apps/docs/public)"
+    )
+
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="异步管道模式：有界并发读取 → 转换 → 有界并发写入"
+    )
+    parser.add_argument(
+        "--io-depth",
+        type=int,
+        default=DEFAULT_DEPTH,
+        help=f"异步管道的并发深度 (默认: {DEFAULT_DEPTH})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="转换进程数（默认在当前进程中转换）"
+    )
+    parser.add_argument(
+        "--failures",
+        default="apps/docs/.cache/migrate-failures.json",
+        help="失败记录路径 (默认: apps/docs/.cache/migrate-failures.json)"
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="只重新转换失败记录中的文件"
+    )
+    parser.add_argument(
+        "--storage",
+        choices=BACKENDS,
+        default="local",
+        help="存储后端：local（默认）/ batched（写入缓冲后批量提交）/ memory（不写盘，用于基准）"
+    )
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="store_true",
+        help="逐个文件打印日志（默认只显示进度）"
+    )
+    parser.add_argument(
+        "--quiet",
+        "-q",
+        action="store_true",
+        help="只打印最终报告与警告/错误汇总"
+    )
+    parser.add_argument(
+        "--events",
+        help="结构化事件流（JSON Lines）：文件路径或 fd:N"
+    )
 
     args = parser.parse_args()
 
@@ -319,18 +435,72 @@ def main():
         print(f"错误: 源目录不存在: {source_dir}")
         return 1
 
+    failures_path = project_root / args.failures
+    only = None
+    if args.retry_failed:
+        if not failures_path.exists():
+            print(f"没有失败记录: {failures_path}")
+            return 0
+        record = json.loads(failures_path.read_text(encoding="utf-8"))
+        if record["source"] != str(source_dir) or record["target"] != str(target_dir):
+            print(f"错误: 失败记录来自另一次迁移（{record['source']} -> {record['target']}）")
+            return 1
+        only = [f["file"] for f in record["failures"]]
+
+    events = open_events("migrate-content", args.verbose, args.quiet, args.events, args.dry_run)
+
     if args.dry_run:
-        print("=== 干运行模式 ===")
-        print(f"源目录: {source_dir}")
-        print(f"目标目录: {target_dir}")
-        print("\n将转换以下文件:")
-        for md_file in source_dir.rglob("*.md"):
-            rel_path = md_file.relative_to(source_dir)
-            print(f"  {rel_path} -> {rel_path.with_suffix('.mdx')}")
+        events.section("=== 干运行模式 ===")
+        events.section(f"源目录: {source_dir}")
+        events.section(f"目标目录: {target_dir}")
+        events.section("\n将转换以下文件:")
+        for entry in walk(source_dir, suffix=".md"):
+            rel_path = Path(entry.path).relative_to(source_dir)
+            events.log(f"{rel_path} -> {rel_path.with_suffix('.mdx')}", "DRY", file=rel_path.as_posix())
+        events.close()
         return 0
 
-    converter = MarkdownToMDXConverter(str(source_dir), str(target_dir))
+    assets = None
+    if args.assets:
+        assets = AssetPipeline(
+            public_dir=project_root / args.public,
+            cache_dir=project_root / "apps" / "docs" / ".cache",
+            public_source_dir=source_dir / "public"
+        )
+
+    playgrounds = None
+    if args.extract_playgrounds:
+        playgrounds = PlaygroundExtractor(public_dir=project_root / args.public)
+
+    diagrams = None
+    if args.extract_diagrams or args.diagram_renderer:
+        try:
+            renderer = load_renderer(args.diagram_renderer)
+        except (ValueError, ImportError, AttributeError) as e:
+            print(f"错误: {e}")
+            return 1
+        diagrams = DiagramExtractor(
+            public_dir=project_root / args.public,
+            renderer=renderer,
+            cache_dir=project_root / "apps" / "docs" / ".cache"
+        )
+
+    converter = MarkdownToMDXConverter(
+        str(source_dir),
+        str(target_dir),
+        assets=assets,
+        playgrounds=playgrounds,
+        diagrams=diagrams,
+        io_depth=args.io_depth if args.pipeline else None,
+        storage=open_storage(args.storage, preload=[source_dir, target_dir]),
+        workers=args.workers,
+        titles=TitleCache(project_root / "apps" / "docs" / ".cache" / "titles.json"),
+        events=events,
+        failures_path=failures_path,
+        only=only
+    )
     converter.convert_all()
+    events.close()
 
     return 0
 